@@ -10,6 +10,8 @@ from datetime import time as dt_time
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from orchestration.main_orchestrator import MainOrchestrator
+from orchestration.run_state_store import RunStateStore
+from platform_services.instagram_service import ZODIAC_SIGNS
 
 st.set_page_config(page_title="Planets Vibe Bot", page_icon="🔮", layout="centered")
 
@@ -29,7 +31,9 @@ st.divider()
 
 # --- 1. Connection Section ---
 st.header("1. Connect Your Instagram Account")
-insta_status = orchestrator.get_instagram_status()
+# The first call restores the saved Instagram session, so it gets a spinner of its own
+with st.spinner("Checking the Instagram session..."):
+    insta_status = orchestrator.get_instagram_status()
 
 if insta_status.get("is_logged_in"):
     st.success(f"Connected as: **{insta_status.get('username')}**")
@@ -56,6 +60,12 @@ else:
                 else:
                     st.error(f"Login Failed: {result.get('message')}")
 
+with st.expander("Service health"):
+    # Starts every service that isn't running yet, so it only runs on request
+    if st.button("Run health checks"):
+        for service, health in orchestrator.check_health().items():
+            (st.success if health['ok'] else st.error)(f"**{service}**: {health['detail']}")
+
 st.divider()
 
 # --- 2. Generation Section (Only visible if logged in) ---
@@ -77,13 +87,40 @@ if insta_status.get("is_logged_in"):
             st.warning("Automation stopped.")
 
     st.subheader("Manual Generation")
-    # --- MODIFIED: Changed the function name called by the button ---
+    # The run happens on the orchestrator's background job runner, so this page (and every
+    # other open session) stays responsive and can follow the same run while it progresses.
     if st.button("🔮 Generate & Post Today's 12 Posts Now", use_container_width=True, type="primary"):
-        with st.spinner("Generating & Publishing 12 astrology posts... This will take several minutes."):
-            posts = orchestrator.generate_and_publish_all_astrology_posts() # <-- The change is here
-        
-        if posts and len(posts) > 0:
-            st.success(f"Successfully published {len(posts)} posts to Instagram!")
-            st.balloons()
-        else:
-            st.error("Process failed. Check the terminal for details.")
+        orchestrator.submit_generate_and_publish()
+        st.toast("Generation started in the background.")
+
+    @st.fragment(run_every=2)
+    def show_generation_progress():
+        job = orchestrator.get_latest_generate_and_publish_job()
+        if not job:
+            return
+
+        progress = job['progress']
+        # The carousel has its own progress entry next to the signs; it gets a status line, not a row
+        sign_progress = {sign: progress[sign] for sign in ZODIAC_SIGNS if sign in progress}
+        finished_signs = [sign for sign, entry in sign_progress.items() if entry['stage'] in ("done", "failed")]
+        st.progress(len(finished_signs) / len(ZODIAC_SIGNS),
+                    text=f"Job {job['id']}: {job['status']} — {len(finished_signs)}/{len(ZODIAC_SIGNS)} signs finished")
+        if sign_progress:
+            st.dataframe(
+                [{"sign": sign, "stage": entry['stage'], **entry['timings']} for sign, entry in sign_progress.items()],
+                use_container_width=True, hide_index=True
+            )
+        carousel = progress.get(RunStateStore.CAROUSEL)
+        if carousel:
+            seconds = carousel['timings'].get(carousel['stage'])
+            st.caption(f"Carousel: {carousel['stage']}{f' ({seconds}s)' if seconds is not None else ''}")
+
+        if job['status'] == "succeeded":
+            st.success(f"Successfully published {len(job['result'])} posts to Instagram!")
+        elif job['status'] == "failed" and not job['error'] and orchestrator.is_carousel_published():
+            # A run for a day whose carousel is already up returns no posts without doing anything
+            st.info("Today's carousel was already published. Nothing to do.")
+        elif job['status'] == "failed":
+            st.error(f"Process failed{': ' + job['error'] if job['error'] else ''}. Check the terminal for details.")
+
+    show_generation_progress()
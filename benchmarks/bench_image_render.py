@@ -0,0 +1,131 @@
+# /benchmarks/bench_image_render.py
+"""
+Measures the per-image render time and peak memory of ImagePostGeneratorService.create_post_image,
+with and without the reduced-scale JPEG loading path, and (with --variants) the cost of rendering
+several formats from one decode versus one decode per format.
+
+Usage: python benchmarks/bench_image_render.py [--images 12] [--size 6000x4000] [--format JPEG] [--variants portrait,story,square]
+Each mode runs in its own process so the peak RSS numbers don't bleed into each other.
+"""
+
+import os
+import sys
+import time
+import argparse
+import resource
+import tempfile
+import statistics
+from multiprocessing import get_context
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def _make_fixture(directory: str, width: int, height: int) -> str:
+    """Writes a noisy, photo-sized JPEG so the decoder does realistic work."""
+    from PIL import Image
+    path = os.path.join(directory, f"fixture_{width}x{height}.jpg")
+    noise = Image.effect_noise((width // 4, height // 4), 64).convert("RGB")
+    noise.resize((width, height), Image.Resampling.BICUBIC).save(path, "JPEG", quality=92)
+    return path
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+def _run_mode(fast_load: bool, fixture_path: str, images: int, workdir: str, output_format: str) -> dict:
+    os.chdir(workdir)
+    from PIL import Image
+    from core_services.image_post_generator_service import ImagePostGeneratorService
+    service = ImagePostGeneratorService(fast_load=fast_load, output_format=output_format)
+    baseline_rss = _peak_rss_mb()
+
+    load_durations, render_durations, output_sizes = [], [], []
+    for index in range(images):
+        # The decode + crop + resize stage on its own...
+        start = time.perf_counter()
+        with Image.open(fixture_path) as img:
+            service._load_portrait(img)
+        load_durations.append(time.perf_counter() - start)
+        # ...and the complete render, including text and encoding
+        start = time.perf_counter()
+        output_path = service.create_post_image(fixture_path, "The stars line up in your favour today, trust the quiet voice.", f"Sign {index}")
+        render_durations.append(time.perf_counter() - start)
+        output_sizes.append(os.path.getsize(output_path))
+
+    return {
+        "mode": "fast_load" if fast_load else "full_decode",
+        "load_mean_s": statistics.mean(load_durations),
+        "render_mean_s": statistics.mean(render_durations),
+        "render_p95_s": sorted(render_durations)[max(0, int(len(render_durations) * 0.95) - 1)],
+        "output_kb": statistics.mean(output_sizes) / 1024,
+        "peak_rss_mb": _peak_rss_mb(),
+        "rss_growth_mb": _peak_rss_mb() - baseline_rss
+    }
+
+def _run_variants(single_decode: bool, variants: list[str], fixture_path: str, images: int, workdir: str, output_format: str) -> dict:
+    os.chdir(workdir)
+    from core_services.image_post_generator_service import ImagePostGeneratorService
+    service = ImagePostGeneratorService(output_format=output_format)
+    baseline_rss = _peak_rss_mb()
+    text = "The stars line up in your favour today, trust the quiet voice."
+
+    durations, decode_durations, per_variant = [], [], {name: [] for name in variants}
+    for index in range(images):
+        start = time.perf_counter()
+        if single_decode:
+            rendered = [service.create_post_variants(fixture_path, text, f"Sign {index}", variants)]
+        else:
+            rendered = [service.create_post_variants(fixture_path, text, f"Sign {index}", [name]) for name in variants]
+        durations.append(time.perf_counter() - start)
+        decode_durations.append(sum(result["decode_seconds"] for result in rendered))
+        for result in rendered:
+            for name, variant in result["variants"].items():
+                per_variant[name].append(variant["seconds"])
+
+    return {
+        "mode": "one decode" if single_decode else "decode per format",
+        "total_mean_s": statistics.mean(durations),
+        "decode_mean_s": statistics.mean(decode_durations),
+        "variant_mean_s": {name: statistics.mean(values) for name, values in per_variant.items()},
+        "peak_rss_mb": _peak_rss_mb(),
+        "rss_growth_mb": _peak_rss_mb() - baseline_rss
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=12)
+    parser.add_argument("--size", default="6000x4000", help="fixture size, WIDTHxHEIGHT")
+    parser.add_argument("--format", default="JPEG", help="post output format: JPEG, PNG or WEBP")
+    parser.add_argument("--variants", help="also compare rendering these formats from one decode, e.g. portrait,story,square")
+    args = parser.parse_args()
+    width, height = (int(value) for value in args.size.lower().split("x"))
+
+    # Everything that touches pixels runs in a fresh child: Linux carries ru_maxrss over to spawned children
+    context = get_context("spawn")
+    with tempfile.TemporaryDirectory() as workdir:
+        with context.Pool(1) as pool:
+            fixture_path = pool.apply(_make_fixture, (workdir, width, height))
+        results = []
+        for fast_load in (False, True):
+            with context.Pool(1) as pool:
+                results.append(pool.apply(_run_mode, (fast_load, fixture_path, args.images, workdir, args.format)))
+        variant_results = []
+        variants = [name.strip() for name in args.variants.split(",")] if args.variants else []
+        for single_decode in ((False, True) if variants else ()):
+            with context.Pool(1) as pool:
+                variant_results.append(pool.apply(_run_variants, (single_decode, variants, fixture_path, args.images, workdir, args.format)))
+
+    print(f"\n⏱️  {args.images} {args.format.upper()} renders from a {width}x{height} JPEG")
+    for result in results:
+        print(f"   - {result['mode']:<12} decode+resize {result['load_mean_s'] * 1000:7.1f} ms"
+              f" | full render mean {result['render_mean_s'] * 1000:7.1f} ms, p95 {result['render_p95_s'] * 1000:7.1f} ms"
+              f" | {result['output_kb']:6.0f} KB/post | peak RSS {result['peak_rss_mb']:6.1f} MB (+{result['rss_growth_mb']:.1f} MB while rendering)")
+    if variant_results:
+        print(f"\n⏱️  {', '.join(variants)} per post")
+    for result in variant_results:
+        print(f"   - {result['mode']:<17} total {result['total_mean_s'] * 1000:7.1f} ms (decode {result['decode_mean_s'] * 1000:6.1f} ms)"
+              f" | " + ", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in result['variant_mean_s'].items())
+              + f" | peak RSS {result['peak_rss_mb']:6.1f} MB (+{result['rss_growth_mb']:.1f} MB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+# /benchmarks/bench_pipeline.py
+"""
+Benchmarks a complete 12-sign run (astro data, image fetch, render, upload and album configure)
+against local fakes, so it needs no credentials and never touches OpenAI, Pexels or Instagram.
+
+Usage: python benchmarks/bench_pipeline.py [--runs 3] [--concurrency N] [--render-processes N]
+           [--openai-latency 2.0] [--pexels-latency 0.3] [--download-latency 0.1] [--bandwidth-mbps 100]
+           [--upload-latency 0.8] [--configure-latency 1.5] [--json results.json]
+
+OpenAI and Instagram are faked in-process; Pexels is a local HTTP server, so searches and downloads
+still go through the real pooled, streaming client. Every run starts in a fresh process with empty
+caches and an empty journal. Reports run time, throughput, p50/p95 of every traced stage across all
+runs, and the peak RSS of the run and of its render processes.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+import tempfile
+import statistics
+from multiprocessing import get_context
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from offline_fakes import FakeOpenAIClient, FakePexelsServer, make_fixture_photos
+
+# Spans reported first, in pipeline order; any other span follows alphabetically
+STAGE_ORDER = (
+    "run.generate_and_publish", "run.generate", "openai.chat", "sign", "stage.astro_data", "stage.image_fetch",
+    "stage.render", "render.post", "render.variants", "render.decode", "render.variant", "render.encode", "instagram.upload_item", "run.publish",
+    "instagram.configure"
+)
+
+def _peak_rss_mb(who=resource.RUSAGE_SELF) -> float:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+def _percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(len(ordered) * fraction + 0.5) - 1))]
+
+def _run_once(options: dict) -> dict:
+    """One cold run in this (fresh) process. Returns its timings, span durations and peak memory."""
+    workdir = options["workdir"]
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+    telemetry_log = os.path.join(workdir, "telemetry", "events.jsonl")
+    # Read by config at import time, and inherited by the render processes
+    os.environ.update({
+        "OPENAI_API_KEY": "offline", "PEXELS_API_KEY": "offline",
+        "PEXELS_API_BASE_URL": options["pexels_base_url"], "PEXELS_REQUESTS_PER_HOUR": "1000000",
+        "CACHE_DIR": os.path.join(workdir, "cache"), "RUNS_DIR": os.path.join(workdir, "runs"),
+        "RUN_STATE_DIR": os.path.join(workdir, "run_state"), "STAGING_DIR": os.path.join(workdir, "staged"),
+        "TELEMETRY_ENABLED": "true", "TELEMETRY_LOG_FILE": telemetry_log,
+        "TELEMETRY_PROMETHEUS_FILE": os.path.join(workdir, "telemetry", "metrics.prom"),
+        "CAROUSEL_CONFIGURE_DELAY_SECONDS": str(options["configure_delay"])
+    })
+    random.seed(options["seed"])
+    if not options["verbose"]:
+        # At the descriptor level, so the render processes started from here are silenced too
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+    from orchestration.main_orchestrator import MainOrchestrator
+    from platform_services.instagram_stub_client import StubInstagramClient
+    from core_services.telemetry import get_telemetry
+    orchestrator = MainOrchestrator(concurrency=options["concurrency"], render_processes=options["render_processes"])
+    orchestrator.content_generator.client = FakeOpenAIClient(latency=options["openai_latency"], seed=options["seed"])
+    instagram = StubInstagramClient(upload_latency=options["upload_latency"], configure_latency=options["configure_latency"])
+    orchestrator.instagram_service._client = instagram
+    # Start the render processes before the clock starts, as a long-running worker would have them
+    if orchestrator.render_processes > 1:
+        orchestrator.image_post_generator._get_render_pool()
+    baseline_rss = _peak_rss_mb()
+
+    start = time.perf_counter()
+    posts = orchestrator.generate_and_publish_all_astrology_posts()
+    seconds = time.perf_counter() - start
+    orchestrator.shutdown()
+    get_telemetry().flush()
+
+    spans = {}
+    with open(telemetry_log, "r", encoding="utf-8") as f:
+        for line in f:
+            event = json.loads(line)
+            if event.get("type") == "span" and event.get("status") == "ok":
+                spans.setdefault(event["name"], []).append(event["duration_ms"] / 1000)
+    return {
+        "seconds": seconds,
+        "posts": len(posts),
+        "published": bool(instagram.albums),
+        "spans": spans,
+        "peak_rss_mb": _peak_rss_mb(),
+        "rss_growth_mb": _peak_rss_mb() - baseline_rss,
+        # Largest child process (the render pool); only known once the pool has been shut down
+        "children_peak_rss_mb": _peak_rss_mb(resource.RUSAGE_CHILDREN)
+    }
+
+def _run_child(options: dict, connection):
+    try:
+        connection.send(("ok", _run_once(options)))
+    except Exception as e:
+        connection.send(("error", f"{e.__class__.__name__}: {e}"))
+
+def _run_in_fresh_process(context, options: dict) -> dict:
+    # A plain Process rather than a Pool: pool workers are daemonic and could not start the render processes
+    connection, child_end = context.Pipe()
+    process = context.Process(target=_run_child, args=(options, child_end))
+    process.start()
+    status, result = connection.recv()
+    process.join()
+    if status != "ok":
+        raise RuntimeError(f"benchmark run failed: {result}")
+    return result
+
+def _serve_pexels(fixtures_dir: str, options: dict, connection):
+    """
+    Runs the fake Pexels server in its own process: the fixtures are decoded there, so neither
+    this script nor the runs it spawns start out with their memory in ru_maxrss.
+    """
+    fixtures = make_fixture_photos(fixtures_dir, seed=options["seed"])
+    with FakePexelsServer(fixtures, search_latency=options["pexels_latency"], download_latency=options["download_latency"],
+                          bandwidth_mbps=options["bandwidth_mbps"] or None, renditions=options.get("renditions", True)) as pexels:
+        connection.send(pexels.base_url)
+        connection.recv()
+        connection.send(dict(pexels.stats))
+
+def summarize(runs: list[dict]) -> dict:
+    seconds = [run["seconds"] for run in runs]
+    spans = {}
+    for run in runs:
+        for name, durations in run["spans"].items():
+            spans.setdefault(name, []).extend(durations)
+    order = {name: index for index, name in enumerate(STAGE_ORDER)}
+    stages = {
+        name: {
+            "count": len(durations),
+            "p50_s": round(_percentile(durations, 0.5), 4),
+            "p95_s": round(_percentile(durations, 0.95), 4),
+            "total_s": round(sum(durations), 3)
+        }
+        for name, durations in sorted(spans.items(), key=lambda item: (order.get(item[0], len(order)), item[0]))
+    }
+    posts = sum(run["posts"] for run in runs)
+    return {
+        "runs": len(runs),
+        "all_published": all(run["published"] and run["posts"] == 12 for run in runs),
+        "run_median_s": round(statistics.median(seconds), 3),
+        "run_min_s": round(min(seconds), 3),
+        "run_max_s": round(max(seconds), 3),
+        "posts_per_minute": round(posts / sum(seconds) * 60, 1),
+        "peak_rss_mb": round(max(run["peak_rss_mb"] for run in runs), 1),
+        "rss_growth_mb": round(max(run["rss_growth_mb"] for run in runs), 1),
+        "children_peak_rss_mb": round(max(run["children_peak_rss_mb"] for run in runs), 1),
+        "stages": stages
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, help="signs generated in parallel (default: GENERATION_CONCURRENCY)")
+    parser.add_argument("--render-processes", type=int, help="render processes (default: RENDER_PROCESSES)")
+    parser.add_argument("--openai-latency", type=float, default=2.0, help="seconds per completion")
+    parser.add_argument("--pexels-latency", type=float, default=0.3, help="seconds per search")
+    parser.add_argument("--download-latency", type=float, default=0.1, help="seconds before a download starts")
+    parser.add_argument("--bandwidth-mbps", type=float, default=100.0, help="download bandwidth (0 = unlimited)")
+    parser.add_argument("--upload-latency", type=float, default=0.8, help="seconds per carousel item upload")
+    parser.add_argument("--configure-latency", type=float, default=1.5, help="seconds per album configure")
+    parser.add_argument("--configure-delay", type=float, default=0.0,
+                        help="the fixed wait before configuring (CAROUSEL_CONFIGURE_DELAY_SECONDS); 0 leaves it out")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fixtures", help="directory for the fixture photos (default: a temporary one)")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--verbose", action="store_true", help="show the pipeline log")
+    args = parser.parse_args()
+
+    context = get_context("spawn")
+    with tempfile.TemporaryDirectory() as tempdir:
+        connection, server_end = context.Pipe()
+        server = context.Process(target=_serve_pexels, args=(args.fixtures or os.path.join(tempdir, "fixtures"), vars(args), server_end))
+        server.start()
+        try:
+            pexels_base_url = connection.recv()
+            runs = []
+            for index in range(args.runs):
+                options = {**vars(args), "workdir": os.path.join(tempdir, f"run{index}"), "pexels_base_url": pexels_base_url}
+                # A fresh process per run, so imports, caches and peak RSS start from zero every time
+                runs.append(_run_in_fresh_process(context, options))
+                print(f"   - run {index + 1}/{args.runs}: {runs[-1]['seconds']:.2f}s, {runs[-1]['posts']} posts"
+                      f"{'' if runs[-1]['published'] else ' (NOT published)'}")
+            connection.send("stop")
+            served = connection.recv()
+        finally:
+            server.join(timeout=10)
+            if server.is_alive(): server.terminate()
+
+    summary = summarize(runs)
+    print(f"\n⏱️  Full 12-sign run x{summary['runs']} (OpenAI {args.openai_latency}s, Pexels {args.pexels_latency}s "
+          f"+ {args.download_latency}s, upload {args.upload_latency}s, configure {args.configure_latency}s)")
+    print(f"   - run time: median {summary['run_median_s']:.2f}s (min {summary['run_min_s']:.2f}s, max {summary['run_max_s']:.2f}s)"
+          f" | {summary['posts_per_minute']:.1f} posts/min | {'✅ all published' if summary['all_published'] else '❌ some runs failed'}")
+    print(f"   - peak RSS {summary['peak_rss_mb']:.1f} MB (+{summary['rss_growth_mb']:.1f} MB during the run)"
+          f" | largest child process {summary['children_peak_rss_mb']:.1f} MB")
+    print(f"   - fake Pexels served {served['searches']} searches and {served['downloads']} downloads "
+          f"({served['bytes_sent'] / 1024 / 1024:.1f} MB)")
+    print(f"\n   {'stage':<26}{'count':>6}{'p50':>10}{'p95':>10}{'total':>10}")
+    for name, stage in summary["stages"].items():
+        print(f"   {name:<26}{stage['count']:>6}{stage['p50_s'] * 1000:>8.1f}ms{stage['p95_s'] * 1000:>8.1f}ms{stage['total_s']:>9.2f}s")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"options": vars(args), "summary": summary, "fake_pexels": served}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
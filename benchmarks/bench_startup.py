@@ -0,0 +1,107 @@
+# /benchmarks/bench_startup.py
+"""
+Measures cold-start cost: how long a fresh interpreter takes to import the config, to get the
+orchestrator the dashboard needs before it can render, and to get a headless worker ready.
+
+Usage: python benchmarks/bench_startup.py [--repeat 5] [--with-credentials] [--importtime]
+Every sample runs in a new interpreter. By default the API keys are blanked, which also checks
+that everything imports without credentials.
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> code run in the child; the child reports how long the code took
+SCENARIOS = {
+    "import config": "import config",
+    "dashboard startup": (
+        "from orchestration.main_orchestrator import MainOrchestrator\n"
+        "MainOrchestrator()"
+    ),
+    "headless worker": (
+        "from orchestration.main_orchestrator import MainOrchestrator\n"
+        "orchestrator = MainOrchestrator()\n"
+        "orchestrator.staging, orchestrator.scheduler"
+    ),
+    "generation services": (
+        "from orchestration.main_orchestrator import MainOrchestrator\n"
+        "MainOrchestrator().instagram_service"
+    ),
+}
+
+CHILD_TEMPLATE = """
+import sys, time, json, io, contextlib
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+{code}
+print(json.dumps({{"seconds": time.perf_counter() - start}}))
+"""
+
+def _child_env(with_credentials: bool) -> dict:
+    env = dict(os.environ)
+    if not with_credentials:
+        # Set but empty, so the values in .env don't fill them back in
+        for name in ("OPENAI_API_KEY", "PEXELS_API_KEY"):
+            env[name] = ""
+    return env
+
+def _run_scenario(code: str, env: dict) -> tuple[float, float]:
+    """Returns (seconds spent in the scenario code, wall seconds of the whole interpreter)."""
+    indented = "\n".join("    " + line for line in code.splitlines())
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", CHILD_TEMPLATE.format(root=PROJECT_ROOT, code=indented)],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "child failed")
+    return json.loads(completed.stdout.strip().splitlines()[-1])["seconds"], wall
+
+def _print_import_profile(code: str, env: dict, top: int = 10):
+    """Prints the slowest imports (cumulative) of one scenario, from python -X importtime."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import sys; sys.path.insert(0, {PROJECT_ROOT!r})\n{code}"],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line: continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append((int(cumulative), name))
+    for cumulative, name in sorted(rows, reverse=True)[:top]:
+        print(f"      {cumulative / 1000:8.1f} ms  {name}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--with-credentials", action="store_true", help="keep the API keys from the environment/.env")
+    parser.add_argument("--importtime", action="store_true", help="also list the slowest imports of each scenario")
+    args = parser.parse_args()
+    env = _child_env(args.with_credentials)
+
+    print(f"\n⏱️  Cold start, {args.repeat} fresh interpreters per scenario "
+          f"({'with' if args.with_credentials else 'without'} credentials)")
+    for name, code in SCENARIOS.items():
+        try:
+            samples = [_run_scenario(code, env) for _ in range(args.repeat)]
+        except RuntimeError as e:
+            print(f"   - {name:<20} ❌ {e}")
+            continue
+        in_code = [sample[0] for sample in samples]
+        wall = [sample[1] for sample in samples]
+        print(f"   - {name:<20} median {statistics.median(in_code) * 1000:7.1f} ms, max {max(in_code) * 1000:7.1f} ms"
+              f" | whole process {statistics.median(wall) * 1000:7.1f} ms")
+        if args.importtime:
+            _print_import_profile(code, env)
+
+if __name__ == "__main__":
+    main()
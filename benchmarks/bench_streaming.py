@@ -0,0 +1,135 @@
+# /benchmarks/bench_streaming.py
+"""
+Measures peak memory of generating several days of posts the list way (every sign of a day in
+progress at once, the whole carousel returned together) against the streaming way
+(MainOrchestrator.stream_post_packages, at most N signs in progress or waiting to be consumed).
+
+Usage: python benchmarks/bench_streaming.py [--days 3] [--in-flight 1,2,4] [--consumer-latency 0.2]
+           [--openai-latency 0.5] [--pexels-latency 0.1] [--json results.json]
+
+Runs against the same local fakes as bench_pipeline.py, with full-size originals and rendering
+in-process so every decode counts towards the measured process. Each mode starts in a fresh
+process; the consumer takes --consumer-latency seconds per package, like an upload would.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+from datetime import date, timedelta
+from multiprocessing import get_context
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from offline_fakes import FakeOpenAIClient
+from bench_pipeline import _peak_rss_mb, _serve_pexels
+
+def _run_mode(options: dict) -> dict:
+    """Generates options["days"] days in this (fresh) process, in list mode or with a bounded stream."""
+    workdir = options["workdir"]
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+    os.environ.update({
+        "OPENAI_API_KEY": "offline", "PEXELS_API_KEY": "offline",
+        "PEXELS_API_BASE_URL": options["pexels_base_url"], "PEXELS_REQUESTS_PER_HOUR": "1000000",
+        "CACHE_DIR": os.path.join(workdir, "cache"), "RUNS_DIR": os.path.join(workdir, "runs"),
+        "RUN_STATE_DIR": os.path.join(workdir, "run_state"), "STAGING_DIR": os.path.join(workdir, "staged"),
+        "TELEMETRY_ENABLED": "false"
+    })
+    random.seed(options["seed"])
+    if not options["verbose"]:
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+    from orchestration.main_orchestrator import MainOrchestrator
+    from orchestration.run_state_store import RunStateStore
+    orchestrator = MainOrchestrator(concurrency=12, render_processes=1)
+    orchestrator.content_generator.client = FakeOpenAIClient(latency=options["openai_latency"], seed=options["seed"])
+    baseline_rss = _peak_rss_mb()
+
+    in_flight = options["in_flight"]
+    posts = 0
+    start = time.perf_counter()
+    for offset in range(options["days"]):
+        run_date = date(2025, 1, 1) + timedelta(days=offset)
+        if in_flight:
+            packages = orchestrator.stream_post_packages(run_date, max_in_flight=in_flight)
+        else:
+            packages = orchestrator.instagram_service.create_daily_astrology_post_for_all_signs(RunStateStore(run_date))
+        for package in packages:
+            time.sleep(options["consumer_latency"])
+            posts += 1
+    seconds = time.perf_counter() - start
+    orchestrator.shutdown()
+    return {
+        "mode": f"stream, {in_flight} in flight" if in_flight else "list (all 12 at once)",
+        "posts": posts,
+        "seconds": round(seconds, 2),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "rss_growth_mb": round(_peak_rss_mb() - baseline_rss, 1)
+    }
+
+def _run_child(options: dict, connection):
+    try:
+        connection.send(("ok", _run_mode(options)))
+    except Exception as e:
+        connection.send(("error", f"{e.__class__.__name__}: {e}"))
+
+def _run_in_fresh_process(context, options: dict) -> dict:
+    connection, child_end = context.Pipe()
+    process = context.Process(target=_run_child, args=(options, child_end))
+    process.start()
+    status, result = connection.recv()
+    process.join()
+    if status != "ok":
+        raise RuntimeError(f"benchmark run failed: {result}")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--in-flight", default="1,2,4", help="comma-separated stream limits to compare with list mode")
+    parser.add_argument("--consumer-latency", type=float, default=0.2, help="seconds the consumer spends per package")
+    parser.add_argument("--openai-latency", type=float, default=0.5, help="seconds per completion")
+    parser.add_argument("--pexels-latency", type=float, default=0.1, help="seconds per search")
+    parser.add_argument("--download-latency", type=float, default=0.05, help="seconds before a download starts")
+    parser.add_argument("--bandwidth-mbps", type=float, default=0.0, help="download bandwidth (0 = unlimited)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fixtures", help="directory for the fixture photos (default: a temporary one)")
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--verbose", action="store_true", help="show the pipeline log")
+    args = parser.parse_args()
+
+    limits = [0] + [int(value) for value in args.in_flight.split(",") if value.strip()]
+    context = get_context("spawn")
+    with tempfile.TemporaryDirectory() as tempdir:
+        connection, server_end = context.Pipe()
+        server_options = {**vars(args), "renditions": False}
+        server = context.Process(target=_serve_pexels, args=(args.fixtures or os.path.join(tempdir, "fixtures"), server_options, server_end))
+        server.start()
+        try:
+            pexels_base_url = connection.recv()
+            results = []
+            for in_flight in limits:
+                options = {**vars(args), "in_flight": in_flight, "pexels_base_url": pexels_base_url,
+                           "workdir": os.path.join(tempdir, f"mode{in_flight}")}
+                results.append(_run_in_fresh_process(context, options))
+            connection.send("stop")
+            connection.recv()
+        finally:
+            server.join(timeout=10)
+            if server.is_alive(): server.terminate()
+
+    print(f"\n🧠 {args.days} day(s) of posts from full-size originals, consumer {args.consumer_latency}s per post")
+    print(f"   {'mode':<26}{'posts':>6}{'time':>9}{'peak RSS':>12}{'growth':>10}")
+    for result in results:
+        print(f"   {result['mode']:<26}{result['posts']:>6}{result['seconds']:>8.2f}s"
+              f"{result['peak_rss_mb']:>9.1f} MB{result['rss_growth_mb']:>7.1f} MB")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"options": vars(args), "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+# /benchmarks/offline_fakes.py
+"""
+Deterministic local stand-ins for the external services, used by the benchmarks:
+FakeOpenAIClient replaces the OpenAI SDK client, FakePexelsServer serves the Pexels search API
+and image CDN over local HTTP (point PEXELS_API_BASE_URL at it), and make_fixture_photos writes
+photos of realistic sizes for it to serve. Instagram is covered by StubInstagramClient in
+platform_services. Every fake takes an injected latency, and the same inputs always produce
+the same outputs.
+"""
+
+import os
+import io
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+from types import SimpleNamespace
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Large landscape and portrait originals, a mid-size photo and one smaller than a post
+# (which gets the "original" rendition and is upscaled by the renderer).
+FIXTURE_SIZES = ((6000, 4000), (4000, 6000), (1920, 1280), (800, 1200))
+PHOTOS_PER_SEARCH = 15
+
+COLORS = ("Gold", "Sea Green", "Indigo", "Coral", "Silver", "Amethyst", "Emerald", "Crimson")
+MOODS = ("Confident", "Reflective", "Playful", "Grounded", "Curious", "Serene")
+
+def _digest(*parts) -> int:
+    return int(hashlib.sha256(":".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:12], 16)
+
+# --- Fixture photos ---
+def make_fixture_photos(directory: str, sizes=FIXTURE_SIZES, seed: int = 0) -> list[str]:
+    """Writes one noisy, photo-like JPEG per size (reused if already there) and returns their paths."""
+    from PIL import Image
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for index, (width, height) in enumerate(sizes):
+        path = os.path.join(directory, f"fixture_{index}_{width}x{height}.jpg")
+        if not os.path.exists(path):
+            # Seeded low-resolution noise scaled up: smooth enough to look like a photo, busy enough to cost a real decode
+            tile_size = (max(1, width // 16), max(1, height // 16))
+            noise = random.Random(seed + index).randbytes(tile_size[0] * tile_size[1] * 3)
+            tile = Image.frombytes("RGB", tile_size, noise)
+            tile.resize((width, height), Image.Resampling.BICUBIC).save(path, "JPEG", quality=92)
+        paths.append(path)
+    return paths
+
+# --- OpenAI ---
+class FakeOpenAIClient:
+    """
+    Answers chat.completions.create like gpt-4o in JSON mode would for this project's prompts:
+    batched and single-sign horoscopes, and captions. Content and token usage are derived
+    from the prompt, so identical prompts get identical answers.
+    """
+    def __init__(self, latency: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.seed = seed
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model: str, messages: list, temperature: float | None = None, response_format: dict | None = None, **kwargs):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        prompt = messages[-1]["content"]
+        batch = re.search(r"EACH of these zodiac signs: ([a-z, ]+)\.", prompt)
+        single = re.search(r"for the zodiac sign: (\w+)\.", prompt)
+        if batch:
+            payload = {sign.strip(): self._horoscope(sign.strip()) for sign in batch.group(1).split(",")}
+        elif single:
+            payload = self._horoscope(single.group(1).lower())
+        else:
+            payload = {
+                "caption": "The cosmos is whispering something beautiful today. Lean in and listen. ✨",
+                "hashtags": ["#astrology", "#horoscope", "#planetsvibe", "#zodiac", "#dailyhoroscope"]
+            }
+        content = json.dumps(payload)
+        usage = SimpleNamespace(prompt_tokens=len(prompt) // 4, completion_tokens=len(content) // 4)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=usage)
+
+    def _horoscope(self, sign: str) -> dict:
+        value = _digest(self.seed, sign)
+        return {
+            "description": f"The planets line up in favour of {sign.capitalize()} today. "
+                           f"Trust the quiet voice that has been guiding you, and let the small wins add up.",
+            "mood": MOODS[value % len(MOODS)],
+            "lucky_number": value % 100 + 1,
+            "color": COLORS[(value // 7) % len(COLORS)]
+        }
+
+# --- Pexels ---
+class FakePexelsServer:
+    """
+    Local HTTP server with the two Pexels endpoints the pipeline uses: GET /v1/search and the
+    image CDN. Search results cycle through the fixture photos; a download with the w/h crop
+    parameters gets the post-sized rendition, like images.pexels.com, unless renditions is off
+    (every download is then the full original). Use as a context manager.
+    """
+    def __init__(self, photo_paths: list[str], search_latency: float = 0.0, download_latency: float = 0.0,
+                 bandwidth_mbps: float | None = None, renditions: bool = True, host: str = "127.0.0.1"):
+        from PIL import Image
+        self.search_latency = search_latency
+        self.download_latency = download_latency
+        self.bytes_per_second = bandwidth_mbps * 1_000_000 / 8 if bandwidth_mbps else None
+        self.renditions = renditions
+        self._photos = []
+        for path in photo_paths:
+            with Image.open(path) as img:
+                size = img.size
+            with open(path, "rb") as f:
+                self._photos.append({"bytes": f.read(), "path": path, "size": size})
+        self._renditions = {}
+        self._lock = threading.Lock()
+        self.stats = {"searches": 0, "downloads": 0, "bytes_sent": 0}
+        self._server = ThreadingHTTPServer((host, 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_url(self) -> str:
+        """The value for PEXELS_API_BASE_URL."""
+        return f"{self.url}/v1"
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-pexels", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    # --- Responses ---
+    def _search(self, query: str) -> dict:
+        first = _digest(query)
+        photos = []
+        for offset in range(PHOTOS_PER_SEARCH):
+            photo_id = (first + offset) % 1_000_000
+            width, height = self._photos[photo_id % len(self._photos)]["size"]
+            photos.append({"id": photo_id, "width": width, "height": height,
+                           "src": {"original": f"{self.url}/photos/{photo_id}.jpg"}})
+        return {"page": 1, "per_page": PHOTOS_PER_SEARCH, "photos": photos}
+
+    def _photo(self, photo_id: int, params: dict) -> bytes:
+        photo = self._photos[photo_id % len(self._photos)]
+        if not self.renditions or "w" not in params or "h" not in params:
+            return photo["bytes"]
+        size = (int(params["w"][0]), int(params["h"][0]))
+        key = (photo["path"], size)
+        with self._lock:
+            if key not in self._renditions:
+                from PIL import Image, ImageOps
+                with Image.open(photo["path"]) as img:
+                    buffer = io.BytesIO()
+                    ImageOps.fit(img.convert("RGB"), size, Image.Resampling.LANCZOS).save(buffer, "JPEG", quality=80)
+                self._renditions[key] = buffer.getvalue()
+            return self._renditions[key]
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                params = parse_qs(parts.query)
+                photo = re.fullmatch(r"/photos/(\d+)\.jpg", parts.path)
+                if parts.path == "/v1/search":
+                    time.sleep(server.search_latency)
+                    body = json.dumps(server._search(params.get("query", [""])[0])).encode("utf-8")
+                    self._send(body, "application/json", "searches")
+                elif photo:
+                    time.sleep(server.download_latency)
+                    self._send(server._photo(int(photo.group(1)), params), "image/jpeg", "downloads")
+                else:
+                    self.send_error(404)
+
+            def _send(self, body: bytes, content_type: str, counter: str):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                # Paced in 64 KB chunks when a bandwidth is set
+                for start in range(0, len(body), 65536):
+                    chunk = body[start:start + 65536]
+                    if server.bytes_per_second:
+                        time.sleep(len(chunk) / server.bytes_per_second)
+                    self.wfile.write(chunk)
+                with server._lock:
+                    server.stats[counter] += 1
+                    server.stats["bytes_sent"] += len(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,201 @@
+# /cli.py
+"""
+Headless entry point for workers, cron jobs and containers.
+
+  python cli.py generate [--date 2025-01-31]       generate and journal the text of all 12 signs
+  python cli.py render   [--date 2025-01-31]       render the carousel and stage it for publishing
+  python cli.py publish  [--date 2025-01-31]       publish the staged carousel (generated on the spot if missing)
+                         [--accounts all|a,b]      ...to several accounts of instagram_accounts.json instead
+  python cli.py backfill --days 7 [--start ...]    render and stage the carousels of several days
+
+Common options: --concurrency N, --render-processes N, --max-in-flight N (signs in progress at once,
+bounds peak memory), --dry-run (never touches Instagram),
+--fresh-content (asks OpenAI again instead of reusing cached responses or the text journaled for the day),
+--summary PATH (machine-readable JSON summary; "-" prints it to stdout and the log to stderr).
+The exit code is 0 only if every date succeeded.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+from datetime import date, datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from config import print_diagnostics
+from orchestration.main_orchestrator import MainOrchestrator
+from orchestration.run_state_store import RunStateStore
+from core_services.outbound_client_service import get_outbound_stats
+from core_services.telemetry import get_telemetry
+from platform_services.carousel_publisher import CarouselPublisher
+from platform_services.instagram_stub_client import StubInstagramClient
+
+def _summarize_posts(posts: list) -> list[dict]:
+    return [{"sign": post['sign'], "path": post['path']} for post in posts]
+
+def _generate(orchestrator: MainOrchestrator, run_date: date, args) -> dict:
+    astro_data = orchestrator.prepare_astro_data(run_date)
+    return {"status": "ok" if len(astro_data) == 12 else "failed", "signs": sorted(astro_data)}
+
+def _render(orchestrator: MainOrchestrator, run_date: date, args) -> dict:
+    manifest = orchestrator.stage_carousel_post(run_date)
+    if not manifest:
+        return {"status": "failed", "posts": []}
+    return {"status": "ok", "posts": _summarize_posts(manifest['posts'])}
+
+def _publish(orchestrator: MainOrchestrator, run_date: date, args) -> dict:
+    if args.accounts:
+        return _publish_to_accounts(orchestrator, run_date, args)
+    if RunStateStore(run_date).is_published():
+        return {"status": "already_published", "posts": []}
+    if args.dry_run:
+        # Everything up to the upload: reuse the staged carousel or stage one now
+        manifest = orchestrator.staging.load(run_date) or orchestrator.stage_carousel_post(run_date)
+        if not manifest:
+            return {"status": "failed", "posts": []}
+        # The upload path runs against the local stub: nothing is journaled and Instagram is never contacted
+        stub = StubInstagramClient()
+        uploaded = CarouselPublisher(stub, configure_delay=0).publish(manifest['posts'], manifest['caption'])
+        print(f"🧪 DRY RUN: Would publish {len(manifest['posts'])} images for {run_date}; Instagram was not contacted.")
+        return {"status": "dry_run" if uploaded else "failed", "posts": _summarize_posts(manifest['posts']),
+                "caption": manifest['caption'], "stub_uploads": len(stub.uploads)}
+    published = orchestrator.publish_staged_carousel_post(run_date)
+    return {"status": "ok" if published else "failed", "posts": _summarize_posts(published)}
+
+def _publish_to_accounts(orchestrator: MainOrchestrator, run_date: date, args) -> dict:
+    names = None if args.accounts == "all" else [name.strip() for name in args.accounts.split(",") if name.strip()]
+    if args.dry_run:
+        names = names or orchestrator.account_pool.enabled_account_names()
+        print(f"🧪 DRY RUN: Would publish the carousel for {run_date} to: {', '.join(names) or 'no accounts'}.")
+        return {"status": "dry_run", "accounts": {name: None for name in names}}
+    results = orchestrator.publish_to_accounts(run_date, names)
+    return {
+        "status": "ok" if results and all(results.values()) else "failed",
+        "accounts": results,
+        "account_metrics": orchestrator.account_pool.get_metrics()
+    }
+
+COMMANDS = {"generate": _generate, "render": _render, "publish": _publish, "backfill": _render}
+
+def _dates(args) -> list[date]:
+    if args.command == "backfill":
+        return [args.start + timedelta(days=offset) for offset in range(args.days)]
+    return [args.date]
+
+def run(args) -> dict:
+    orchestrator = MainOrchestrator(concurrency=args.concurrency, render_processes=args.render_processes, max_in_flight=args.max_in_flight)
+    if args.fresh_content:
+        orchestrator.content_generator.bypass_cache = True
+    started_at = datetime.now()
+    start = time.perf_counter()
+    runs = []
+    try:
+        for run_date in _dates(args):
+            print(f"\n▶️ CLI: {args.command} for {run_date}{' (dry run)' if args.dry_run else ''}")
+            run_start = time.perf_counter()
+            try:
+                result = COMMANDS[args.command](orchestrator, run_date, args)
+            except Exception as e:
+                print(f"❌ CLI: {args.command} for {run_date} failed: {e}")
+                result = {"status": "failed", "error": str(e)}
+            result = {"date": run_date.isoformat(), **result, "seconds": round(time.perf_counter() - run_start, 2)}
+            if orchestrator.is_started("instagram_service"):
+                result["stage_timings"] = {
+                    sign: {stage: round(seconds, 2) for stage, seconds in timings.items()}
+                    for sign, timings in orchestrator.instagram_service.last_run_timings.items()
+                }
+                orchestrator.instagram_service.last_run_timings = {}
+            runs.append(result)
+    finally:
+        orchestrator.shutdown()
+
+    return {
+        "command": args.command,
+        "dry_run": args.dry_run,
+        "concurrency": orchestrator.concurrency,
+        "max_in_flight": orchestrator.max_in_flight,
+        "render_processes": orchestrator.render_processes,
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "total_seconds": round(time.perf_counter() - start, 2),
+        "ok": bool(runs) and all(run["status"] in ("ok", "dry_run", "already_published") for run in runs),
+        "runs": runs,
+        "outbound": get_outbound_stats(),
+        "openai_cache": orchestrator.content_generator.cache_stats() if orchestrator.is_started("content_generator") else None,
+        "telemetry": get_telemetry().snapshot()
+    }
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--concurrency", type=int, help="signs generated in parallel (default: GENERATION_CONCURRENCY)")
+    common.add_argument("--render-processes", type=int, help="render processes (default: RENDER_PROCESSES)")
+    common.add_argument("--max-in-flight", type=int, help="signs in progress at once; bounds peak memory (default: all 12)")
+    common.add_argument("--dry-run", action="store_true", help="never contact Instagram")
+    common.add_argument("--summary", help='write the JSON summary to this file ("-" for stdout)')
+    common.add_argument("--fresh-content", action="store_true", help="ask OpenAI again instead of reusing cached responses or the day's journaled text")
+    common.add_argument("--diagnostics", action="store_true", help="print where the config was loaded from first")
+
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for command, help_text in (("generate", "generate the text of all signs"),
+                               ("render", "render and stage the carousel"),
+                               ("publish", "publish the staged carousel")):
+        subparser = subparsers.add_parser(command, parents=[common], help=help_text)
+        subparser.add_argument("--date", type=date.fromisoformat, default=date.today(), help="YYYY-MM-DD (default: today)")
+        if command == "publish":
+            subparser.add_argument("--accounts", help='publish to accounts of the registry: "all" or a comma-separated list of names')
+    backfill = subparsers.add_parser("backfill", parents=[common], help="render and stage several days")
+    backfill.add_argument("--days", type=_positive_int, required=True)
+    backfill.add_argument("--start", type=date.fromisoformat, default=date.today(), help="first day, YYYY-MM-DD (default: today)")
+    return parser
+
+@contextlib.contextmanager
+def _stdout_to_stderr():
+    """
+    Points file descriptor 1 at stderr for the duration and yields a stream on the original stdout.
+    Redirecting at the descriptor level also covers the render worker processes, which inherit it.
+    """
+    sys.stdout.flush()
+    saved_fd = os.dup(1)
+    os.dup2(2, 1)
+    try:
+        with os.fdopen(os.dup(saved_fd), "w", encoding="utf-8") as original_stdout:
+            yield original_stdout
+    finally:
+        sys.stdout.flush()
+        os.dup2(saved_fd, 1)
+        os.close(saved_fd)
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.summary == "-":
+        # With the summary on stdout, every log line goes to stderr so the JSON stays parseable
+        with _stdout_to_stderr() as original_stdout:
+            if args.diagnostics:
+                print_diagnostics()
+            summary = run(args)
+            json.dump(summary, original_stdout, indent=2)
+            original_stdout.write("\n")
+        return 0 if summary["ok"] else 1
+
+    if args.diagnostics:
+        print_diagnostics()
+    summary = run(args)
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"📝 Summary written to {args.summary}")
+    else:
+        print(f"\n{'✅' if summary['ok'] else '❌'} {args.command} finished in {summary['total_seconds']}s: "
+              + ", ".join(f"{run['date']} {run['status']}" for run in summary['runs']))
+    return 0 if summary["ok"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,32 +3,16 @@
 import os
 from dotenv import load_dotenv
 
-# --- BULLETPROOF DEBUGGING SCRIPT ---
-# This code will tell us exactly what the program is seeing.
-
-# First, we get the absolute path of the directory where this config.py file lives.
-# This should be your main project folder.
+# The absolute path of the directory where this config.py file lives (the main project folder).
 project_directory = os.path.dirname(os.path.abspath(__file__))
 
 # The .env file should be in that same directory.
 dotenv_path = os.path.join(project_directory, '.env')
 
-print("\n\n--- DIAGNOSTICS ---")
-print(f"Directory where I'm running from: {project_directory}")
-print(f"Full path where I expect .env to be: {dotenv_path}")
-
-# Check if the file actually exists at that path
-file_exists = os.path.exists(dotenv_path)
-print(f"Does the .env file exist at that path? -> {file_exists}")
-
-if file_exists:
-    # If the file exists, try to load it and check the result
-    load_was_successful = load_dotenv(dotenv_path=dotenv_path)
-    print(f"Did the dotenv library load it successfully? -> {load_was_successful}")
-else:
-    print("CRITICAL: I could not find the .env file. Please check its location and name.")
-    
-print("--- END DIAGNOSTICS ---\n\n")
+# Importing the config has no other side effects: nothing is printed and missing keys don't raise,
+# so scripts, benchmarks and tests can import any module without credentials.
+# Call print_diagnostics() to see what was loaded and require_api_keys() where the keys are needed.
+env_file_loaded = load_dotenv(dotenv_path=dotenv_path)
 
 
 # --- API Keys Reading ---
@@ -39,6 +23,113 @@ INSTAGRAM_ACCESS_TOKEN = os.environ.get("INSTAGRAM_ACCESS_TOKEN")
 INSTAGRAM_BUSINESS_ACCOUNT_ID = os.environ.get("INSTAGRAM_BUSINESS_ACCOUNT_ID")
 
 
-# --- Final Error Check ---
-if not OPENAI_API_KEY or not PEXELS_API_KEY:
-    raise ValueError("API keys for OpenAI or Pexels are not set in the environment.")
+# --- Pipeline Settings ---
+# Maximum number of zodiac signs generated in parallel (1 = sequential).
+GENERATION_CONCURRENCY = int(os.environ.get("GENERATION_CONCURRENCY", "6"))
+# Streaming runs keep at most this many signs in flight (being generated, or finished but not yet
+# taken by the consumer), so their peak memory doesn't grow with the number of signs or days.
+STREAM_MAX_IN_FLIGHT = int(os.environ.get("STREAM_MAX_IN_FLIGHT", "2"))
+# Number of processes that render post images (1 = render on the calling thread).
+RENDER_PROCESSES = int(os.environ.get("RENDER_PROCESSES", str(min(4, os.cpu_count() or 1))))
+# File format of the rendered posts (JPEG, PNG or WEBP) and the JPEG/WebP quality.
+POST_OUTPUT_FORMAT = os.environ.get("POST_OUTPUT_FORMAT", "JPEG")
+POST_OUTPUT_QUALITY = int(os.environ.get("POST_OUTPUT_QUALITY", "90"))
+# Also keep a WebP copy of every post in ARCHIVE_DIR.
+POST_ARCHIVE_WEBP = os.environ.get("POST_ARCHIVE_WEBP", "false").lower() in ("1", "true", "yes")
+ARCHIVE_DIR = os.environ.get("ARCHIVE_DIR", os.path.join(project_directory, "generated_posts", "archive"))
+# Extra formats rendered with every post from the same decode, e.g. "story,square" (1080x1920, 1080x1080).
+# The carousel always uses the 1080x1350 portrait.
+POST_EXTRA_VARIANTS = tuple(name.strip() for name in os.environ.get("POST_EXTRA_VARIANTS", "").split(",") if name.strip())
+
+# Every generation run gets its own folder under RUNS_DIR; only the newest RUNS_TO_KEEP are kept.
+RUNS_DIR = os.environ.get("RUNS_DIR", os.path.join(project_directory, "generated_posts", "runs"))
+RUNS_TO_KEEP = int(os.environ.get("RUNS_TO_KEEP", "14"))
+# Per-day journals of completed stages, used to resume interrupted or partially failed runs.
+RUN_STATE_DIR = os.environ.get("RUN_STATE_DIR", os.path.join(project_directory, "run_state"))
+
+
+# --- Automation Settings ---
+# The scheduler renders the carousel this many hours before the publish time (0 = generate at publish time).
+PREFETCH_LEAD_HOURS = float(os.environ.get("PREFETCH_LEAD_HOURS", "3"))
+# Staged carousels waiting for their publish time, and how old they may get before being regenerated
+# (counted from the start of their publish date, or from staging if that was later).
+STAGING_DIR = os.environ.get("STAGING_DIR", os.path.join(project_directory, "generated_posts", "staged"))
+STAGING_MAX_AGE_HOURS = float(os.environ.get("STAGING_MAX_AGE_HOURS", "36"))
+# Last completed slot of every scheduled job, used to detect runs missed during downtime.
+SCHEDULER_STATE_DIR = os.environ.get("SCHEDULER_STATE_DIR", os.path.join(project_directory, "scheduler_state"))
+
+
+# --- Instagram Accounts ---
+# Registry of the brand accounts a carousel can be published to, and the folder holding their sessions.
+# The single-account flow (the dashboard login) keeps using instagram_session.json.
+INSTAGRAM_ACCOUNTS_FILE = os.environ.get("INSTAGRAM_ACCOUNTS_FILE", os.path.join(project_directory, "instagram_accounts.json"))
+INSTAGRAM_SESSIONS_DIR = os.environ.get("INSTAGRAM_SESSIONS_DIR", os.path.join(project_directory, "instagram_sessions"))
+# How many accounts publish at the same time, and the default number of carousel items uploaded
+# in parallel per account (across every publish to that account, whatever CAROUSEL_UPLOAD_WORKERS is).
+ACCOUNT_PUBLISH_CONCURRENCY = int(os.environ.get("ACCOUNT_PUBLISH_CONCURRENCY", "4"))
+ACCOUNT_MAX_CONCURRENT_UPLOADS = int(os.environ.get("ACCOUNT_MAX_CONCURRENT_UPLOADS", "3"))
+
+# Carousel items are uploaded by this many threads as soon as they are rendered; the album is
+# configured once all are in. Journaled upload IDs older than the max age are uploaded again.
+CAROUSEL_UPLOAD_WORKERS = int(os.environ.get("CAROUSEL_UPLOAD_WORKERS", "3"))
+CAROUSEL_UPLOAD_MAX_AGE_HOURS = float(os.environ.get("CAROUSEL_UPLOAD_MAX_AGE_HOURS", "12"))
+CAROUSEL_CONFIGURE_ATTEMPTS = int(os.environ.get("CAROUSEL_CONFIGURE_ATTEMPTS", "5"))
+CAROUSEL_CONFIGURE_DELAY_SECONDS = float(os.environ.get("CAROUSEL_CONFIGURE_DELAY_SECONDS", "3"))
+
+
+# --- Outbound API Limits ---
+# Requests are paced by a token bucket per API and transient failures (429/5xx, timeouts) are retried.
+OPENAI_REQUESTS_PER_MINUTE = float(os.environ.get("OPENAI_REQUESTS_PER_MINUTE", "500"))
+OPENAI_TIMEOUT_SECONDS = float(os.environ.get("OPENAI_TIMEOUT_SECONDS", "60"))
+# Pexels allows 200 API requests per hour by default.
+PEXELS_REQUESTS_PER_HOUR = float(os.environ.get("PEXELS_REQUESTS_PER_HOUR", "200"))
+PEXELS_TIMEOUT_SECONDS = float(os.environ.get("PEXELS_TIMEOUT_SECONDS", "30"))
+# Point this at a local fake server to exercise the Pexels client offline.
+PEXELS_API_BASE_URL = os.environ.get("PEXELS_API_BASE_URL", "https://api.pexels.com/v1")
+OUTBOUND_MAX_ATTEMPTS = int(os.environ.get("OUTBOUND_MAX_ATTEMPTS", "5"))
+
+
+# --- Cache Settings ---
+# Root folder of the on-disk caches (Pexels searches, downloaded images, ...).
+CACHE_DIR = os.environ.get("CACHE_DIR", os.path.join(project_directory, "cache"))
+# Size cap of each cache namespace, in megabytes. Least recently used entries are evicted first.
+CACHE_MAX_MB = float(os.environ.get("CACHE_MAX_MB", "500"))
+# How long a Pexels search result stays valid.
+PEXELS_SEARCH_TTL_SECONDS = int(os.environ.get("PEXELS_SEARCH_TTL_SECONDS", str(7 * 24 * 3600)))
+# OpenAI responses are reused for the same prompt on the same day (retries, previews, other accounts).
+OPENAI_CACHE_ENABLED = os.environ.get("OPENAI_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+OPENAI_CACHE_TTL_SECONDS = int(os.environ.get("OPENAI_CACHE_TTL_SECONDS", str(2 * 24 * 3600)))
+OPENAI_CACHE_MAX_MB = float(os.environ.get("OPENAI_CACHE_MAX_MB", "50"))
+
+
+# --- Telemetry Settings ---
+# Spans go to a JSON-lines event log; counters and latency histograms to a Prometheus text file.
+TELEMETRY_ENABLED = os.environ.get("TELEMETRY_ENABLED", "true").lower() in ("1", "true", "yes")
+TELEMETRY_LOG_FILE = os.environ.get("TELEMETRY_LOG_FILE", os.path.join(project_directory, "telemetry", "events.jsonl"))
+# Past this size the event log is moved to <file>.1 (replacing the previous one) and started afresh; 0 = never rotate.
+TELEMETRY_LOG_MAX_MB = float(os.environ.get("TELEMETRY_LOG_MAX_MB", "50"))
+TELEMETRY_PROMETHEUS_FILE = os.environ.get("TELEMETRY_PROMETHEUS_FILE", os.path.join(project_directory, "telemetry", "metrics.prom"))
+
+
+# --- Checks ---
+REQUIRED_API_KEYS = ("OPENAI_API_KEY", "PEXELS_API_KEY")
+
+def missing_api_keys() -> list[str]:
+    """Names of the required API keys that are not set."""
+    return [name for name in REQUIRED_API_KEYS if not globals().get(name)]
+
+def require_api_keys():
+    """Raises ValueError if a key needed for content generation is missing."""
+    if missing_api_keys():
+        raise ValueError("API keys for OpenAI or Pexels are not set in the environment.")
+
+def print_diagnostics():
+    """Prints where the config was loaded from and which keys are missing."""
+    print("\n--- DIAGNOSTICS ---")
+    print(f"Directory where I'm running from: {project_directory}")
+    print(f"Full path where I expect .env to be: {dotenv_path}")
+    print(f"Does the .env file exist at that path? -> {os.path.exists(dotenv_path)}")
+    print(f"Did the dotenv library load it successfully? -> {env_file_loaded}")
+    missing = missing_api_keys()
+    print(f"Missing API keys: {', '.join(missing) if missing else 'none'}")
+    print("--- END DIAGNOSTICS ---\n")
@@ -2,23 +2,59 @@
 
 import os
 import json
-from openai import OpenAI
-from config import OPENAI_API_KEY
+import threading
+from datetime import date
+from config import OPENAI_API_KEY, OPENAI_TIMEOUT_SECONDS, OPENAI_CACHE_ENABLED, OPENAI_CACHE_TTL_SECONDS, OPENAI_CACHE_MAX_MB
+from core_services.outbound_client_service import get_outbound_client
+from core_services.disk_cache_service import DiskCacheService
+from core_services.telemetry import get_telemetry
+
+# Keys every astrology data entry must contain, with the type they are coerced to.
+ASTRO_DATA_SCHEMA = {"description": str, "mood": str, "lucky_number": int, "color": str}
+
+OPENAI_MODEL = "gpt-4o"
+OPENAI_TEMPERATURE = 0.8
+SYSTEM_PROMPT = "You are a creative astrology social media expert."
 
 class ContentGeneratorService:
-    def __init__(self):
+    def __init__(self, use_cache: bool = OPENAI_CACHE_ENABLED):
+        # Same model, prompt, temperature and day -> the stored response, until its TTL runs out.
+        # Set bypass_cache (or pass fresh=True) for new creative output; the new response replaces the stored one.
+        self.response_cache = DiskCacheService("openai_responses", max_mb=OPENAI_CACHE_MAX_MB) if use_cache else None
+        self.bypass_cache = False
+        self.saved_tokens = {"prompt": 0, "completion": 0}
+        self._saved_lock = threading.Lock()
         if not OPENAI_API_KEY:
             self.client = None
             print("❌ Critical Error: OPENAI_API_KEY not found in config.py.")
             return
         try:
-            self.client = OpenAI(api_key=OPENAI_API_KEY)
+            # Imported here: the SDK takes most of a second to import and only this service needs it
+            from openai import OpenAI
+            # Retries are handled by the shared outbound layer so they respect our rate limit
+            self.client = OpenAI(api_key=OPENAI_API_KEY, max_retries=0, timeout=OPENAI_TIMEOUT_SECONDS)
+            self.outbound = get_outbound_client("openai")
+            self.telemetry = get_telemetry()
             print("✅ OpenAI client for Astrology configured successfully.")
         except Exception as e:
             self.client = None
             print(f"❌ Critical Error configuring OpenAI client: {e}")
 
-    def generate_astrology_data(self, zodiac_sign: str) -> dict | None:
+    def health_check(self) -> dict:
+        if not self.client:
+            return {"ok": False, "detail": "OpenAI client is not configured (check OPENAI_API_KEY)."}
+        return {"ok": True, "detail": "OpenAI client configured." + (" Responses are cached per day." if self.response_cache else "")}
+
+    def cache_stats(self) -> dict:
+        """Hits and misses of the response cache and the tokens the hits saved."""
+        if not self.response_cache: return {"enabled": False}
+        stats = self.response_cache.stats()
+        with self._saved_lock:
+            saved = dict(self.saved_tokens)
+        return {"enabled": True, "hits": stats["hits"], "misses": stats["misses"], "entries": stats["entries"],
+                "saved_prompt_tokens": saved["prompt"], "saved_completion_tokens": saved["completion"]}
+
+    def generate_astrology_data(self, zodiac_sign: str, run_date: date | None = None, fresh: bool = False) -> dict | None:
         print(f"   - 🔮 Generating daily astrological data for {zodiac_sign}...")
         prompt = f"""
         You are a creative, insightful, and positive astrologer for a brand called "Planets Vibe".
@@ -31,16 +67,88 @@ class ContentGeneratorService:
         - "color": A lucky color for the day (e.g., "Sea Green", "Gold").
         """
         try:
-            json_string = self._generate_content_with_openai(prompt)
+            json_string = self._generate_content_with_openai(
+                prompt, run_date, fresh, validate=lambda payload: self._validate_astrology_data(payload, zodiac_sign)
+            )
             if not json_string: return None
-            data = json.loads(json_string)
-            data['sign'] = zodiac_sign
+            data = self._validate_astrology_data(json.loads(json_string), zodiac_sign)
+            if not data: raise ValueError("response does not match the expected schema")
             return data
         except Exception as e:
             print(f"   - ❌ Failed to generate astrology data for {zodiac_sign}: {e}")
             return None
 
-    def create_astrology_caption(self, astro_data: dict) -> str:
+    def generate_astrology_data_batch(self, zodiac_signs: list[str], fallback_to_single: bool = True,
+                                      run_date: date | None = None, fresh: bool = False) -> dict:
+        """
+        Generates the daily data of several signs with a single completion.
+        Returns {sign: data}. Signs that are missing or malformed in the response are
+        requested one by one when fallback_to_single is set, otherwise left out.
+        """
+        signs = [sign.lower() for sign in zodiac_signs]
+        print(f"   - 🔮 Generating daily astrological data for {len(signs)} signs in one request...")
+        prompt = f"""
+        You are a creative, insightful, and positive astrologer for a brand called "Planets Vibe".
+        Generate a fictional but believable daily horoscope for EACH of these zodiac signs: {", ".join(signs)}.
+        The output MUST be a single, valid JSON object with NO other text or explanations.
+        The JSON object must have exactly one key per sign, spelled in lowercase as listed above.
+        The value for each sign must be an object with these exact keys:
+        - "description": A 1-2 sentence inspiring horoscope for the day.
+        - "mood": A single word describing the primary mood (e.g., "Confident", "Reflective").
+        - "lucky_number": A random number between 1 and 100.
+        - "color": A lucky color for the day (e.g., "Sea Green", "Gold").
+        Every sign must get its own, distinct horoscope.
+        """
+        results = {}
+        try:
+            # Only a batch with a valid entry for every sign is cached; the fallback caches single signs itself
+            json_string = self._generate_content_with_openai(
+                prompt, run_date, fresh, validate=lambda payload: self._validate_astrology_batch(payload, signs)
+            )
+            payload = json.loads(json_string) if json_string else {}
+            entries = {str(key).strip().lower(): value for key, value in payload.items()}
+            for sign in signs:
+                data = self._validate_astrology_data(entries.get(sign), sign)
+                if data: results[sign] = data
+        except Exception as e:
+            print(f"   - ❌ Batched astrology request failed: {e}")
+
+        missing = [sign for sign in signs if sign not in results]
+        if missing:
+            print(f"   - ⚠️ Batch response missing or malformed for: {', '.join(missing)}.")
+            if fallback_to_single:
+                for sign in missing:
+                    data = self.generate_astrology_data(sign, run_date, fresh)
+                    if data: results[sign] = data
+        return results
+
+    @classmethod
+    def _validate_astrology_batch(cls, payload, zodiac_signs: list[str]) -> bool:
+        if not isinstance(payload, dict): return False
+        entries = {str(key).strip().lower(): value for key, value in payload.items()}
+        return all(cls._validate_astrology_data(entries.get(sign), sign) for sign in zodiac_signs)
+
+    @staticmethod
+    def _validate_astrology_data(entry, zodiac_sign: str) -> dict | None:
+        """Checks an entry against ASTRO_DATA_SCHEMA. Returns a cleaned copy tagged with the sign, or None."""
+        if not isinstance(entry, dict): return None
+        data = {}
+        for key, expected_type in ASTRO_DATA_SCHEMA.items():
+            value = entry.get(key)
+            if value is None or isinstance(value, (dict, list)): return None
+            try:
+                value = expected_type(value)
+            except (TypeError, ValueError):
+                return None
+            if expected_type is str:
+                value = value.strip()
+                if not value: return None
+            data[key] = value
+        if not 1 <= data['lucky_number'] <= 100: return None
+        data['sign'] = zodiac_sign
+        return data
+
+    def create_astrology_caption(self, astro_data: dict, run_date: date | None = None, fresh: bool = False) -> str:
         print("   - ✍️ Crafting an engaging astrology caption...")
         prompt = f"""
         You are the social media manager for "Planets Vibe". Your tone is mystical and positive.
@@ -59,7 +167,9 @@ class ContentGeneratorService:
         }}
         """
         try:
-            json_string = self._generate_content_with_openai(prompt)
+            json_string = self._generate_content_with_openai(
+                prompt, run_date, fresh, validate=lambda payload: isinstance(payload, dict) and isinstance(payload.get('caption'), str)
+            )
             if not json_string: raise Exception("API returned empty response")
             data = json.loads(json_string)
             final_caption = data.get('caption', astro_data.get('description'))
@@ -69,18 +179,89 @@ class ContentGeneratorService:
             print(f"   - ❌ Error generating caption: {e}. Falling back to default.")
             return f"{astro_data.get('description')}\n\n#astrology #horoscope #{astro_data.get('sign')}"
 
-    def _generate_content_with_openai(self, prompt):
+    def _generate_content_with_openai(self, prompt, run_date: date | None = None, fresh: bool = False, validate=None):
+        """
+        Returns the JSON text of the completion for prompt. validate(parsed JSON) decides whether a
+        response may be cached; a cached response it rejects is deleted and requested again.
+        """
         if not self.client: return None
+        cache_key = self._cache_key(prompt, run_date)
+        if self.response_cache and not (fresh or self.bypass_cache):
+            cached = self.response_cache.get_json(cache_key, OPENAI_CACHE_TTL_SECONDS)
+            if cached and self._is_valid(cached.get("content"), validate):
+                self._record_saved_tokens(cached.get("usage") or {})
+                return cached["content"]
+            if cached:
+                self._forget_response(cache_key)
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": "You are a creative astrology social media expert."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.8,
-                response_format={"type": "json_object"}
-            )
-            return response.choices[0].message.content.strip()
+            with self.telemetry.span("openai.chat", model=OPENAI_MODEL) as span:
+                response = self.outbound.call(
+                    self.client.chat.completions.create,
+                    model=OPENAI_MODEL,
+                    messages=[
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=OPENAI_TEMPERATURE,
+                    response_format={"type": "json_object"}
+                )
+                usage = self._record_usage(span, response)
+            content = response.choices[0].message.content.strip()
         except Exception as e:
             print(f"❌ Error during OpenAI API call: {e}"); return None
+        if self._is_valid(content, validate):
+            self._store_response(cache_key, content, usage)
+        else:
+            # Not replayed for the rest of the day: the next attempt asks OpenAI again
+            self._forget_response(cache_key)
+        return content
+
+    @staticmethod
+    def _cache_key(prompt: str, run_date: date | None) -> str:
+        # Whitespace-normalized, so re-indenting a prompt template doesn't invalidate the cache;
+        # the day is part of the key because every prompt asks for that day's horoscope
+        normalized = " ".join(prompt.split())
+        bucket = (run_date or date.today()).isoformat()
+        return json.dumps([OPENAI_MODEL, SYSTEM_PROMPT, normalized, OPENAI_TEMPERATURE, bucket])
+
+    @staticmethod
+    def _is_valid(content, validate) -> bool:
+        """Whether content is well-formed JSON that validate (if given) accepts."""
+        try:
+            payload = json.loads(content)
+        except (TypeError, ValueError):
+            return False
+        try:
+            return validate is None or bool(validate(payload))
+        except Exception:
+            return False
+
+    def _store_response(self, cache_key: str, content: str, usage: dict):
+        if not self.response_cache: return
+        try:
+            self.response_cache.set_json(cache_key, {"content": content, "usage": usage})
+        except OSError as e:
+            print(f"⚠️ Could not cache the OpenAI response: {e}")
+
+    def _forget_response(self, cache_key: str):
+        if not self.response_cache: return
+        try:
+            self.response_cache.delete_json(cache_key)
+        except OSError as e:
+            print(f"⚠️ Could not remove the cached OpenAI response: {e}")
+
+    def _record_usage(self, span: dict, response) -> dict:
+        """Adds the token usage of a completion to its span and to the token counters. Returns it."""
+        usage = getattr(response, "usage", None)
+        if not usage: return {}
+        span["prompt_tokens"], span["completion_tokens"] = usage.prompt_tokens, usage.completion_tokens
+        self.telemetry.inc("openai_tokens_total", usage.prompt_tokens, kind="prompt")
+        self.telemetry.inc("openai_tokens_total", usage.completion_tokens, kind="completion")
+        return {"prompt": usage.prompt_tokens, "completion": usage.completion_tokens}
+
+    def _record_saved_tokens(self, usage: dict):
+        with self._saved_lock:
+            for kind in self.saved_tokens:
+                self.saved_tokens[kind] += usage.get(kind, 0)
+        for kind in self.saved_tokens:
+            self.telemetry.inc("openai_cache_saved_tokens_total", usage.get(kind, 0), kind=kind)
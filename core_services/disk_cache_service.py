@@ -0,0 +1,152 @@
+# /core_services/disk_cache_service.py
+
+import os
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import threading
+from config import CACHE_DIR, CACHE_MAX_MB
+from core_services.telemetry import get_telemetry
+
+class DiskCacheService:
+    """
+    A persistent, size-capped cache on local disk.
+    Entries are stored under the SHA-256 of their key, either as JSON values (with a TTL)
+    or as files. The least recently used entries are evicted once the namespace grows
+    past max_bytes.
+    """
+    def __init__(self, namespace: str, cache_dir: str = CACHE_DIR, max_mb: float = CACHE_MAX_MB):
+        self.namespace = namespace
+        self.directory = os.path.join(cache_dir, namespace)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    # --- JSON values ---
+    def get_json(self, key: str, ttl_seconds: float | None = None):
+        """Returns the cached value for key, or None when it is missing or older than ttl_seconds."""
+        path = self._path_for(key, ".json")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return self._record_miss()
+
+        if ttl_seconds is not None and time.time() - entry.get("stored_at", 0) > ttl_seconds:
+            return self._record_miss()
+        self._touch(path)
+        return self._record_hit(entry.get("value"))
+
+    def set_json(self, key: str, value) -> None:
+        path = self._path_for(key, ".json")
+        temp_path = self._temp_path_for(path)
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "stored_at": time.time(), "value": value}, f)
+        os.replace(temp_path, path)
+        self._evict()
+
+    def delete_json(self, key: str) -> None:
+        try:
+            os.remove(self._path_for(key, ".json"))
+        except FileNotFoundError:
+            pass
+
+    # --- Files ---
+    def get_file(self, key: str, suffix: str = "") -> str | None:
+        """Returns the path of the cached file for key, or None."""
+        path = self._path_for(key, suffix)
+        if not os.path.exists(path):
+            return self._record_miss()
+        self._touch(path)
+        return self._record_hit(path)
+
+    def reserve_temp_file(self, key: str, suffix: str = "") -> str:
+        """Returns a unique scratch path next to the entry for key; hand it to commit_file when complete."""
+        return self._temp_path_for(self._path_for(key, suffix))
+
+    def commit_file(self, key: str, temp_path: str, suffix: str = "") -> str:
+        """Atomically moves a finished scratch file into the cache and returns its final path."""
+        path = self._path_for(key, suffix)
+        os.replace(temp_path, path)
+        self._evict()
+        return path
+
+    def put_file(self, key: str, source_path: str, suffix: str = "") -> str:
+        """Copies an existing file into the cache and returns the cached path."""
+        temp_path = self.reserve_temp_file(key, suffix)
+        shutil.copyfile(source_path, temp_path)
+        return self.commit_file(key, temp_path, suffix)
+
+    # --- Stats ---
+    def stats(self) -> dict:
+        entries = self._list_entries()
+        return {
+            "namespace": self.namespace,
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries)
+        }
+
+    # --- Internals ---
+    def _path_for(self, key: str, suffix: str) -> str:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        subdirectory = os.path.join(self.directory, digest[:2])
+        os.makedirs(subdirectory, exist_ok=True)
+        return os.path.join(subdirectory, digest + suffix)
+
+    @staticmethod
+    def _temp_path_for(path: str) -> str:
+        return f"{path}.{uuid.uuid4().hex}.tmp"
+
+    @staticmethod
+    def _touch(path: str):
+        # The modification time doubles as the "last used" time for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _record_hit(self, value):
+        with self._lock:
+            self.hits += 1
+        get_telemetry().inc("cache_requests_total", namespace=self.namespace, result="hit")
+        return value
+
+    def _record_miss(self):
+        with self._lock:
+            self.misses += 1
+        get_telemetry().inc("cache_requests_total", namespace=self.namespace, result="miss")
+        return None
+
+    def _list_entries(self) -> list[tuple[str, int, float]]:
+        """Returns (path, size, last used) for every committed entry of this namespace."""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".tmp"): continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict(self):
+        """Deletes the least recently used entries until the namespace fits in max_bytes."""
+        with self._lock:
+            entries = self._list_entries()
+            total = sum(size for _, size, _ in entries)
+            if total <= self.max_bytes: return
+            for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    continue
+                if total <= self.max_bytes: break
@@ -3,86 +3,381 @@
 import os
 from PIL import Image, ImageDraw, ImageFont
 from datetime import datetime
-import textwrap
+from dataclasses import dataclass
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context
+import math
+import time
+import uuid
+import threading
+from config import ARCHIVE_DIR
+from core_services.telemetry import get_telemetry
+from core_services.text_layout import PostTemplate, TextLayoutEngine
+
+# Size of a finished Instagram portrait post.
+POST_WIDTH, POST_HEIGHT = 1080, 1350
+# Formats a post can be rendered in, all from one decode of the base image: name -> (width, height).
+POST_VARIANTS = {"portrait": (POST_WIDTH, POST_HEIGHT), "story": (1080, 1920), "square": (1080, 1080)}
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FONT_PATH = os.path.join(PROJECT_ROOT, "assets", "Fonts", "Arial.ttf")
+TITLE_FONT_SIZE, BODY_FONT_SIZE = 110, 75
+# Long texts are set smaller, down to these sizes, instead of running off the post.
+MIN_TITLE_FONT_SIZE, MIN_BODY_FONT_SIZE = 70, 45
+# Strength of the black layer that darkens the background behind the text (0-255).
+OVERLAY_ALPHA = 128
+# Supported output formats and their file extensions.
+OUTPUT_EXTENSIONS = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp"}
+
+@dataclass(frozen=True)
+class RenderJob:
+    """Picklable description of one post render, used to hand work to the render processes."""
+    base_image_path: str
+    text: str
+    title: str
+    output_dir: str = "generated_posts"
+    # Where the file is written before being renamed into output_dir (defaults to output_dir)
+    scratch_dir: str | None = None
+    # Formats to render (see POST_VARIANTS); the first one is the post itself
+    variants: tuple[str, ...] = ("portrait",)
+    # Font sizes the text auto-fit starts from; longer texts still shrink down to the minimums
+    title_size: int = TITLE_FONT_SIZE
+    body_size: int = BODY_FONT_SIZE
+
+# Per-process renderer of the pool workers, created once by _init_render_worker
+_worker_service = None
+
+def _init_render_worker(options: dict):
+    global _worker_service
+    _worker_service = ImagePostGeneratorService(**options)
+
+def _render_in_worker(job: RenderJob) -> dict | None:
+    return _worker_service.render_job(job)
+
+def _warm_up_worker() -> int:
+    return os.getpid()
 
 class ImagePostGeneratorService:
-    def __init__(self):
+    def __init__(self, fast_load: bool = True, font_path: str = FONT_PATH, render_processes: int = 1,
+                 output_format: str = "JPEG", quality: int = 90, archive_webp: bool = False, archive_dir: str = ARCHIVE_DIR):
+        # fast_load decodes JPEGs at reduced scale; False keeps the full-resolution path (used for benchmarking)
+        self.fast_load = fast_load
+        self.output_format = output_format.upper()
+        if self.output_format not in OUTPUT_EXTENSIONS:
+            raise ValueError(f"Unsupported post output format '{output_format}'. Use one of: {', '.join(OUTPUT_EXTENSIONS)}.")
+        # quality applies to JPEG and WebP output; archive_webp also keeps a compact WebP copy of every post in archive_dir
+        self.quality = int(quality)
+        self.archive_webp = archive_webp
+        self.archive_dir = archive_dir
+        if not os.path.isfile(font_path):
+            raise FileNotFoundError(f"Post font not found at '{font_path}'.")
+        self.font_path = font_path
+        # Fonts, layout engines and overlay masks are filled lazily by concurrent sign threads
+        # (with render_processes=1); reentrant because building a layout engine loads fonts
+        self._cache_lock = threading.RLock()
+        self._fonts = {}
+        # Per variant and font sizes, built on first use: the compiled text layout and the
+        # constant mask that dims the background in place when black is pasted through it
+        self._layout_engines = {}
+        self._overlay_masks = {}
+        # Warms the caches only: compiles the default portrait layout, which loads every font size it can use
+        self._layout_engine_for("portrait")
+        # With more than one process, renders are spread over a lazily started process pool.
+        # The sign threads render concurrently, so the pool is created under a lock.
+        self.render_processes = max(1, int(render_processes))
+        self._render_pool = None
+        self._render_pool_lock = threading.Lock()
+        self.telemetry = get_telemetry()
         os.makedirs("generated_posts", exist_ok=True)
+        if self.archive_webp:
+            os.makedirs(self.archive_dir, exist_ok=True)
         print("✅ Image Post Generator Service initialized.")
 
-    # --- NEW: Helper function to crop images to the perfect size ---
-    def _crop_to_instagram_portrait(self, img: Image.Image) -> Image.Image:
-        """Crops an image to a 1080x1350 aspect ratio from the center."""
-        target_width, target_height = 1080, 1350
-        target_aspect = target_width / target_height
-        
-        source_width, source_height = img.size
+    def _get_font(self, size: int) -> ImageFont.FreeTypeFont:
+        """Returns the post font at the given size, loading it only once per size."""
+        font = self._fonts.get(size)
+        if font is None:
+            with self._cache_lock:
+                if size not in self._fonts:
+                    self._fonts[size] = ImageFont.truetype(self.font_path, size=size)
+                font = self._fonts[size]
+        return font
+
+    def _layout_engine_for(self, variant: str, title_size: int = TITLE_FONT_SIZE, body_size: int = BODY_FONT_SIZE) -> TextLayoutEngine:
+        key = (variant, title_size, body_size)
+        engine = self._layout_engines.get(key)
+        if engine is None:
+            with self._cache_lock:
+                if key not in self._layout_engines:
+                    width, height = POST_VARIANTS[variant]
+                    # Compiled once: measures every font size the auto-fit can choose
+                    self._layout_engines[key] = TextLayoutEngine(PostTemplate(
+                        width=width, height=height, title_size=title_size, body_size=body_size,
+                        min_title_size=min(title_size, MIN_TITLE_FONT_SIZE), min_body_size=min(body_size, MIN_BODY_FONT_SIZE)
+                    ), self._get_font)
+                engine = self._layout_engines[key]
+        return engine
+
+    def _overlay_mask_for(self, size: tuple[int, int]) -> Image.Image:
+        mask = self._overlay_masks.get(size)
+        if mask is None:
+            with self._cache_lock:
+                if size not in self._overlay_masks:
+                    self._overlay_masks[size] = Image.new("L", size, OVERLAY_ALPHA)
+                mask = self._overlay_masks[size]
+        return mask
+
+    @staticmethod
+    def _portrait_crop_box(source_size: tuple[int, int]) -> tuple[float, float, float, float]:
+        """Returns the centered (left, top, right, bottom) box with the 1080x1350 aspect ratio."""
+        return ImagePostGeneratorService._crop_box(source_size, (POST_WIDTH, POST_HEIGHT))
+
+    @staticmethod
+    def _crop_box(source_size: tuple[int, int], target_size: tuple[int, int]) -> tuple[float, float, float, float]:
+        """Returns the centered (left, top, right, bottom) box with the aspect ratio of target_size."""
+        target_aspect = target_size[0] / target_size[1]
+        source_width, source_height = source_size
         source_aspect = source_width / source_height
 
         if source_aspect > target_aspect:
             # Image is wider than target (crop the sides)
             new_width = int(target_aspect * source_height)
             left = (source_width - new_width) / 2
-            top = 0
-            right = left + new_width
-            bottom = source_height
-        else:
-            # Image is taller than target or same aspect (crop top/bottom)
-            new_height = int(source_width / target_aspect)
-            left = 0
-            top = (source_height - new_height) / 2
-            right = source_width
-            bottom = top + new_height
-            
-        cropped_img = img.crop((left, top, right, bottom))
-        # Finally, resize to the exact dimensions
-        return cropped_img.resize((target_width, target_height), Image.Resampling.LANCZOS)
-        
-    def create_post_image(self, base_image_path: str, text: str, title: str) -> str | None:
+            return (left, 0, left + new_width, source_height)
+        # Image is taller than target or same aspect (crop top/bottom)
+        new_height = int(source_width / target_aspect)
+        top = (source_height - new_height) / 2
+        return (0, top, source_width, top + new_height)
+
+    # --- NEW: Helper function to crop images to the perfect size ---
+    def _crop_to_instagram_portrait(self, img: Image.Image) -> Image.Image:
+        """Crops an image to a 1080x1350 aspect ratio from the center."""
+        return self._crop_to_size(img, (POST_WIDTH, POST_HEIGHT))
+
+    def _crop_to_size(self, img: Image.Image, size: tuple[int, int]) -> Image.Image:
+        """Crops an image to the aspect ratio of size from the center and resizes it to size."""
+        crop_box = self._crop_box(img.size, size)
+        # Resizing straight from the crop box avoids materialising the cropped copy
+        return img.resize(size, Image.Resampling.LANCZOS, box=crop_box)
+
+    def _load_portrait(self, img: Image.Image) -> Image.Image:
+        """
+        Returns the base image cropped and resized to the post size.
+        JPEGs are decoded at the smallest 1/2, 1/4 or 1/8 scale that still covers the crop.
+        """
+        return self._crop_to_instagram_portrait(self._decode_for(img, [(POST_WIDTH, POST_HEIGHT)]))
+
+    def _decode_for(self, img: Image.Image, sizes: list[tuple[int, int]]) -> Image.Image:
+        """
+        Decodes the base image once for all target sizes. JPEGs are decoded at the smallest
+        1/2, 1/4 or 1/8 scale that still covers the crop of every size.
+        """
+        if self.fast_load and img.format == "JPEG":
+            scale = 0.0
+            for size in sizes:
+                left, top, right, bottom = self._crop_box(img.size, size)
+                scale = max(scale, size[0] / (right - left), size[1] / (bottom - top))
+            if scale < 1:
+                # draft() only picks a reduction that keeps the image at least this large
+                img.draft("RGB", (math.ceil(img.width * scale), math.ceil(img.height * scale)))
+        img.load()
+        return img
+
+    # --- Batch rendering ---
+    def render_batch(self, jobs: list[RenderJob]) -> list[str | None]:
+        """Renders every job and returns the paths of their first variants in the same order (None for failed renders)."""
+        if self.render_processes <= 1:
+            return [self.render(job) for job in jobs]
+        results = self._get_render_pool().map(_render_in_worker, jobs)
+        return [paths.get(job.variants[0]) if paths else None for job, paths in zip(jobs, results)]
+
+    def submit_render(self, job: RenderJob) -> Future:
+        """Queues one job on the render pool and returns a future of its {variant: path}."""
+        if self.render_processes <= 1:
+            future = Future()
+            future.set_result(self.render_job(job))
+            return future
+        return self._get_render_pool().submit(_render_in_worker, job)
+
+    def render(self, job: RenderJob) -> str | None:
+        """Renders one job, in a pool worker when the pool is enabled. Returns the path of its first variant."""
+        paths = self.render_variants(job)
+        return paths.get(job.variants[0]) if paths else None
+
+    def render_variants(self, job: RenderJob) -> dict | None:
+        """Renders one job, in a pool worker when the pool is enabled. Returns {variant: path}."""
+        if self.render_processes > 1:
+            return self.submit_render(job).result()
+        return self.render_job(job)
+
+    def render_job(self, job: RenderJob) -> dict | None:
+        """Renders every variant of a job in this process. Returns {variant: path}."""
+        if tuple(job.variants) == ("portrait",):
+            path = self.create_post_image(job.base_image_path, job.text, job.title, job.output_dir, job.scratch_dir,
+                                          title_size=job.title_size, body_size=job.body_size)
+            return {"portrait": path} if path else None
+        rendered = self.create_post_variants(job.base_image_path, job.text, job.title, job.variants, job.output_dir, job.scratch_dir,
+                                             title_size=job.title_size, body_size=job.body_size)
+        if not rendered: return None
+        return {name: variant["path"] for name, variant in rendered["variants"].items()}
+
+    def shutdown(self):
+        """Stops the render processes, if any were started."""
+        with self._render_pool_lock:
+            if self._render_pool:
+                self._render_pool.shutdown(wait=True)
+                self._render_pool = None
+
+    def _get_render_pool(self) -> ProcessPoolExecutor:
+        # Checked again under the lock: concurrent first renders must not each start a pool
+        if self._render_pool is not None:
+            return self._render_pool
+        with self._render_pool_lock:
+            if self._render_pool is not None:
+                return self._render_pool
+            # "spawn" keeps the workers clean: forking while the sign threads hold locks is unsafe
+            pool = ProcessPoolExecutor(
+                max_workers=self.render_processes,
+                mp_context=get_context("spawn"),
+                initializer=_init_render_worker,
+                initargs=({
+                    "fast_load": self.fast_load, "font_path": self.font_path, "output_format": self.output_format,
+                    "quality": self.quality, "archive_webp": self.archive_webp, "archive_dir": self.archive_dir
+                },)
+            )
+            # Start every worker (and load its fonts) now rather than on the first real render
+            for future in [pool.submit(_warm_up_worker) for _ in range(self.render_processes)]:
+                future.result()
+            self._render_pool = pool
+            print(f"✅ Render pool started with {self.render_processes} processes.")
+            return pool
+
+    def create_post_image(self, base_image_path: str, text: str, title: str,
+                          output_dir: str = "generated_posts", scratch_dir: str | None = None,
+                          title_size: int = TITLE_FONT_SIZE, body_size: int = BODY_FONT_SIZE) -> str | None:
         try:
-            with Image.open(base_image_path) as img:
+            with self.telemetry.span("render.post", title=title) as span:
                 # --- THIS IS THE FIX for image size ---
-                img = self._crop_to_instagram_portrait(img)
-                img = img.convert("RGBA")
-                
-                overlay = Image.new("RGBA", img.size, (0, 0, 0, 128))
-                img = Image.alpha_composite(img, overlay)
-                draw = ImageDraw.Draw(img)
-                
-                try:
-                    font_path = os.path.join("assets/fonts", "Arial.ttf")
-                    # --- THIS IS THE FIX for font size ---
-                    title_font = ImageFont.truetype(font_path, size=110) # Increased size
-                    body_font = ImageFont.truetype(font_path, size=75)   # Increased size
-                except IOError:
-                    print("⚠️ Warning: Arial.ttf not found. Using default font.")
-                    title_font = ImageFont.load_default()
-                    body_font = ImageFont.load_default()
-
-                margin = 80 # Increased margin for the larger post
-                wrapped_text = textwrap.fill(text, width=22) # Adjusted width for larger font
-                
-                title_bbox = draw.textbbox((0, 0), title, font=title_font)
-                body_bbox = draw.textbbox((0, 0), wrapped_text, font=body_font, spacing=20)
-                title_width = title_bbox[2] - title_bbox[0]
-                body_height = body_bbox[3] - body_bbox[1]
-                
-                total_height = (title_bbox[3] - title_bbox[1]) + 40 + body_height
-                start_y = (img.height - total_height) / 2
-                
-                title_x = (img.width - title_width) / 2
-                draw.text((title_x, start_y), title, font=title_font, fill="white")
-                
-                body_start_y = start_y + (title_bbox[3] - title_bbox[1]) + 60
-                draw.text((margin, body_start_y), wrapped_text, font=body_font, fill="white", spacing=20)
-                
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                output_filename = os.path.join("generated_posts", f"post_{title.replace(' ','_')}_{timestamp}.png")
-                img.save(output_filename, "PNG")
-                
-                print(f"✅ Post image created and saved to: {output_filename}")
+                with Image.open(base_image_path) as source, \
+                        self.telemetry.span("render.decode", source_size=f"{source.width}x{source.height}"):
+                    img = self._load_portrait(source)
+                    if img.mode != "RGB":
+                        img = img.convert("RGB")
+                # The decoded source is released here, before the text is drawn and the post encoded
+
+                output_filename, metrics = self._finish_variant(
+                    img, "portrait", text, title, self._output_name(title), output_dir, scratch_dir or output_dir,
+                    self._layout_engine_for("portrait", title_size, body_size)
+                )
+                span["bytes"] = metrics['bytes']
+                print(f"✅ Post image created and saved to: {output_filename} "
+                      f"({metrics['bytes'] / 1024:.0f} KB, encoded in {metrics['encode_seconds'] * 1000:.0f} ms)")
                 return output_filename
         
         except Exception as e:
             print(f"❌ Error creating post image: {e}")
             return None
+
+    def create_post_variants(self, base_image_path: str, text: str, title: str, variants=tuple(POST_VARIANTS),
+                             output_dir: str = "generated_posts", scratch_dir: str | None = None,
+                             title_size: int = TITLE_FONT_SIZE, body_size: int = BODY_FONT_SIZE) -> dict | None:
+        """
+        Renders the post in several formats (see POST_VARIANTS) from a single decode of the base image:
+        it is decoded once, at the reduced scale the largest crop still needs, and every variant is
+        cropped and resized from that buffer. Returns {"decode_seconds": float, "variants": {name:
+        {"path", "seconds", "encode_seconds", "bytes"}}}; a variant that fails is left out.
+        """
+        unknown = [name for name in variants if name not in POST_VARIANTS]
+        if unknown:
+            raise ValueError(f"Unknown post variant(s) {', '.join(unknown)}. Use any of: {', '.join(POST_VARIANTS)}.")
+        output_name = self._output_name(title)
+        results = {}
+        try:
+            with self.telemetry.span("render.variants", title=title, count=len(variants)), Image.open(base_image_path) as img:
+                start = time.perf_counter()
+                with self.telemetry.span("render.decode", source_size=f"{img.width}x{img.height}"):
+                    source = self._decode_for(img, [POST_VARIANTS[name] for name in variants])
+                decode_seconds = time.perf_counter() - start
+
+                for name in variants:
+                    start = time.perf_counter()
+                    try:
+                        with self.telemetry.span("render.variant", variant=name):
+                            base = self._crop_to_size(source, POST_VARIANTS[name])
+                            if base.mode != "RGB":
+                                base = base.convert("RGB")
+                            path, metrics = self._finish_variant(base, name, text, title, output_name, output_dir, scratch_dir or output_dir,
+                                                                 self._layout_engine_for(name, title_size, body_size))
+                            # Freed now rather than when the next variant replaces it
+                            base.close()
+                    except Exception as e:
+                        print(f"❌ Error creating the {name} variant of {title}: {e}")
+                        continue
+                    results[name] = {"path": path, "seconds": time.perf_counter() - start,
+                                     "encode_seconds": metrics['encode_seconds'], "bytes": metrics['bytes']}
+        except Exception as e:
+            print(f"❌ Error creating post variants: {e}")
+            return None
+
+        print(f"✅ {title}: {len(results)}/{len(variants)} variants from one decode ({decode_seconds * 1000:.0f} ms): "
+              + ", ".join(f"{name} {result['seconds'] * 1000:.0f} ms, {result['bytes'] / 1024:.0f} KB" for name, result in results.items()))
+        return {"decode_seconds": decode_seconds, "variants": results}
+
+    def _finish_variant(self, img: Image.Image, variant: str, text: str, title: str,
+                        output_name: str, output_dir: str, scratch_dir: str, layout_engine: TextLayoutEngine) -> tuple[str, dict]:
+        """Dims the resized base in place, draws the text with layout_engine and encodes it. Returns (path, encode metrics)."""
+        img.paste((0, 0, 0), mask=self._overlay_mask_for(img.size))
+        plan = layout_engine.layout(title, text)
+        if not plan.fits:
+            print(f"   - ⚠️ The text for {title} is too long for the {variant} post even at the smallest font size; it was cut off.")
+        layout_engine.draw(ImageDraw.Draw(img), plan)
+
+        if variant != "portrait":
+            output_name = f"{output_name}_{variant}"
+        with self.telemetry.span("render.encode", format=self.output_format, variant=variant):
+            output_filename, metrics = self._save_post(img, output_name, output_dir, scratch_dir)
+        self.telemetry.inc("post_output_bytes_total", metrics['bytes'], format=self.output_format)
+        return output_filename, metrics
+
+    @staticmethod
+    def _output_name(title: str) -> str:
+        # The random suffix keeps names unique even for renders within the same second
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return f"post_{title.replace(' ','_')}_{timestamp}_{uuid.uuid4().hex[:6]}"
+
+    def _save_post(self, img: Image.Image, output_name: str, output_dir: str, scratch_dir: str) -> tuple[str, dict]:
+        """
+        Encodes the finished post in the configured format. Returns (path, encode metrics).
+        The file is written under scratch_dir and renamed into output_dir, so a post path
+        never points at a half-written file.
+        """
+        extension = OUTPUT_EXTENSIONS[self.output_format]
+        os.makedirs(output_dir, exist_ok=True)
+        os.makedirs(scratch_dir, exist_ok=True)
+        scratch_path = os.path.join(scratch_dir, f".{output_name}{extension}.tmp")
+        output_filename = os.path.join(output_dir, output_name + extension)
+
+        start = time.perf_counter()
+        try:
+            self._encode(img, scratch_path, self.output_format)
+            os.replace(scratch_path, output_filename)
+        finally:
+            if os.path.exists(scratch_path): os.remove(scratch_path)
+        metrics = {
+            "format": self.output_format,
+            "encode_seconds": time.perf_counter() - start,
+            "bytes": os.path.getsize(output_filename)
+        }
+        if self.archive_webp and self.output_format != "WEBP":
+            archive_path = os.path.join(self.archive_dir, output_name + ".webp")
+            self._encode(img, archive_path, "WEBP")
+        return output_filename, metrics
+
+    def _encode(self, img: Image.Image, path: str, output_format: str):
+        if output_format == "JPEG":
+            # Instagram re-encodes to JPEG anyway; progressive + optimized Huffman tables keep uploads small
+            img.save(path, "JPEG", quality=self.quality, optimize=True, progressive=True)
+        elif output_format == "WEBP":
+            img.save(path, "WEBP", quality=self.quality, method=4)
+        else:
+            img.save(path, "PNG")
@@ -0,0 +1,192 @@
+# /core_services/outbound_client_service.py
+
+import time
+import random
+import threading
+import requests
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from requests.adapters import HTTPAdapter
+from core_services.telemetry import get_telemetry
+from config import (
+    OPENAI_REQUESTS_PER_MINUTE, OPENAI_TIMEOUT_SECONDS,
+    PEXELS_REQUESTS_PER_HOUR, PEXELS_TIMEOUT_SECONDS, OUTBOUND_MAX_ATTEMPTS
+)
+
+# HTTP statuses worth another attempt: rate limited or a transient server-side failure.
+RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """Thread-safe token bucket: refills at `rate` tokens per second, holds at most `capacity`."""
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1) -> float:
+        """Blocks until `tokens` are available and takes them. Returns the time spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                shortfall = (tokens - self._tokens) / self.rate
+            time.sleep(shortfall)
+            waited += shortfall
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    max_attempts: int = OUTBOUND_MAX_ATTEMPTS
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float:
+        """Seconds to wait before the next attempt: the server's Retry-After if given, else full-jitter exponential backoff."""
+        if retry_after is not None:
+            return min(max(retry_after, 0.0), self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+class RetryableStatusError(requests.HTTPError):
+    """Raised for a response whose status is worth retrying (see RETRYABLE_STATUSES)."""
+
+def raise_for_retryable_status(response: requests.Response, url: str = "") -> None:
+    """Raises RetryableStatusError for statuses worth retrying and requests.HTTPError for any other failure."""
+    if response.status_code in RETRYABLE_STATUSES:
+        response.close()
+        raise RetryableStatusError(f"{response.status_code} from {url or response.url}", response=response)
+    response.raise_for_status()
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parses a Retry-After header, given either in seconds or as an HTTP date."""
+    if not value: return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+    except (TypeError, ValueError):
+        return None
+
+def classify_requests_error(error: Exception) -> tuple[bool, float | None]:
+    """Returns (retryable, retry_after seconds) for errors raised by requests."""
+    if isinstance(error, RetryableStatusError):
+        return True, parse_retry_after(error.response.headers.get("Retry-After"))
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)):
+        return True, None
+    return False, None
+
+class OutboundClient:
+    """
+    Shared layer for calls to one external API: a token bucket tuned to the API's quota,
+    retries with exponential backoff and jitter that honor Retry-After, per-request
+    timeouts and a pooled requests.Session.
+    """
+    def __init__(self, name: str, rate_per_second: float | None = None, burst: float = 1,
+                 timeout: float = 30, retry_policy: RetryPolicy = RetryPolicy(), pool_size: int = 10,
+                 classify_error=classify_requests_error):
+        self.name = name
+        self.bucket = TokenBucket(rate_per_second, burst) if rate_per_second else None
+        self.timeout = timeout
+        self.retry_policy = retry_policy
+        self.classify_error = classify_error
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.stats = {"calls": 0, "attempts": 0, "retries": 0, "failures": 0, "throttled_seconds": 0.0}
+        self._stats_lock = threading.Lock()
+        self.telemetry = get_telemetry()
+
+    def call(self, func, *args, **kwargs):
+        """Runs func(*args, **kwargs) under the rate limit, retrying the errors classify_error deems transient."""
+        self._count("calls")
+        attempt = 0
+        while True:
+            if self.bucket:
+                self._count("throttled_seconds", self.bucket.acquire())
+            self._count("attempts")
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+                self.telemetry.observe("outbound_attempt_seconds", time.perf_counter() - start, client=self.name, outcome="ok")
+                return result
+            except Exception as e:
+                self.telemetry.observe("outbound_attempt_seconds", time.perf_counter() - start, client=self.name, outcome="error")
+                retryable, retry_after = self.classify_error(e)
+                attempt += 1
+                if not retryable or attempt >= self.retry_policy.max_attempts:
+                    self._count("failures")
+                    raise
+                delay = self.retry_policy.delay(attempt, retry_after)
+                self._count("retries")
+                print(f"   - 🔁 {self.name}: {e.__class__.__name__} ({e}); retry {attempt}/{self.retry_policy.max_attempts - 1} in {delay:.1f}s")
+                time.sleep(delay)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Sends an HTTP request through call(). Retryable statuses are retried; other errors raise as usual."""
+        kwargs.setdefault("timeout", self.timeout)
+
+        def send():
+            response = self.session.request(method, url, **kwargs)
+            raise_for_retryable_status(response, url)
+            return response
+
+        return self.call(send)
+
+    def _count(self, key: str, amount: float = 1):
+        with self._stats_lock:
+            self.stats[key] += amount
+        if amount:
+            self.telemetry.inc(f"outbound_{key}_total", amount, client=self.name)
+
+# --- Shared clients, one per external API so every caller draws from the same quota ---
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_outbound_client(name: str) -> OutboundClient:
+    """Returns the process-wide client for "openai", "pexels" (search API) or "pexels_cdn" (image downloads)."""
+    with _clients_lock:
+        if name not in _clients:
+            _clients[name] = _build_client(name)
+        return _clients[name]
+
+def get_outbound_stats() -> dict:
+    """Returns a copy of the call/retry counters of every client created so far."""
+    with _clients_lock:
+        return {name: dict(client.stats) for name, client in _clients.items()}
+
+def _build_client(name: str) -> OutboundClient:
+    if name == "openai":
+        return OutboundClient(
+            "openai", rate_per_second=OPENAI_REQUESTS_PER_MINUTE / 60, burst=max(1, OPENAI_REQUESTS_PER_MINUTE // 10),
+            timeout=OPENAI_TIMEOUT_SECONDS, classify_error=classify_openai_error
+        )
+    if name == "pexels":
+        # Pexels counts searches per hour; allow short bursts so a whole run's searches don't queue up
+        return OutboundClient("pexels", rate_per_second=PEXELS_REQUESTS_PER_HOUR / 3600, burst=20, timeout=PEXELS_TIMEOUT_SECONDS)
+    if name == "pexels_cdn":
+        # Image downloads don't count against the API quota
+        return OutboundClient("pexels_cdn", timeout=PEXELS_TIMEOUT_SECONDS, pool_size=16)
+    raise ValueError(f"Unknown outbound client '{name}'.")
+
+def classify_openai_error(error: Exception) -> tuple[bool, float | None]:
+    """Returns (retryable, retry_after seconds) for errors raised by the openai SDK."""
+    import openai
+    if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError)):
+        return True, None
+    if isinstance(error, openai.APIStatusError):
+        # A 429 for an exhausted quota won't clear up by waiting
+        if getattr(error, "code", None) == "insufficient_quota":
+            return False, None
+        if error.status_code in RETRYABLE_STATUSES:
+            return True, parse_retry_after(error.response.headers.get("retry-after"))
+        return False, None
+    return classify_requests_error(error)
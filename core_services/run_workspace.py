@@ -0,0 +1,36 @@
+# /core_services/run_workspace.py
+
+import os
+import shutil
+import uuid
+from datetime import datetime
+from config import RUNS_DIR, RUNS_TO_KEEP
+
+class RunWorkspace:
+    """
+    A private directory for one generation run, so overlapping runs never share files.
+    Finished posts land in <run>/posts. Jobs write into <run>/scratch first and only
+    rename their file into posts/ once it is complete.
+    """
+    def __init__(self, root: str = RUNS_DIR, run_id: str | None = None):
+        self.run_id = run_id or f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        self.directory = os.path.join(root, self.run_id)
+        self.output_dir = os.path.join(self.directory, "posts")
+        self.scratch_dir = os.path.join(self.directory, "scratch")
+        os.makedirs(self.output_dir, exist_ok=True)
+        os.makedirs(self.scratch_dir, exist_ok=True)
+
+    def cleanup(self):
+        """Removes the run's scratch files. Committed outputs are kept."""
+        shutil.rmtree(self.scratch_dir, ignore_errors=True)
+
+    @staticmethod
+    def prune_old_runs(root: str = RUNS_DIR, keep: int = RUNS_TO_KEEP) -> list[str]:
+        """Deletes all but the `keep` most recent run folders. Returns the removed run IDs."""
+        if not os.path.isdir(root): return []
+        # Run IDs start with their timestamp, so name order is creation order
+        run_ids = sorted(name for name in os.listdir(root) if os.path.isdir(os.path.join(root, name)))
+        removed = run_ids[:max(0, len(run_ids) - keep)]
+        for run_id in removed:
+            shutil.rmtree(os.path.join(root, run_id), ignore_errors=True)
+        return removed
@@ -0,0 +1,213 @@
+# /core_services/telemetry.py
+
+import os
+import json
+import time
+import uuid
+import threading
+import contextvars
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+from config import TELEMETRY_ENABLED, TELEMETRY_LOG_FILE, TELEMETRY_LOG_MAX_MB, TELEMETRY_PROMETHEUS_FILE
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implied.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+# Span attributes that become metric labels; everything else only goes to the JSON log.
+LABEL_KEYS = ("stage", "client", "sign", "account", "format", "kind", "variant")
+METRIC_PREFIX = "planetsvibe_"
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+class Telemetry:
+    """
+    In-process tracing and metrics with no external dependencies.
+    Spans are written as JSON lines (one per finished span, with trace/parent IDs so a run
+    can be reassembled) and feed a latency histogram; counters and histograms are exported
+    in the Prometheus text format to a file a node_exporter textfile collector can pick up.
+    Everything is a dict update under a lock plus one write call per span (the log is
+    line-buffered, so lines from several processes don't interleave), so it is cheap enough
+    to leave on. The log is rotated to a single .1 backup once it reaches log_max_mb.
+    Metrics recorded in render worker processes only reach the JSON log; the parent
+    records the render stage itself.
+    """
+    def __init__(self, enabled: bool = TELEMETRY_ENABLED, log_path: str = TELEMETRY_LOG_FILE,
+                 prometheus_path: str = TELEMETRY_PROMETHEUS_FILE, log_max_mb: float = TELEMETRY_LOG_MAX_MB):
+        self.enabled = enabled
+        self.log_path = log_path
+        self.log_max_bytes = int(log_max_mb * 1024 * 1024)
+        self.prometheus_path = prometheus_path
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._log_file = None
+        self._log_pid = None
+
+    # --- Tracing ---
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """
+        Times the block as a span. Yields its attribute dict, so results (tokens, bytes, ...) can be added.
+        Nested spans, including those in threads started through propagate(), share the trace ID.
+        """
+        if not self.enabled:
+            yield attributes
+            return
+        parent = _current_span.get()
+        span = {
+            "trace_id": parent["trace_id"] if parent else uuid.uuid4().hex[:16],
+            "span_id": uuid.uuid4().hex[:8],
+            "parent_id": parent["span_id"] if parent else None
+        }
+        token = _current_span.set(span)
+        status, error = "ok", None
+        start = time.perf_counter()
+        try:
+            yield attributes
+        except Exception as e:
+            status, error = "error", f"{e.__class__.__name__}: {e}"
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            _current_span.reset(token)
+            labels = {key: attributes[key] for key in LABEL_KEYS if attributes.get(key) is not None}
+            self.observe("span_seconds", duration, span=name, status=status, **labels)
+            fields = {**attributes, **span, "name": name, "duration_ms": round(duration * 1000, 2), "status": status}
+            if error: fields["error"] = error
+            self.event("span", **fields)
+
+    @staticmethod
+    def propagate(func):
+        """Wraps func so it runs in a copy of the caller's context, keeping thread-pool work inside the current span."""
+        context = contextvars.copy_context()
+        return lambda *args, **kwargs: context.copy().run(func, *args, **kwargs)
+
+    # --- Metrics ---
+    def inc(self, name: str, amount: float = 1, **labels):
+        if not self.enabled: return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels):
+        if not self.enabled: return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {"buckets": [0] * (len(LATENCY_BUCKETS) + 1), "sum": 0.0, "count": 0}
+            histogram["buckets"][bisect_left(LATENCY_BUCKETS, value)] += 1
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    # --- Structured log ---
+    def event(self, event_type: str, **fields):
+        """Appends one JSON line to the event log."""
+        if not self.enabled: return
+        line = json.dumps({
+            "ts": datetime.now().isoformat(timespec="milliseconds"), "type": event_type,
+            "pid": os.getpid(), "thread": threading.current_thread().name, **fields
+        }, default=str)
+        with self._lock:
+            try:
+                log_file = self._log()
+                log_file.write(line + "\n")
+                if self.log_max_bytes and log_file.tell() >= self.log_max_bytes:
+                    self._rotate_log()
+            except OSError:
+                pass
+
+    def flush(self):
+        with self._lock:
+            if self._log_file: self._log_file.flush()
+
+    def _log(self):
+        # Reopened after a fork/spawn so every process appends through its own handle
+        if self._log_file is None or self._log_pid != os.getpid():
+            os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+            self._log_file = open(self.log_path, "a", encoding="utf-8", buffering=1)
+            self._log_pid = os.getpid()
+        return self._log_file
+
+    def _rotate_log(self):
+        """Called with the lock held. Moves the full log to the backup, unless another process already did."""
+        handle_inode = os.fstat(self._log_file.fileno()).st_ino
+        self._log_file.close()
+        self._log_file = None
+        try:
+            if os.stat(self.log_path).st_ino == handle_inode:
+                os.replace(self.log_path, self.log_path + ".1")
+        except FileNotFoundError:
+            pass
+
+    # --- Export ---
+    def render_prometheus(self) -> str:
+        """Returns every counter and histogram in the Prometheus text exposition format."""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: {**value, "buckets": list(value["buckets"])} for key, value in self._histograms.items()}
+
+        lines = []
+        for metric in sorted({name for name, _ in counters}):
+            lines.append(f"# TYPE {METRIC_PREFIX}{metric} counter")
+            for (name, labels), value in sorted(counters.items()):
+                if name == metric:
+                    lines.append(f"{METRIC_PREFIX}{name}{self._format_labels(labels)} {value:g}")
+        for metric in sorted({name for name, _ in histograms}):
+            lines.append(f"# TYPE {METRIC_PREFIX}{metric} histogram")
+            for (name, labels), histogram in sorted(histograms.items()):
+                if name != metric: continue
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), histogram["buckets"]):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f"{METRIC_PREFIX}{name}_bucket{self._format_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{METRIC_PREFIX}{name}_sum{self._format_labels(labels)} {histogram['sum']:.6f}")
+                lines.append(f"{METRIC_PREFIX}{name}_count{self._format_labels(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str | None = None) -> str | None:
+        """Atomically writes the metrics file (for a node_exporter textfile collector) and returns its path."""
+        if not self.enabled: return None
+        path = path or self.prometheus_path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus())
+        os.replace(temp_path, path)
+        self.flush()
+        return path
+
+    def snapshot(self) -> dict:
+        """Counters and span latency summaries as plain data, e.g. for a run summary."""
+        with self._lock:
+            counters = {self._metric_id(name, labels): value for (name, labels), value in self._counters.items()}
+            spans = {
+                self._metric_id(name, labels): {"count": histogram["count"], "total_seconds": round(histogram["sum"], 3)}
+                for (name, labels), histogram in self._histograms.items()
+            }
+        return {"counters": counters, "histograms": spans}
+
+    @staticmethod
+    def _format_labels(labels: tuple) -> str:
+        if not labels: return ""
+        escaped = []
+        for key, value in labels:
+            value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            escaped.append(f'{key}="{value}"')
+        return "{" + ",".join(escaped) + "}"
+
+    @classmethod
+    def _metric_id(cls, name: str, labels: tuple) -> str:
+        return name + cls._format_labels(labels)
+
+# --- Process-wide instance ---
+_telemetry = None
+_telemetry_lock = threading.Lock()
+
+def get_telemetry() -> Telemetry:
+    global _telemetry
+    with _telemetry_lock:
+        if _telemetry is None:
+            _telemetry = Telemetry()
+        return _telemetry
@@ -0,0 +1,194 @@
+# /core_services/text_layout.py
+
+import threading
+from dataclasses import dataclass
+from collections import OrderedDict
+from PIL import ImageFont
+
+# Characters whose advances are measured up front; anything else is measured on first use.
+PRELOADED_CHARACTERS = "".join(chr(code) for code in range(32, 127))
+# Layout plans kept per engine, keyed by (title, text).
+PLAN_CACHE_SIZE = 256
+# Ends the last line of a body that is cut off because it doesn't fit even at the smallest sizes.
+ELLIPSIS = "…"
+
+@dataclass(frozen=True)
+class PostTemplate:
+    """Where the text of a post goes. Sizes are in pixels; fonts shrink in font_step steps down to the minimums."""
+    width: int
+    height: int
+    margin: int = 80
+    title_size: int = 110
+    body_size: int = 75
+    min_title_size: int = 70
+    min_body_size: int = 45
+    font_step: int = 5
+    title_gap: int = 50
+    line_spacing: int = 20
+
+    @property
+    def text_width(self) -> int:
+        return self.width - 2 * self.margin
+
+    @property
+    def text_height(self) -> int:
+        return self.height - 2 * self.margin
+
+@dataclass(frozen=True)
+class PlacedLine:
+    text: str
+    x: float
+    y: float
+    size: int
+
+@dataclass(frozen=True)
+class LayoutPlan:
+    """
+    Every line of a post with its position and font size; draw it with TextLayoutEngine.draw.
+    fits is False when the body had to be cut off; the plan then still stays inside the text area.
+    """
+    title: PlacedLine
+    lines: tuple[PlacedLine, ...]
+    fits: bool
+
+class FontMetrics:
+    """Advance widths and line height of one font size, measured once per glyph."""
+    def __init__(self, font: ImageFont.FreeTypeFont):
+        self.font = font
+        ascent, descent = font.getmetrics()
+        self.line_height = ascent + descent
+        self._advances = {char: font.getlength(char) for char in PRELOADED_CHARACTERS}
+
+    def width(self, text: str) -> float:
+        advances = self._advances
+        total = 0.0
+        for char in text:
+            advance = advances.get(char)
+            if advance is None:
+                advance = advances[char] = self.font.getlength(char)
+            total += advance
+        return total
+
+class TextLayoutEngine:
+    """
+    Lays out the title and body of a post for one PostTemplate.
+    Text is wrapped by measured pixel width rather than by character count, and when it
+    doesn't fit the body (then the title) is set in the next smaller size, down to the
+    template minimums. A body too long even for those is cut off after the last line that
+    fits and ends with an ellipsis, so nothing is ever placed outside the text area.
+    Glyph advances are cached per font size and finished plans per (title, text), so
+    laying out a post costs a few dictionary lookups per word.
+    """
+    def __init__(self, template: PostTemplate, get_font):
+        # get_font(size) -> FreeTypeFont, normally the renderer's own font cache
+        self.template = template
+        self._get_font = get_font
+        self._metrics = {}
+        self._plans = OrderedDict()
+        self._lock = threading.Lock()
+        # Compile the template: measure every size the auto-fit can pick
+        self.title_sizes = self._sizes(template.title_size, template.min_title_size)
+        self.body_sizes = self._sizes(template.body_size, template.min_body_size)
+        for size in set(self.title_sizes + self.body_sizes):
+            self.metrics(size)
+
+    def metrics(self, size: int) -> FontMetrics:
+        with self._lock:
+            if size not in self._metrics:
+                self._metrics[size] = FontMetrics(self._get_font(size))
+            return self._metrics[size]
+
+    def layout(self, title: str, text: str) -> LayoutPlan:
+        """Returns the plan for a post, from the cache when the same title and text were laid out before."""
+        key = (title, text)
+        with self._lock:
+            if key in self._plans:
+                self._plans.move_to_end(key)
+                return self._plans[key]
+        plan = self._compute(title, text)
+        with self._lock:
+            self._plans[key] = plan
+            if len(self._plans) > PLAN_CACHE_SIZE:
+                self._plans.popitem(last=False)
+        return plan
+
+    def draw(self, draw, plan: LayoutPlan, fill: str = "white"):
+        for line in (plan.title, *plan.lines):
+            draw.text((line.x, line.y), line.text, font=self._get_font(line.size), fill=fill)
+
+    # --- Internals ---
+    def _sizes(self, largest: int, smallest: int) -> list[int]:
+        sizes = list(range(largest, smallest, -max(1, self.template.font_step)))
+        return sizes + [smallest] if smallest <= largest else [largest]
+
+    def _compute(self, title: str, text: str) -> LayoutPlan:
+        template = self.template
+        # The largest title size that fits the width; smaller ones are only tried when the block is too tall
+        widest = next((index for index, size in enumerate(self.title_sizes)
+                       if self.metrics(size).width(title) <= template.text_width), len(self.title_sizes) - 1)
+
+        # The body shrinks first, then the title: the first pair whose block fits the text area wins
+        for title_size in self.title_sizes[widest:]:
+            title_metrics = self.metrics(title_size)
+            for body_size in self.body_sizes:
+                body_metrics = self.metrics(body_size)
+                lines = self._wrap(text, body_metrics, template.text_width)
+                if self._block_height(title_metrics, body_metrics, len(lines)) <= template.text_height:
+                    return self._place(title, title_size, lines, body_size, fits=True)
+
+        # Too long even at the smallest sizes: keep the lines that fit and mark the cut with an ellipsis
+        available = template.text_height - title_metrics.line_height - template.title_gap + template.line_spacing
+        lines = lines[:max(0, int(available // (body_metrics.line_height + template.line_spacing)))]
+        if lines:
+            lines[-1] = self._ellipsize(lines[-1], body_metrics, template.text_width)
+        return self._place(title, title_size, lines, body_size, fits=False)
+
+    def _block_height(self, title_metrics: FontMetrics, body_metrics: FontMetrics, line_count: int) -> float:
+        body_height = line_count * body_metrics.line_height + max(0, line_count - 1) * self.template.line_spacing
+        return title_metrics.line_height + self.template.title_gap + body_height
+
+    def _place(self, title: str, title_size: int, lines: list[str], body_size: int, fits: bool) -> LayoutPlan:
+        template = self.template
+        title_metrics, body_metrics = self.metrics(title_size), self.metrics(body_size)
+        # The block is centered vertically (never above the margin); the title is centered and the body left-aligned at the margin
+        top = max(template.margin, (template.height - self._block_height(title_metrics, body_metrics, len(lines))) / 2)
+        placed_title = PlacedLine(title, (template.width - title_metrics.width(title)) / 2, top, title_size)
+        y = top + title_metrics.line_height + template.title_gap
+        placed_lines = []
+        for line in lines:
+            placed_lines.append(PlacedLine(line, template.margin, y, body_size))
+            y += body_metrics.line_height + template.line_spacing
+        return LayoutPlan(placed_title, tuple(placed_lines), fits=fits)
+
+    @staticmethod
+    def _ellipsize(line: str, metrics: FontMetrics, max_width: float) -> str:
+        """Appends the ellipsis to line, dropping trailing characters until it fits max_width."""
+        line = line.rstrip()
+        while line and metrics.width(line + ELLIPSIS) > max_width:
+            line = line[:-1].rstrip()
+        return line + ELLIPSIS
+
+    @staticmethod
+    def _wrap(text: str, metrics: FontMetrics, max_width: float) -> list[str]:
+        """Greedy word wrap by pixel width; words wider than a whole line are split between characters."""
+        space = metrics.width(" ")
+        lines, current, current_width = [], [], 0.0
+        for word in text.split():
+            word_width = metrics.width(word)
+            if word_width > max_width:
+                if current: lines.append(" ".join(current))
+                current, current_width = [], 0.0
+                piece = ""
+                for char in word:
+                    if piece and metrics.width(piece + char) > max_width:
+                        lines.append(piece)
+                        piece = ""
+                    piece += char
+                word, word_width = piece, metrics.width(piece)
+            if current and current_width + space + word_width > max_width:
+                lines.append(" ".join(current))
+                current, current_width = [], 0.0
+            current_width += (space if current else 0.0) + word_width
+            current.append(word)
+        if current: lines.append(" ".join(current))
+        return lines
@@ -1,8 +1,17 @@
 # /manual_login.py
+# Usage: python manual_login.py [account_name]
+# Without an account name the session is saved for the dashboard (instagram_session.json);
+# with one, the account is added to the account registry and gets its own session file.
 import os
+import sys
 from instagrapi import Client
 
+ACCOUNT_NAME = sys.argv[1] if len(sys.argv) > 1 else None
 SESSION_FILE = "instagram_session.json"
+if ACCOUNT_NAME:
+    from platform_services.instagram_account_pool import InstagramAccountPool
+    account_pool = InstagramAccountPool()
+    SESSION_FILE = account_pool.session_path(ACCOUNT_NAME)
 
 print("--- Instagram Manual Login Script ---")
 print("This script will help you log in interactively to solve any challenges.")
@@ -19,6 +28,9 @@ try:
     
     # If login is successful, dump the session settings to the file
     cl.dump_settings(SESSION_FILE)
+    if ACCOUNT_NAME:
+        account_pool.add_account(ACCOUNT_NAME, username)
+        print(f"Account '{ACCOUNT_NAME}' registered for multi-account publishing.")
     print(f"\n✅ SUCCESS! Login successful for {username}.")
     print(f"Session file '{SESSION_FILE}' has been created.")
     print("You can now close this script and restart your main Streamlit application.")
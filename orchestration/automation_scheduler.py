@@ -1,57 +1,88 @@
 # /orchestration/automation_scheduler.py
 
-import schedule
-import time
 import threading
+from datetime import date, datetime, timedelta
+from config import PREFETCH_LEAD_HOURS
+from orchestration.run_state_store import RunStateStore
+from orchestration.scheduler_engine import SchedulerEngine
 
 class AutomationScheduler:
     """
     A focused scheduler to run the astrology post generation task daily.
+    Each instance owns its own SchedulerEngine, so several schedulers (e.g. one per
+    account) can run side by side without touching each other's jobs.
     """
-    def __init__(self, orchestrator):
+    def __init__(self, orchestrator, name: str = "default"):
         # It needs a reference to the orchestrator to call the main function
         self.orchestrator = orchestrator
-        self.is_running = False
-        self.scheduler_thread = None
+        self.engine = SchedulerEngine(name=name)
+        # The prefetch and the publish of one day never run at the same time (e.g. both caught up after
+        # downtime): the publish waits for the prefetch and then uploads what it staged
+        self._date_locks = {}
+        self._date_locks_lock = threading.Lock()
         print("✅ Automation Scheduler initialized.")
 
-    def _run_daily_job(self):
-        """The function that will be executed by the schedule."""
-        print("⏰ AUTOMATION: It's time! Running the daily astrology post generation...")
-        self.orchestrator.generate_all_astrology_posts()
+    @property
+    def is_running(self) -> bool:
+        return self.engine.is_running
+
+    def _run_daily_job(self, slot: datetime):
+        """Publishes the carousel of the slot's day."""
+        print("⏰ AUTOMATION: It's time! Publishing today's astrology carousel...")
+        # Uploads the prefetched carousel, or generates it on the spot if nothing fresh was staged.
+        # Later slots on a day that is already published are no-ops, so extra slots act as retries.
+        with self._lock_for(slot.date()):
+            self.orchestrator.publish_staged_carousel_post(slot.date())
+        if not RunStateStore(slot.date()).is_published():
+            raise RuntimeError(f"the carousel for {slot.date()} was not published")
         print("✅ AUTOMATION: Daily job finished. Waiting for the next scheduled run.")
 
-    def start(self, run_time: str = "10:30"):
-        """Starts the scheduler in a background thread."""
+    def _run_prefetch_job(self, slot: datetime, lead_hours: float):
+        """Generates and stages the carousel of the publish slot lead_hours after this one."""
+        target_date = (slot + timedelta(hours=lead_hours)).date()
+        print(f"⏰ AUTOMATION: Prefetching the carousel for {target_date}...")
+        with self._lock_for(target_date):
+            staged = self.orchestrator.stage_carousel_post(target_date)
+        if not staged and not RunStateStore(target_date).is_published():
+            raise RuntimeError(f"the carousel for {target_date} could not be staged")
+        print("✅ AUTOMATION: Prefetch finished.")
+
+    def _lock_for(self, run_date: date) -> threading.Lock:
+        with self._date_locks_lock:
+            # Only the last few days can still be in progress
+            for stale in [day for day in self._date_locks if day < run_date - timedelta(days=7)]:
+                del self._date_locks[stale]
+            return self._date_locks.setdefault(run_date, threading.Lock())
+
+    def start(self, run_time: str | list[str] = "10:30", prefetch_lead_hours: float | None = None):
+        """Starts the scheduler. run_time is one "HH:MM" publish time or a list of them."""
         if self.is_running:
             print("Scheduler is already running.")
             return
-        
-        print(f"▶️ Starting automation. Job will run daily at {run_time}.")
-        self.is_running = True
-        
-        # Configure the schedule
-        schedule.every().day.at(run_time).do(self._run_daily_job)
-        
-        # Start the background thread
-        self.scheduler_thread = threading.Thread(target=self._run_pending_jobs, daemon=True)
-        self.scheduler_thread.start()
+        run_times = [run_time] if isinstance(run_time, str) else list(run_time)
+        lead_hours = PREFETCH_LEAD_HOURS if prefetch_lead_hours is None else prefetch_lead_hours
+
+        print(f"▶️ Starting automation. Job will run daily at {', '.join(run_times)}.")
+        self.engine.add_job("publish", run_times, self._run_daily_job)
+        if lead_hours > 0:
+            prefetch_times = [
+                (datetime.strptime(value, "%H:%M") - timedelta(hours=lead_hours)).strftime("%H:%M")
+                for value in run_times
+            ]
+            self.engine.add_job("prefetch", prefetch_times, lambda slot: self._run_prefetch_job(slot, lead_hours))
+            print(f"   - Content will be prefetched daily at {', '.join(prefetch_times)}, {lead_hours:g}h ahead.")
+        self.engine.start()
 
     def stop(self):
-        """Stops the background scheduler thread."""
+        """Stops this scheduler and removes its jobs."""
         if not self.is_running:
             print("Scheduler is not running.")
             return
-            
+
         print("⏹️ Stopping automation scheduler...")
-        self.is_running = False
-        schedule.clear()
-        if self.scheduler_thread and self.scheduler_thread.is_alive():
-            self.scheduler_thread.join(timeout=2)
+        self.engine.stop()
+        self.engine.clear()
         print("Scheduler stopped.")
 
-    def _run_pending_jobs(self):
-        """The loop that continuously checks for and runs scheduled jobs."""
-        while self.is_running:
-            schedule.run_pending()
-            time.sleep(1)
+    def get_status(self) -> list[dict]:
+        return self.engine.get_status()
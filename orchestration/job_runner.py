@@ -0,0 +1,102 @@
+# /orchestration/job_runner.py
+
+import copy
+import time
+import uuid
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+class JobRunner:
+    """
+    Runs long orchestrator tasks on background worker threads and keeps their state for polling.
+    Submissions with the same key while a job is queued or running return that job's ID
+    instead of starting a duplicate, so every viewer of the dashboard follows the same run.
+    """
+    ACTIVE_STATUSES = ("queued", "running")
+
+    def __init__(self, max_workers: int = 1, history_size: int = 20):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job-runner")
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.history_size = history_size
+
+    def submit(self, key: str, func, *args, **kwargs) -> str:
+        """
+        Queues func(*args, on_progress=..., **kwargs) and returns the job ID.
+        func must accept an on_progress(sign, stage, seconds=None) callback.
+        """
+        with self._lock:
+            active = self._active_job_locked(key)
+            if active:
+                print(f"ℹ️ JOBS: '{key}' is already {active['status']} as job {active['id']}.")
+                return active['id']
+            job_id = uuid.uuid4().hex[:12]
+            self._jobs[job_id] = {
+                "id": job_id,
+                "key": key,
+                "status": "queued",
+                "submitted_at": datetime.now().isoformat(timespec="seconds"),
+                "started_at": None,
+                "finished_at": None,
+                "progress": {},
+                "result": None,
+                "error": None
+            }
+            self._trim_history_locked()
+
+        self._executor.submit(self._run, job_id, func, args, kwargs)
+        print(f"▶️ JOBS: Started '{key}' as job {job_id}.")
+        return job_id
+
+    def get(self, job_id: str) -> dict | None:
+        """Returns a snapshot of the job, safe to read while the job keeps running."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return copy.deepcopy(job) if job else None
+
+    def latest(self, key: str) -> dict | None:
+        """Returns a snapshot of the most recently submitted job for key."""
+        with self._lock:
+            jobs = [job for job in self._jobs.values() if job['key'] == key]
+            return copy.deepcopy(jobs[-1]) if jobs else None
+
+    def is_active(self, key: str) -> bool:
+        with self._lock:
+            return self._active_job_locked(key) is not None
+
+    # --- Internals ---
+    def _run(self, job_id: str, func, args, kwargs):
+        self._update(job_id, status="running", started_at=datetime.now().isoformat(timespec="seconds"))
+        start = time.perf_counter()
+        try:
+            result = func(*args, on_progress=lambda sign, stage, seconds=None: self._record_progress(job_id, sign, stage, seconds), **kwargs)
+            self._update(job_id, status="succeeded" if result else "failed", result=result)
+        except Exception as e:
+            print(f"❌ JOBS: Job {job_id} crashed: {e}")
+            self._update(job_id, status="failed", error=str(e))
+        finally:
+            self._update(job_id, finished_at=datetime.now().isoformat(timespec="seconds"),
+                         duration_seconds=round(time.perf_counter() - start, 2))
+
+    def _record_progress(self, job_id: str, sign: str, stage: str, seconds: float | None = None):
+        with self._lock:
+            entry = self._jobs[job_id]['progress'].setdefault(sign, {"stage": None, "timings": {}})
+            entry['stage'] = stage
+            if seconds is not None:
+                entry['timings'][stage] = round(seconds, 2)
+
+    def _update(self, job_id: str, **fields):
+        with self._lock:
+            self._jobs[job_id].update(fields)
+
+    def _active_job_locked(self, key: str) -> dict | None:
+        for job in self._jobs.values():
+            if job['key'] == key and job['status'] in self.ACTIVE_STATUSES:
+                return job
+        return None
+
+    def _trim_history_locked(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job['status'] not in self.ACTIVE_STATUSES]
+        for job_id in finished[:max(0, len(self._jobs) - self.history_size)]:
+            del self._jobs[job_id]
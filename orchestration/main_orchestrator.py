@@ -1,57 +1,346 @@
 # /orchestration/main_orchestrator.py
 
 from core_services.content_generator_service import ContentGeneratorService
-from core_services.image_post_generator_service import ImagePostGeneratorService
-from platform_services.instagram_service import InstagramService
+from config import (
+    GENERATION_CONCURRENCY, STREAM_MAX_IN_FLIGHT, RENDER_PROCESSES, POST_OUTPUT_FORMAT, POST_OUTPUT_QUALITY, POST_ARCHIVE_WEBP, POST_EXTRA_VARIANTS,
+    missing_api_keys, require_api_keys
+)
+from core_services.image_post_generator_service import ImagePostGeneratorService, POST_VARIANTS
+from core_services.telemetry import get_telemetry
+from platform_services.instagram_service import InstagramService, notify_progress
 from platform_services.instagram_connection_service import InstagramConnectionService
+from platform_services.instagram_account_pool import InstagramAccountPool
 from orchestration.automation_scheduler import AutomationScheduler
+from orchestration.run_state_store import RunStateStore
+from orchestration.staging_area import StagingArea
+from orchestration.job_runner import JobRunner
+import time
+import threading
+from datetime import date
 
 class MainOrchestrator:
-    def __init__(self):
+    """
+    Wires the services together. Every service is built on first use and cached, so creating
+    the orchestrator is instant and a run only pays for the services it actually touches.
+    """
+    # Services reported by check_health(), in dependency order
+    SERVICES = ("instagram_connection", "content_generator", "image_post_generator", "instagram_service")
+
+    def __init__(self, concurrency: int | None = None, render_processes: int | None = None, max_in_flight: int | None = None):
+        """
+        concurrency and render_processes override GENERATION_CONCURRENCY and RENDER_PROCESSES.
+        max_in_flight bounds how many signs a run has in progress at once, and with it peak memory (default: all 12).
+        """
         print("Initializing the Planets Vibe Orchestrator...")
-        self.instagram_connection = InstagramConnectionService()
-        self.content_generator = ContentGeneratorService()
-        self.image_post_generator = ImagePostGeneratorService()
-        self.instagram_service = InstagramService(
+        self.concurrency = concurrency or GENERATION_CONCURRENCY
+        self.render_processes = render_processes or RENDER_PROCESSES
+        self.max_in_flight = max_in_flight
+        self._services = {}
+        # Reentrant: building instagram_service builds the services it depends on
+        self._services_lock = threading.RLock()
+        print("✅ Planets Vibe Orchestrator initialized. Services start on first use.")
+
+    def _service(self, name: str, build):
+        with self._services_lock:
+            if name not in self._services:
+                start = time.perf_counter()
+                self._services[name] = build()
+                print(f"   - ⚙️  {name} ready in {time.perf_counter() - start:.2f}s")
+            return self._services[name]
+
+    @property
+    def instagram_connection(self) -> InstagramConnectionService:
+        return self._service("instagram_connection", InstagramConnectionService)
+
+    @property
+    def content_generator(self) -> ContentGeneratorService:
+        return self._service("content_generator", ContentGeneratorService)
+
+    @property
+    def image_post_generator(self) -> ImagePostGeneratorService:
+        return self._service("image_post_generator", lambda: ImagePostGeneratorService(
+            render_processes=self.render_processes,
+            output_format=POST_OUTPUT_FORMAT,
+            quality=POST_OUTPUT_QUALITY,
+            archive_webp=POST_ARCHIVE_WEBP
+        ))
+
+    @property
+    def instagram_service(self) -> InstagramService:
+        return self._service("instagram_service", lambda: InstagramService(
             content_generator=self.content_generator,
             image_post_generator=self.image_post_generator,
-            instagram_client=self.instagram_connection.client
-        )
-        self.scheduler = AutomationScheduler(orchestrator=self)
-        print("✅ Planets Vibe Orchestrator and all services initialized.")
+            # Resolved when publishing, so generate-only runs never start an Instagram client
+            instagram_client=lambda: self.instagram_connection.client,
+            max_workers=self.concurrency,
+            variants=self._post_variants()
+        ))
+
+    @staticmethod
+    def _post_variants() -> tuple[str, ...]:
+        """The portrait plus the valid, distinct POST_EXTRA_VARIANTS; a typo only costs the extra format, not the run."""
+        variants = ["portrait"]
+        for name in POST_EXTRA_VARIANTS:
+            if name not in POST_VARIANTS:
+                print(f"⚠️ Ignoring unknown post variant '{name}' in POST_EXTRA_VARIANTS. Use any of: {', '.join(POST_VARIANTS)}.")
+            elif name not in variants:
+                variants.append(name)
+        return tuple(variants)
+
+    @property
+    def account_pool(self) -> InstagramAccountPool:
+        return self._service("account_pool", InstagramAccountPool)
+
+    @property
+    def staging(self) -> StagingArea:
+        return self._service("staging", StagingArea)
+
+    @property
+    def scheduler(self) -> AutomationScheduler:
+        return self._service("scheduler", lambda: AutomationScheduler(orchestrator=self))
+
+    @property
+    def job_runner(self) -> JobRunner:
+        # Runs manual generations in the background so the dashboard stays responsive
+        return self._service("job_runner", JobRunner)
+
+    def is_started(self, name: str) -> bool:
+        """Whether the named service has been built yet."""
+        with self._services_lock:
+            return name in self._services
+
+    def shutdown(self):
+        """Stops the background workers of the services that were started."""
+        with self._services_lock:
+            if "scheduler" in self._services and self._services["scheduler"].is_running:
+                self._services["scheduler"].stop()
+            if "image_post_generator" in self._services:
+                self._services["image_post_generator"].shutdown()
+        self._export_metrics()
+
+    def check_health(self) -> dict:
+        """
+        Builds each service if needed and runs its health check.
+        Returns {service: {"ok": bool, "detail": str}}; a broken service doesn't hide the state of the others.
+        """
+        report = {}
+        missing = missing_api_keys()
+        report["config"] = {"ok": not missing, "detail": f"Missing: {', '.join(missing)}" if missing else "All API keys set."}
+        for name in self.SERVICES:
+            try:
+                service = getattr(self, name)
+                report[name] = service.health_check() if hasattr(service, "health_check") else {"ok": True, "detail": "Ready."}
+            except Exception as e:
+                report[name] = {"ok": False, "detail": f"Failed to start: {e}"}
+        return report
 
     # --- MODIFIED: The main function to generate and publish a single carousel post ---
-    def generate_and_publish_all_astrology_posts(self):
+    def generate_and_publish_all_astrology_posts(self, run_date: date | None = None, on_progress=None):
         print("ORCHESTRATOR: Initiating run to create one carousel post for all signs...")
+
+        # The day's journal: completed stages from earlier attempts are reused, not redone
+        run_state = RunStateStore(run_date)
+        if run_state.is_published():
+            print(f"ORCHESTRATOR: The carousel for {run_state.run_date} was already published. Nothing to do.")
+            return []
         
-        # Step 1: Generate all 12 post images and collect their data
-        post_packages = self.instagram_service.create_daily_astrology_post_for_all_signs()
-        
-        if not post_packages or len(post_packages) < 12:
-            print("ORCHESTRATOR: Generation phase failed. Not enough posts to create a carousel.")
+        # One trace covers the whole run, so its spans can be read back together from the event log
+        with get_telemetry().span("run.generate_and_publish", run_date=run_state.run_date):
+            # Step 1: Generate all 12 post images and collect their data.
+            # Each image starts uploading as soon as it is rendered, while the other signs are still in progress.
+            publisher = self.instagram_service.create_carousel_publisher(run_state)
+            try:
+                post_packages = self._generate_carousel(run_state, on_progress, on_package=publisher.submit)
+                if not post_packages:
+                    return []
+
+                # Step 2: Create a single, master caption for the carousel post
+                master_caption = self._create_master_caption(post_packages)
+
+                # Step 3: Publish all images as one carousel
+                return self._publish_carousel(run_state, post_packages, master_caption, on_progress, publisher)
+            finally:
+                # Stops the upload threads on every path (publish() already did if it ran; closing twice is harmless).
+                # Finished uploads stay journaled, so the next attempt only uploads the rest.
+                publisher.close()
+
+    # --- Background runs for the dashboard ---
+    GENERATE_AND_PUBLISH_JOB = "generate_and_publish"
+
+    def submit_generate_and_publish(self, run_date: date | None = None) -> str:
+        """
+        Starts generate_and_publish_all_astrology_posts in the background and returns its job ID.
+        While a run for the same day is in flight, its ID is returned instead of starting another.
+        """
+        run_date = run_date or date.today()
+        return self.job_runner.submit(
+            f"{self.GENERATE_AND_PUBLISH_JOB}:{run_date.isoformat()}",
+            self.generate_and_publish_all_astrology_posts, run_date
+        )
+
+    def get_job(self, job_id: str) -> dict | None:
+        return self.job_runner.get(job_id)
+
+    def get_latest_generate_and_publish_job(self, run_date: date | None = None) -> dict | None:
+        run_date = run_date or date.today()
+        return self.job_runner.latest(f"{self.GENERATE_AND_PUBLISH_JOB}:{run_date.isoformat()}")
+
+    def is_carousel_published(self, run_date: date | None = None) -> bool:
+        return RunStateStore(run_date or date.today()).is_published()
+
+    # --- Prefetch: generate ahead of time, publish from the staging area ---
+    def stage_carousel_post(self, run_date: date) -> dict | None:
+        """Generates and renders the carousel of run_date now and stages it for publishing later."""
+        print(f"ORCHESTRATOR: Prefetching the carousel for {run_date}...")
+        run_state = RunStateStore(run_date)
+        if run_state.is_published():
+            print(f"ORCHESTRATOR: The carousel for {run_date} was already published. Nothing to stage.")
+            return None
+        post_packages = self._generate_carousel(run_state)
+        if not post_packages:
+            return None
+        return self.staging.stage(run_date, post_packages, self._create_master_caption(post_packages))
+
+    def publish_staged_carousel_post(self, run_date: date | None = None):
+        """
+        Publishes the staged carousel of run_date (today by default).
+        Falls back to generating it on the spot when nothing fresh is staged or the staged upload fails.
+        After a failed upload the staged renders are dropped from the journal, so they are rendered again
+        (from the journaled text and photos) instead of being uploaded once more.
+        """
+        run_state = RunStateStore(run_date)
+        if run_state.is_published():
+            print(f"ORCHESTRATOR: The carousel for {run_state.run_date} was already published. Nothing to do.")
             return []
 
-        # Step 2: Extract all image paths into a list
+        manifest = self.staging.load(run_state.run_date)
+        if manifest:
+            published = self._publish_carousel(run_state, manifest['posts'], manifest['caption'])
+            if published:
+                self.staging.discard(run_state.run_date)
+                return published
+            print("ORCHESTRATOR: Publishing the staged carousel failed. Re-rendering before retrying...")
+            self.staging.discard(run_state.run_date)
+            for post in manifest['posts']:
+                run_state.invalidate(post['sign'], "image_rendered", "uploaded")
+        return self.generate_and_publish_all_astrology_posts(run_state.run_date)
+
+    def prepare_astro_data(self, run_date: date | None = None) -> dict:
+        """Generates and journals the text of every sign for run_date without rendering anything."""
+        require_api_keys()
+        run_state = RunStateStore(run_date)
+        print(f"ORCHESTRATOR: Preparing the astro data for {run_state.run_date}...")
+        # Nothing renders afterwards, so signs the batch misses are requested on their own right here
+        return self.instagram_service.collect_astro_data(run_state, fallback_to_single=True)
+
+    def publish_to_accounts(self, run_date: date | None = None, account_names: list[str] | None = None) -> dict:
+        """
+        Publishes the carousel of run_date to several accounts of the pool (all enabled ones by default).
+        The carousel is generated, or taken from staging, once and uploaded to the accounts concurrently.
+        Accounts that already have it are skipped. Returns {account: success}.
+        """
+        run_state = RunStateStore(run_date)
+        names = account_names or self.account_pool.enabled_account_names()
+        results = {name: True for name in names if run_state.is_published(name)}
+        pending = [name for name in names if name not in results]
+        if not pending:
+            print(f"ORCHESTRATOR: The carousel for {run_state.run_date} is already on every account.")
+            return results
+
+        manifest = self.staging.load(run_state.run_date)
+        if manifest:
+            post_packages, caption = manifest['posts'], manifest['caption']
+        else:
+            post_packages = self._generate_carousel(run_state)
+            if not post_packages:
+                return {**results, **{name: False for name in pending}}
+            caption = self._create_master_caption(post_packages)
+
         image_paths = [post['path'] for post in post_packages]
+        telemetry = get_telemetry()
+        try:
+            with telemetry.span("run.publish_accounts", run_date=run_state.run_date, accounts=len(pending)):
+                published = self.account_pool.publish(
+                    telemetry.propagate(
+                        lambda client, name: self.instagram_service.create_carousel_publisher(
+                            run_state, account=name, client=client, upload_slots=self.account_pool.upload_slots(name)
+                        ).publish(post_packages, caption)
+                    ),
+                    pending
+                )
+        finally:
+            self._export_metrics()
+        for name, success in published.items():
+            if success:
+                run_state.record(RunStateStore.carousel_key(name), "published", paths=image_paths)
+        self.account_pool.report_metrics()
+        return {**results, **published}
+
+    def stream_post_packages(self, run_date: date | None = None, max_in_flight: int | None = None):
+        """
+        Yields the post packages of run_date one at a time as they finish, journaled like any run, with at
+        most max_in_flight (default STREAM_MAX_IN_FLIGHT) signs in progress or waiting for the consumer.
+        For consumers that handle each post on its own and never need the whole carousel in memory.
+        """
+        require_api_keys()
+        run_state = RunStateStore(run_date)
+        try:
+            yield from self.instagram_service.iter_astrology_post_packages(
+                run_state, max_in_flight=max_in_flight or self.max_in_flight or STREAM_MAX_IN_FLIGHT
+            )
+        finally:
+            self._export_metrics()
 
-        # Step 3: Create a single, master caption for the carousel post
-        master_caption = self._create_master_caption(post_packages)
+    def _generate_carousel(self, run_state: RunStateStore, on_progress=None, on_package=None) -> list | None:
+        """Runs the generation phase. Returns the 12 post packages, or None if some signs are still missing."""
+        require_api_keys()
+        try:
+            with get_telemetry().span("run.generate", run_date=run_state.run_date) as span:
+                post_packages = self.instagram_service.create_daily_astrology_post_for_all_signs(
+                    run_state=run_state, on_progress=on_progress, on_package=on_package, max_in_flight=self.max_in_flight
+                )
+                span["signs"] = len(post_packages)
+        finally:
+            self._export_metrics()
+        if not post_packages or len(post_packages) < 12:
+            print(f"ORCHESTRATOR: Generation phase incomplete ({len(post_packages)}/12 signs). "
+                  f"Progress is saved in {run_state.path}; run again to retry only the missing signs.")
+            return None
+        return post_packages
 
+    def _publish_carousel(self, run_state: RunStateStore, post_packages: list, caption: str,
+                          on_progress=None, publisher=None) -> list:
+        """Uploads the carousel through publisher (a fresh one if none was started during generation)."""
         print("\n🚀 ORCHESTRATOR: Publishing all signs as a single carousel post... 🚀")
-        
-        # Step 4: Call the new carousel publishing function
-        success = self.instagram_service.publish_carousel_post(
-            image_paths=image_paths,
-            caption=master_caption
-        )
+        image_paths = [post['path'] for post in post_packages]
+        notify_progress(on_progress, RunStateStore.CAROUSEL, "publishing")
+        start = time.perf_counter()
+        publisher = publisher or self.instagram_service.create_carousel_publisher(run_state)
+        try:
+            with get_telemetry().span("run.publish", run_date=run_state.run_date, items=len(post_packages)) as span:
+                success = span["published"] = publisher.publish(post_packages, caption)
+        finally:
+            self._export_metrics()
+        notify_progress(on_progress, RunStateStore.CAROUSEL, "published" if success else "failed", time.perf_counter() - start)
         
         if success:
+            for post in post_packages:
+                run_state.record(post['sign'], "published")
+            run_state.record(RunStateStore.CAROUSEL, "published", paths=image_paths)
             print("\n🏁 ORCHESTRATOR: Carousel post published successfully! 🏁")
             return post_packages # Return the data to confirm success
         else:
             print("\n❌ ORCHESTRATOR: Failed to publish the carousel post. ❌")
             return []
     
+    @staticmethod
+    def _export_metrics():
+        """Refreshes the Prometheus metrics file; a failed write never fails the run."""
+        try:
+            get_telemetry().write_prometheus()
+        except OSError as e:
+            print(f"⚠️ ORCHESTRATOR: Could not write the metrics file: {e}")
+
     # --- NEW: Helper function to build the combined caption ---
     def _create_master_caption(self, post_packages: list) -> str:
         """Builds a single descriptive caption from all individual post data."""
@@ -81,8 +370,8 @@ class MainOrchestrator:
     def get_instagram_status(self):
         return self.instagram_connection.get_status()
 
-    def start_automation(self, run_time: str):
-        self.scheduler.start(run_time)
+    def start_automation(self, run_time: str, prefetch_lead_hours: float | None = None):
+        self.scheduler.start(run_time, prefetch_lead_hours)
 
     def stop_automation(self):
         self.scheduler.stop()
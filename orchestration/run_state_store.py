@@ -0,0 +1,87 @@
+# /orchestration/run_state_store.py
+
+import os
+import json
+import threading
+from datetime import date, datetime
+from config import RUN_STATE_DIR
+
+class RunStateStore:
+    """
+    Append-only JSON-lines journal of one day's run, keyed by sign and stage.
+    Every completed stage is written (and fsynced) as soon as it finishes, so a retry
+    or a restart after a crash can pick up where the previous attempt stopped.
+    """
+    STAGES = ("astro_data", "image_fetched", "image_rendered", "uploaded", "published")
+    # Pseudo-sign under which run-wide stages (e.g. the carousel upload) are recorded
+    CAROUSEL = "carousel"
+
+    def __init__(self, run_date: date | None = None, state_dir: str = RUN_STATE_DIR):
+        self.run_date = run_date or date.today()
+        os.makedirs(state_dir, exist_ok=True)
+        self.path = os.path.join(state_dir, f"{self.run_date.isoformat()}.jsonl")
+        self._lock = threading.Lock()
+        self._state = self._load()
+
+    def record(self, sign: str, stage: str, **payload) -> None:
+        """Marks a stage as completed for a sign, together with its output (paths, data, IDs)."""
+        if stage not in self.STAGES:
+            raise ValueError(f"Unknown run stage '{stage}'.")
+        entry = {"sign": sign, "stage": stage, "at": datetime.now().isoformat(timespec="seconds"), **payload}
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._state.setdefault(sign, {})[stage] = entry
+
+    def invalidate(self, sign: str, *stages: str) -> None:
+        """Forgets completed stages of a sign (e.g. renders Instagram rejected), so the next attempt redoes them."""
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                for stage in stages:
+                    entry = {"sign": sign, "stage": stage, "at": datetime.now().isoformat(timespec="seconds"), "invalidated": True}
+                    f.write(json.dumps(entry) + "\n")
+                    self._state.get(sign, {}).pop(stage, None)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def get(self, sign: str, stage: str) -> dict | None:
+        """Returns the latest journal entry for (sign, stage), or None if that stage never completed."""
+        with self._lock:
+            return self._state.get(sign, {}).get(stage)
+
+    @staticmethod
+    def account_key(sign: str, account: str | None = None) -> str:
+        """Journal key of an account-specific stage (uploads, publishing) when publishing to several accounts."""
+        return f"{sign}@{account}" if account else sign
+
+    @classmethod
+    def carousel_key(cls, account: str | None = None) -> str:
+        """Pseudo-sign of the carousel upload; one per account when publishing to several accounts."""
+        return cls.account_key(cls.CAROUSEL, account)
+
+    def is_published(self, account: str | None = None) -> bool:
+        return self.get(self.carousel_key(account), "published") is not None
+
+    def summary(self) -> dict:
+        """Returns {stage: number of signs that completed it}."""
+        with self._lock:
+            return {stage: sum(1 for sign, stages in self._state.items() if sign != self.CAROUSEL and "@" not in sign and stage in stages)
+                    for stage in self.STAGES}
+
+    def _load(self) -> dict:
+        state = {}
+        if not os.path.exists(self.path): return state
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A crash mid-write can leave a truncated last line; everything before it is still valid
+                    continue
+                if entry.get("invalidated"):
+                    state.get(entry["sign"], {}).pop(entry["stage"], None)
+                else:
+                    state.setdefault(entry["sign"], {})[entry["stage"]] = entry
+        return state
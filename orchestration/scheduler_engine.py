@@ -0,0 +1,186 @@
+# /orchestration/scheduler_engine.py
+
+import os
+import json
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, time as dt_time, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+from config import SCHEDULER_STATE_DIR
+
+# Upper bound on one sleep, so wall-clock jumps (NTP, DST, suspend) are noticed reasonably soon.
+MAX_SLEEP_SECONDS = 300
+
+@dataclass
+class ScheduledJob:
+    """
+    A job that runs at one or more wall-clock times every day. action receives the slot it runs for
+    and raises if the run failed; only successful runs count as done for catching up.
+    """
+    name: str
+    times: list[dt_time]
+    action: Callable[[datetime], None]
+    catch_up: bool = True
+    next_run: datetime | None = None
+    last_run: datetime | None = None
+    last_failure: datetime | None = None
+    is_running: bool = False
+    skipped_overlaps: int = field(default=0)
+
+    def next_slot_after(self, moment: datetime) -> datetime:
+        candidates = []
+        for day in (moment.date(), moment.date() + timedelta(days=1)):
+            candidates += [datetime.combine(day, slot) for slot in self.times]
+        return min(candidate for candidate in candidates if candidate > moment)
+
+    def latest_slot_at_or_before(self, moment: datetime) -> datetime:
+        candidates = []
+        for day in (moment.date() - timedelta(days=1), moment.date()):
+            candidates += [datetime.combine(day, slot) for slot in self.times]
+        return max(candidate for candidate in candidates if candidate <= moment)
+
+class SchedulerEngine:
+    """
+    Event-driven scheduler with its own, independent set of jobs.
+    A single timer thread sleeps on a condition until the earliest job is due (or the
+    job list changes), hands due jobs to a small worker pool, and never starts a job
+    while its previous run is still going. The last successfully completed slot of every
+    job is persisted, so runs missed (or failed) before the process went down are caught up on start.
+    """
+    def __init__(self, name: str = "default", state_dir: str = SCHEDULER_STATE_DIR, max_parallel_jobs: int = 2):
+        self.name = name
+        os.makedirs(state_dir, exist_ok=True)
+        self.state_path = os.path.join(state_dir, f"{name}.json")
+        self._jobs = {}
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+        self._executor = ThreadPoolExecutor(max_workers=max_parallel_jobs, thread_name_prefix=f"{name}-job")
+        self._saved_state = self._load_state()
+
+    # --- Job management ---
+    def add_job(self, name: str, times: list[str], action: Callable[[datetime], None], catch_up: bool = True) -> ScheduledJob:
+        """Registers a daily job at the given "HH:MM" times. Replaces any job with the same name."""
+        slots = sorted(datetime.strptime(value, "%H:%M").time() for value in times)
+        job = ScheduledJob(name=name, times=slots, action=action, catch_up=catch_up)
+        now = datetime.now()
+        job.next_run = job.next_slot_after(now)
+
+        if self._saved_state.get(name):
+            job.last_run = datetime.fromisoformat(self._saved_state[name])
+        if self._saved_state.get(f"{name}:failed"):
+            job.last_failure = datetime.fromisoformat(self._saved_state[f"{name}:failed"])
+        if job.last_run or job.last_failure:
+            missed_slot = job.latest_slot_at_or_before(now)
+            # A job that never succeeded still owes the slot it failed
+            if (job.last_run is None and job.last_failure <= missed_slot) or (job.last_run and job.last_run < missed_slot):
+                print(f"⚠️ SCHEDULER[{self.name}]: '{name}' missed its {missed_slot:%Y-%m-%d %H:%M} run "
+                      f"(last successful run {f'{job.last_run:%Y-%m-%d %H:%M}' if job.last_run else 'never'}).")
+                if catch_up:
+                    # Due immediately; the loop runs it for the slot it missed
+                    job.next_run = missed_slot
+
+        with self._condition:
+            self._jobs[name] = job
+            self._condition.notify()
+        return job
+
+    def remove_job(self, name: str):
+        with self._condition:
+            self._jobs.pop(name, None)
+            self._condition.notify()
+
+    def clear(self):
+        """Removes this engine's jobs only; other engines in the process are unaffected."""
+        with self._condition:
+            self._jobs.clear()
+            self._condition.notify()
+
+    def get_status(self) -> list[dict]:
+        with self._condition:
+            return [{
+                "name": job.name,
+                "next_run": job.next_run.isoformat(timespec="minutes") if job.next_run else None,
+                "last_run": job.last_run.isoformat(timespec="minutes") if job.last_run else None,
+                "last_failure": job.last_failure.isoformat(timespec="minutes") if job.last_failure else None,
+                "is_running": job.is_running,
+                "skipped_overlaps": job.skipped_overlaps
+            } for job in self._jobs.values()]
+
+    # --- Lifecycle ---
+    def start(self):
+        with self._condition:
+            if self._running: return
+            self._running = True
+        self._thread = threading.Thread(target=self._loop, name=f"{self.name}-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2):
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    # --- Internals ---
+    def _loop(self):
+        with self._condition:
+            while self._running:
+                now = datetime.now()
+                for job in list(self._jobs.values()):
+                    if job.next_run and job.next_run <= now:
+                        self._dispatch(job, job.next_run)
+                        job.next_run = job.next_slot_after(now)
+
+                upcoming = [job.next_run for job in self._jobs.values() if job.next_run]
+                timeout = MAX_SLEEP_SECONDS
+                if upcoming:
+                    timeout = min(timeout, max(0.0, (min(upcoming) - datetime.now()).total_seconds()))
+                # Woken early by add_job/remove_job/stop
+                self._condition.wait(timeout=timeout)
+
+    def _dispatch(self, job: ScheduledJob, slot: datetime):
+        """Starts a job for its slot unless its previous run is still in progress. Called with the lock held."""
+        if job.is_running:
+            job.skipped_overlaps += 1
+            print(f"⚠️ SCHEDULER[{self.name}]: '{job.name}' is still running; skipping the {slot:%H:%M} slot.")
+            return
+        job.is_running = True
+        self._executor.submit(self._execute, job, slot)
+
+    def _execute(self, job: ScheduledJob, slot: datetime):
+        succeeded = False
+        try:
+            job.action(slot)
+            succeeded = True
+        except Exception as e:
+            print(f"❌ SCHEDULER[{self.name}]: '{job.name}' failed for the {slot:%Y-%m-%d %H:%M} slot: {e}")
+        finally:
+            with self._condition:
+                job.is_running = False
+                # A failed slot is recorded on its own and doesn't move last_run, so a restart still catches it up
+                if succeeded:
+                    job.last_run = slot
+                    self._saved_state[job.name] = slot.isoformat()
+                else:
+                    job.last_failure = slot
+                    self._saved_state[f"{job.name}:failed"] = slot.isoformat()
+                self._save_state()
+
+    def _load_state(self) -> dict:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        temp_path = self.state_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self._saved_state, f, indent=2)
+        os.replace(temp_path, self.state_path)
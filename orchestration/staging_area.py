@@ -0,0 +1,77 @@
+# /orchestration/staging_area.py
+
+import os
+import json
+import shutil
+from datetime import date, datetime, time, timedelta
+from config import STAGING_DIR, STAGING_MAX_AGE_HOURS
+
+class StagingArea:
+    """
+    Holds fully rendered carousels ahead of their publish date.
+    Each date gets a folder with copies of its images and a manifest.json describing
+    them, so publishing only needs an upload and doesn't depend on run folders that
+    may be pruned in the meantime.
+    """
+    MANIFEST = "manifest.json"
+
+    def __init__(self, staging_dir: str = STAGING_DIR, max_age_hours: float = STAGING_MAX_AGE_HOURS):
+        self.staging_dir = staging_dir
+        self.max_age = timedelta(hours=max_age_hours)
+        os.makedirs(self.staging_dir, exist_ok=True)
+
+    def stage(self, run_date: date, post_packages: list, caption: str) -> dict:
+        """Copies the carousel images into the staging folder of run_date and writes its manifest."""
+        directory = self._directory(run_date)
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+
+        posts = []
+        for index, package in enumerate(post_packages):
+            staged_path = os.path.join(directory, f"{index:02d}_{package['sign']}{os.path.splitext(package['path'])[1]}")
+            shutil.copyfile(package['path'], staged_path)
+            posts.append({"sign": package['sign'], "description": package.get('description', ''), "path": staged_path})
+
+        manifest = {
+            "date": run_date.isoformat(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "caption": caption,
+            "posts": posts
+        }
+        # The manifest is written last and renamed into place, so a half-staged carousel has none
+        temp_path = os.path.join(directory, self.MANIFEST + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(temp_path, os.path.join(directory, self.MANIFEST))
+        print(f"📦 STAGING: Carousel for {run_date} staged with {len(posts)} images.")
+        return manifest
+
+    def load(self, run_date: date, expected_posts: int = 12) -> dict | None:
+        """Returns the staged manifest of run_date, or None if it is missing, stale or incomplete."""
+        manifest_path = os.path.join(self._directory(run_date), self.MANIFEST)
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            print(f"ℹ️ STAGING: No staged carousel for {run_date}.")
+            return None
+
+        if manifest.get("date") != run_date.isoformat():
+            print(f"⚠️ STAGING: Staged carousel is for {manifest.get('date')}, not {run_date}.")
+            return None
+        # A carousel staged days ahead is as fresh as its date: its age only counts from the start of that day
+        age = datetime.now() - max(datetime.fromisoformat(manifest["created_at"]), datetime.combine(run_date, time.min))
+        if age > self.max_age:
+            print(f"⚠️ STAGING: Staged carousel for {run_date} is stale ({age} old).")
+            return None
+        posts = manifest.get("posts", [])
+        if len(posts) < expected_posts or not all(os.path.exists(post["path"]) for post in posts):
+            print(f"⚠️ STAGING: Staged carousel for {run_date} is incomplete.")
+            return None
+        return manifest
+
+    def discard(self, run_date: date):
+        shutil.rmtree(self._directory(run_date), ignore_errors=True)
+
+    def _directory(self, run_date: date) -> str:
+        return os.path.join(self.staging_dir, run_date.isoformat())
@@ -0,0 +1,165 @@
+# /platform_services/carousel_publisher.py
+
+import json
+import time
+import threading
+from pathlib import Path
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, Future
+from config import (
+    CAROUSEL_UPLOAD_WORKERS, CAROUSEL_UPLOAD_MAX_AGE_HOURS,
+    CAROUSEL_CONFIGURE_ATTEMPTS, CAROUSEL_CONFIGURE_DELAY_SECONDS
+)
+from core_services.outbound_client_service import RetryPolicy
+from core_services.telemetry import get_telemetry
+from orchestration.run_state_store import RunStateStore
+
+class CarouselPublisher:
+    """
+    Publishes a carousel in two steps, the way instagrapi's album_upload does internally:
+    every item is uploaded on its own (photo_rupload with to_album=True) and the album is
+    then configured once from the collected upload IDs.
+
+    Items can be submitted while the rest of the carousel is still rendering, so uploads
+    overlap with rendering. With a run journal every upload ID is checkpointed, and a retry
+    only re-sends the items that are missing (or whose upload is too old to be reused).
+    upload_slots, a semaphore shared per account, caps the uploads in flight to that account.
+    """
+    def __init__(self, client, run_state: RunStateStore | None = None, account: str | None = None,
+                 upload_workers: int = CAROUSEL_UPLOAD_WORKERS, max_upload_age_hours: float = CAROUSEL_UPLOAD_MAX_AGE_HOURS,
+                 item_retry_policy: RetryPolicy = RetryPolicy(max_attempts=3, base_delay=2.0, max_delay=30.0),
+                 configure_attempts: int = CAROUSEL_CONFIGURE_ATTEMPTS, configure_delay: float = CAROUSEL_CONFIGURE_DELAY_SECONDS,
+                 upload_slots: threading.Semaphore | None = None):
+        self.client = client
+        self.run_state = run_state
+        self.account = account
+        self.max_upload_age = timedelta(hours=max_upload_age_hours)
+        self.item_retry_policy = item_retry_policy
+        self.configure_attempts = max(1, configure_attempts)
+        self.configure_delay = configure_delay
+        self.upload_slots = upload_slots
+        # Nothing is uploaded for a logged-out client; publish() reports it
+        self.ready = bool(client and client.user_id)
+        self.stats = {"uploaded": 0, "reused": 0, "failed": 0}
+        self.telemetry = get_telemetry()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, upload_workers), thread_name_prefix="upload")
+        self._uploads = {}
+        self._lock = threading.Lock()
+
+    def submit(self, package: dict) -> Future | None:
+        """Starts uploading one carousel item ({"sign", "path"}) in the background. Idempotent per sign and path."""
+        if not self.ready: return None
+        key = (package['sign'], package['path'])
+        with self._lock:
+            if key not in self._uploads:
+                self._uploads[key] = self._executor.submit(self.telemetry.propagate(self._upload_item), package['sign'], package['path'])
+            return self._uploads[key]
+
+    def publish(self, post_packages: list, caption: str) -> bool:
+        """Uploads whatever is not uploaded yet, then configures the album in carousel order."""
+        try:
+            if not self.ready:
+                print("❌ Error: Instagram client is not logged in. Cannot publish.")
+                return False
+            if not post_packages or len(post_packages) < 2:
+                print("❌ Error: A carousel post requires at least 2 images.")
+                return False
+
+            print(f"   - ⬆️  Uploading a carousel post with {len(post_packages)} images...")
+            futures = [self.submit(package) for package in post_packages]
+            children, failed = [], []
+            for package, future in zip(post_packages, futures):
+                try:
+                    children.append(future.result())
+                except Exception as e:
+                    failed.append(package['sign'])
+                    print(f"   - ❌ Upload of the {package['sign']} image failed: {e}")
+            print(f"   - ⬆️  Items: {self.stats['uploaded']} uploaded, {self.stats['reused']} reused from an earlier attempt, {len(failed)} failed.")
+            if failed:
+                print(f"   - ❌ CRITICAL: Carousel not published; {len(failed)} items are missing. A retry re-sends only those.")
+                return False
+            return self._configure(children, caption)
+        finally:
+            self.close()
+
+    def close(self):
+        """Stops the upload threads. Uploads that already finished stay journaled for the next attempt."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    # --- Internals ---
+    def _upload_item(self, sign: str, path: str) -> dict:
+        with self.telemetry.span("instagram.upload_item", sign=sign, account=self.account) as span:
+            child = self._upload_or_reuse(sign, path, span)
+        self.telemetry.inc("instagram_uploads_total", outcome=span["outcome"], account=self.account or "default")
+        return child
+
+    def _upload_or_reuse(self, sign: str, path: str, span: dict) -> dict:
+        reused = self._journaled_upload(sign, path)
+        if reused:
+            with self._lock: self.stats["reused"] += 1
+            span["outcome"] = "reused"
+            return self._child_metadata(reused["upload_id"], reused["width"], reused["height"])
+
+        attempt = 0
+        while True:
+            try:
+                upload_id, width, height = self._rupload(path)
+                break
+            except Exception as e:
+                attempt += 1
+                if attempt >= self.item_retry_policy.max_attempts:
+                    with self._lock: self.stats["failed"] += 1
+                    self.telemetry.inc("instagram_uploads_total", outcome="failed", account=self.account or "default")
+                    raise
+                delay = self.item_retry_policy.delay(attempt)
+                print(f"   - 🔁 Upload of the {sign} image failed ({e}); retry {attempt}/{self.item_retry_policy.max_attempts - 1} in {delay:.1f}s")
+                time.sleep(delay)
+
+        if self.run_state:
+            self.run_state.record(RunStateStore.account_key(sign, self.account), "uploaded",
+                                  upload_id=upload_id, width=width, height=height, path=path)
+        with self._lock: self.stats["uploaded"] += 1
+        span.update(outcome="uploaded", attempts=attempt + 1)
+        return self._child_metadata(upload_id, width, height)
+
+    def _rupload(self, path: str) -> tuple[str, int, int]:
+        if not self.upload_slots:
+            return self.client.photo_rupload(Path(path), to_album=True)
+        with self.upload_slots:
+            return self.client.photo_rupload(Path(path), to_album=True)
+
+    def _journaled_upload(self, sign: str, path: str) -> dict | None:
+        """Returns the journaled upload of this exact file if it is still recent enough to be configured."""
+        if not self.run_state: return None
+        entry = self.run_state.get(RunStateStore.account_key(sign, self.account), "uploaded")
+        if not entry or entry.get("path") != path:
+            return None
+        if datetime.now() - datetime.fromisoformat(entry["at"]) > self.max_upload_age:
+            return None
+        return entry
+
+    @staticmethod
+    def _child_metadata(upload_id: str, width: int, height: int) -> dict:
+        # Same item metadata instagrapi's album_upload builds for a photo
+        return {
+            "upload_id": upload_id,
+            "edits": json.dumps({"crop_original_size": [width, height], "crop_center": [0.0, -0.0], "crop_zoom": 1.0}),
+            "extra": json.dumps({"source_width": width, "source_height": height}),
+            "scene_capture_type": "",
+            "scene_type": None
+        }
+
+    def _configure(self, children: list, caption: str) -> bool:
+        for attempt in range(1, self.configure_attempts + 1):
+            # Instagram needs a moment to process fresh uploads before they can be configured
+            time.sleep(self.configure_delay)
+            try:
+                with self.telemetry.span("instagram.configure", account=self.account, attempt=attempt, items=len(children)):
+                    configured = self.client.album_configure(children, caption)
+                if configured:
+                    print("   - ✅ Carousel post published successfully to Instagram!")
+                    return True
+            except Exception as e:
+                print(f"   - ⚠️ Configuring the carousel failed (attempt {attempt}/{self.configure_attempts}): {e}")
+        print("   - ❌ CRITICAL: Failed to publish carousel post to Instagram: the album could not be configured.")
+        return False
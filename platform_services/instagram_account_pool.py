@@ -0,0 +1,221 @@
+# /platform_services/instagram_account_pool.py
+
+import os
+import json
+import time
+import threading
+from collections import deque
+from dataclasses import dataclass, asdict, fields
+from concurrent.futures import ThreadPoolExecutor
+from config import (
+    INSTAGRAM_ACCOUNTS_FILE, INSTAGRAM_SESSIONS_DIR,
+    ACCOUNT_PUBLISH_CONCURRENCY, ACCOUNT_MAX_CONCURRENT_UPLOADS
+)
+from platform_services.instagram_connection_service import InstagramConnectionService
+
+# Publish latencies kept per account for the percentiles in get_metrics().
+LATENCY_WINDOW = 100
+
+@dataclass
+class InstagramAccount:
+    name: str
+    username: str | None = None
+    max_concurrent_uploads: int = ACCOUNT_MAX_CONCURRENT_UPLOADS
+    enabled: bool = True
+
+class InstagramAccountPool:
+    """
+    Registry of brand accounts plus one persisted Instagram session per account.
+    Content is produced once and handed to publish(), which uploads it to every account
+    concurrently: at most publish_concurrency accounts at a time, and at most
+    max_concurrent_uploads uploads per account, tracking latency and failures per account.
+    """
+    def __init__(self, registry_path: str = INSTAGRAM_ACCOUNTS_FILE, sessions_dir: str = INSTAGRAM_SESSIONS_DIR,
+                 publish_concurrency: int = ACCOUNT_PUBLISH_CONCURRENCY, connection_factory=InstagramConnectionService):
+        self.registry_path = registry_path
+        self.sessions_dir = sessions_dir
+        self.publish_concurrency = max(1, publish_concurrency)
+        self.connection_factory = connection_factory
+        os.makedirs(self.sessions_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._accounts = self._load_registry()
+        self._connections = {}
+        self._upload_slots = {}
+        self._metrics = {}
+
+    # --- Registry ---
+    @property
+    def accounts(self) -> list[InstagramAccount]:
+        with self._lock:
+            return list(self._accounts.values())
+
+    def enabled_account_names(self) -> list[str]:
+        return [account.name for account in self.accounts if account.enabled]
+
+    def add_account(self, name: str, username: str | None = None,
+                    max_concurrent_uploads: int = ACCOUNT_MAX_CONCURRENT_UPLOADS, enabled: bool = True) -> InstagramAccount:
+        """Adds or updates an account in the registry."""
+        account = InstagramAccount(name, username, max(1, max_concurrent_uploads), enabled)
+        with self._lock:
+            self._accounts[name] = account
+            # A new limit takes effect for the next upload
+            self._upload_slots.pop(name, None)
+            self._save_registry()
+        return account
+
+    def remove_account(self, name: str):
+        with self._lock:
+            self._accounts.pop(name, None)
+            self._connections.pop(name, None)
+            self._save_registry()
+
+    def session_path(self, name: str) -> str:
+        return os.path.join(self.sessions_dir, f"{name}.json")
+
+    # --- Sessions ---
+    def connection(self, name: str) -> InstagramConnectionService:
+        """The account's connection, created on first use; its saved session is restored when the client is first used."""
+        with self._lock:
+            if name not in self._accounts:
+                raise KeyError(f"Unknown Instagram account '{name}'.")
+            if name not in self._connections:
+                self._connections[name] = self.connection_factory(session_file=self.session_path(name))
+            return self._connections[name]
+
+    def login(self, name: str, username: str, password: str) -> dict:
+        if name not in {account.name for account in self.accounts}:
+            self.add_account(name, username)
+        return self.connection(name).login(username, password)
+
+    def logout(self, name: str) -> dict:
+        return self.connection(name).logout()
+
+    def get_status(self) -> list[dict]:
+        status = []
+        for account in self.accounts:
+            connection = self.connection(account.name)
+            status.append({**asdict(account), **connection.get_status()})
+        return status
+
+    # --- Publishing ---
+    def publish(self, upload, account_names: list[str] | None = None) -> dict:
+        """
+        Calls upload(client, account name) -> bool once per account, concurrently, with each account's logged-in client.
+        Returns {account name: success}.
+        """
+        names = account_names or self.enabled_account_names()
+        if not names:
+            print("⚠️ ACCOUNTS: No accounts to publish to.")
+            return {}
+        print(f"🚀 ACCOUNTS: Publishing to {len(names)} accounts, up to {self.publish_concurrency} at a time...")
+        with ThreadPoolExecutor(max_workers=min(self.publish_concurrency, len(names)), thread_name_prefix="account") as executor:
+            return dict(zip(names, executor.map(lambda name: self._publish_to_account(name, upload), names)))
+
+    def _publish_to_account(self, name: str, upload) -> bool:
+        try:
+            connection = self.connection(name)
+            client = connection.client
+        except Exception as e:
+            self._record(name, False, 0.0, str(e))
+            print(f"   - ❌ [{name}] Could not start the Instagram client: {e}")
+            return False
+        if not connection.is_logged_in:
+            self._record(name, False, 0.0, "not logged in")
+            print(f"   - ❌ [{name}] Not logged in. Run manual_login.py {name} first.")
+            return False
+
+        start = time.perf_counter()
+        error = None
+        try:
+            success = bool(upload(client, name))
+            if not success: error = "upload failed"
+        except Exception as e:
+            success, error = False, str(e)
+        latency = time.perf_counter() - start
+        self._record(name, success, latency, error)
+        print(f"   - {'✅' if success else '❌'} [{name}] {'published' if success else 'failed'} in {latency:.1f}s")
+        return success
+
+    def upload_slots(self, name: str) -> threading.BoundedSemaphore:
+        """The account's limit on concurrent item uploads, shared by every publisher uploading to it."""
+        with self._lock:
+            if name not in self._upload_slots:
+                account = self._accounts.get(name)
+                limit = account.max_concurrent_uploads if account else ACCOUNT_MAX_CONCURRENT_UPLOADS
+                self._upload_slots[name] = threading.BoundedSemaphore(limit)
+            return self._upload_slots[name]
+
+    # --- Metrics ---
+    def _record(self, name: str, success: bool, latency: float, error: str | None):
+        with self._lock:
+            metrics = self._metrics.setdefault(name, {
+                "attempts": 0, "successes": 0, "failures": 0, "latencies": deque(maxlen=LATENCY_WINDOW), "last_error": None
+            })
+            metrics["attempts"] += 1
+            metrics["successes" if success else "failures"] += 1
+            if latency: metrics["latencies"].append(latency)
+            if error: metrics["last_error"] = error
+
+    def get_metrics(self) -> dict:
+        """Returns {account: attempts, successes, failures, failure_rate, latency_p50_s, latency_p95_s, last_error}."""
+        with self._lock:
+            report = {}
+            for name, metrics in self._metrics.items():
+                latencies = sorted(metrics["latencies"])
+                report[name] = {
+                    "attempts": metrics["attempts"],
+                    "successes": metrics["successes"],
+                    "failures": metrics["failures"],
+                    "failure_rate": round(metrics["failures"] / metrics["attempts"], 3),
+                    "latency_p50_s": round(latencies[len(latencies) // 2], 2) if latencies else None,
+                    "latency_p95_s": round(latencies[max(0, int(len(latencies) * 0.95) - 1)], 2) if latencies else None,
+                    "last_error": metrics["last_error"]
+                }
+            return report
+
+    def report_metrics(self):
+        print("\n📊 Publishing per account:")
+        for name, metrics in self.get_metrics().items():
+            latency = f"p50 {metrics['latency_p50_s']}s, p95 {metrics['latency_p95_s']}s" if metrics['latency_p50_s'] is not None else "no uploads"
+            print(f"   - {name:<20} {metrics['successes']}/{metrics['attempts']} ok | {latency}"
+                  + (f" | last error: {metrics['last_error']}" if metrics['last_error'] else ""))
+
+    # --- Persistence ---
+    def _load_registry(self) -> dict:
+        try:
+            with open(self.registry_path, "r", encoding="utf-8") as f:
+                entries = json.load(f).get("accounts", [])
+        except (OSError, ValueError):
+            return {}
+        accounts = {}
+        for entry in entries:
+            account = self._account_from_entry(entry)
+            if account:
+                accounts[account.name] = account
+        return accounts
+
+    @staticmethod
+    def _account_from_entry(entry) -> InstagramAccount | None:
+        """Builds an account from a registry entry, ignoring unknown keys; None (with a warning) if the entry is unusable."""
+        if not isinstance(entry, dict) or not isinstance(entry.get("name"), str) or not entry["name"].strip():
+            print(f"⚠️ ACCOUNTS: Skipping a registry entry without a name: {entry!r}")
+            return None
+        known = {field.name for field in fields(InstagramAccount)}
+        ignored = sorted(set(entry) - known)
+        if ignored:
+            print(f"⚠️ ACCOUNTS: Ignoring unknown keys of account '{entry['name']}': {', '.join(ignored)}")
+        account = InstagramAccount(**{key: value for key, value in entry.items() if key in known})
+        limit = account.max_concurrent_uploads
+        if (account.username is not None and not isinstance(account.username, str)) \
+                or not isinstance(limit, int) or isinstance(limit, bool) or limit < 1 \
+                or not isinstance(account.enabled, bool):
+            print(f"⚠️ ACCOUNTS: Skipping account '{account.name}': invalid settings in the registry.")
+            return None
+        return account
+
+    def _save_registry(self):
+        """Called with the lock held."""
+        temp_path = self.registry_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"accounts": [asdict(account) for account in self._accounts.values()]}, f, indent=2)
+        os.replace(temp_path, self.registry_path)
@@ -1,25 +1,42 @@
 # /platform_services/instagram_connection_service.py
 
 import os
-from instagrapi import Client
+import threading
 
 class InstagramConnectionService:
     """
     Handles the connection, login, and session management for Instagram.
+    The instagrapi client is built, and a saved session restored, on first use of `client`
+    rather than on construction, so starting the app doesn't wait on Instagram.
     """
     SESSION_FILE = "instagram_session.json"
 
-    def __init__(self):
-        self.client = Client()
+    def __init__(self, session_file: str = SESSION_FILE):
+        # Each account keeps its own session file (see InstagramAccountPool)
+        self.session_file = session_file
+        self._client = None
+        self._client_lock = threading.Lock()
         self.is_logged_in = False
         self.username = None
-        
-        # Attempt to load a saved session on startup
-        if os.path.exists(self.SESSION_FILE):
+
+    @property
+    def client(self):
+        """The instagrapi client, logged in from the saved session if there is one."""
+        with self._client_lock:
+            if self._client is None:
+                # Imported here: instagrapi is slow to import and only needed once we talk to Instagram
+                from instagrapi import Client
+                self._client = Client()
+                self._restore_saved_session()
+            return self._client
+
+    def _restore_saved_session(self):
+        # Attempt to load a saved session
+        if os.path.exists(self.session_file):
             try:
-                self.client.load_settings(self.SESSION_FILE)
-                self.client.login_by_sessionid(self.client.sessionid)
-                self.username = self.client.username
+                self._client.load_settings(self.session_file)
+                self._client.login_by_sessionid(self._client.sessionid)
+                self.username = self._client.username
                 self.is_logged_in = True
                 print(f"✅ Successfully logged in from saved session as {self.username}.")
             except Exception as e:
@@ -37,7 +54,7 @@ class InstagramConnectionService:
             self.client.login(username, password)
             
             # Save the session settings to a file for future use
-            self.client.dump_settings(self.SESSION_FILE)
+            self.client.dump_settings(self.session_file)
             
             self.username = username
             self.is_logged_in = True
@@ -47,8 +64,8 @@ class InstagramConnectionService:
             print(f"❌ Login failed for {username}: {e}")
             self.is_logged_in = False
             # Ensure we clean up if the login fails
-            if os.path.exists(self.SESSION_FILE):
-                os.remove(self.SESSION_FILE)
+            if os.path.exists(self.session_file):
+                os.remove(self.session_file)
             return {"success": False, "message": str(e)}
     
     def logout(self):
@@ -58,8 +75,8 @@ class InstagramConnectionService:
         try:
             print(f"Logging out {self.username}...")
             self.client.logout()
-            if os.path.exists(self.SESSION_FILE):
-                os.remove(self.SESSION_FILE)
+            if os.path.exists(self.session_file):
+                os.remove(self.session_file)
             
             self.is_logged_in = False
             self.username = None
@@ -71,7 +88,17 @@ class InstagramConnectionService:
 
     def get_status(self):
         """Returns the current connection status."""
+        self.client # Restores the saved session on the first call
         return {
             "is_logged_in": self.is_logged_in,
             "username": self.username
         }
+
+    def health_check(self) -> dict:
+        try:
+            self.client
+        except Exception as e:
+            return {"ok": False, "detail": f"Instagram client unavailable: {e}"}
+        if not self.is_logged_in:
+            return {"ok": False, "detail": "Not logged in to Instagram."}
+        return {"ok": True, "detail": f"Logged in as {self.username}."}
@@ -1,108 +1,450 @@
 # /platform_services/instagram_service.py
 
 import os
-import requests
+import time
+import threading
 import random
-from config import PEXELS_API_KEY
-from pexels_api import API
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from config import PEXELS_API_KEY, PEXELS_API_BASE_URL, GENERATION_CONCURRENCY, STREAM_MAX_IN_FLIGHT, PEXELS_SEARCH_TTL_SECONDS
+from core_services.disk_cache_service import DiskCacheService
+from core_services.outbound_client_service import get_outbound_client, raise_for_retryable_status
+from core_services.image_post_generator_service import POST_WIDTH, POST_HEIGHT, RenderJob
+from core_services.run_workspace import RunWorkspace
+from core_services.telemetry import get_telemetry
+from orchestration.run_state_store import RunStateStore
+from platform_services.carousel_publisher import CarouselPublisher
+
+ZODIAC_SIGNS = [
+    "aries", "taurus", "gemini", "cancer", "leo", "virgo",
+    "libra", "scorpio", "sagittarius", "capricorn", "aquarius", "pisces"
+]
+
+# Images are streamed to disk in chunks of this size.
+DOWNLOAD_CHUNK_BYTES = 256 * 1024
+
+# Order in which the per-sign stages run; used for the timing report.
+PIPELINE_STAGES = ["astro_data", "image_fetch", "render"]
+
+def notify_progress(on_progress, sign: str, stage: str, seconds: float | None = None):
+    """Reports a finished stage to a progress callback. A failing callback never breaks the run."""
+    if not on_progress: return
+    try:
+        on_progress(sign, stage, seconds)
+    except Exception as e:
+        print(f"⚠️ Progress callback failed for {sign}/{stage}: {e}")
 
 class InstagramService:
-    def __init__(self, content_generator, image_post_generator, instagram_client):
+    def __init__(self, content_generator, image_post_generator, instagram_client, max_workers: int = GENERATION_CONCURRENCY,
+                 variants: tuple[str, ...] = ("portrait",)):
         self.content_generator = content_generator
         self.image_post_generator = image_post_generator
-        self.client = instagram_client
+        # Either the instagrapi client or a callable returning it, so it is only built once we publish
+        self._client = instagram_client
+        # How many signs are generated in parallel (1 = the old sequential behaviour)
+        self.max_workers = max(1, int(max_workers))
+        # Formats rendered per sign from one decode; the first (the portrait) goes into the carousel
+        self.variants = tuple(variants)
+        # Per-sign stage timings of the most recent run, e.g. {"aries": {"render": 0.8, ...}}
+        self.last_run_timings = {}
+        # Repeat queries and photos are served from disk instead of Pexels
+        self.search_cache = DiskCacheService("pexels_search")
+        self.image_cache = DiskCacheService("pexels_images")
+        # Rate-limited, retrying clients with pooled connections, shared with the rest of the process
+        self.pexels = get_outbound_client("pexels")
+        self.pexels_cdn = get_outbound_client("pexels_cdn")
+        self.bytes_downloaded = 0
+        self._bytes_lock = threading.Lock()
+        self.telemetry = get_telemetry()
         
         if not PEXELS_API_KEY:
-            self.pexels_api = None
+            self.pexels_api_key = None
             print("⚠️ Warning: Pexels API key not configured.")
         else:
-            self.pexels_api = API(PEXELS_API_KEY)
+            self.pexels_api_key = PEXELS_API_KEY
             print("✅ Instagram Service initialized with Pexels API.")
 
+    @property
+    def fresh_content(self) -> bool:
+        """True when the content generator bypasses its cache (--fresh-content); journaled text and renders are redone too."""
+        return bool(self.content_generator and self.content_generator.bypass_cache)
+
+    @property
+    def client(self):
+        return self._client() if callable(self._client) else self._client
+
+    def health_check(self) -> dict:
+        if not self.pexels_api_key:
+            return {"ok": False, "detail": "Pexels API key not configured."}
+        return {"ok": True, "detail": f"Pexels configured; generating up to {self.max_workers} signs in parallel."}
+
     # --- NEW: Function to publish a multi-image carousel post ---
-    def publish_carousel_post(self, image_paths: list[str], caption: str) -> bool:
+    def publish_carousel_post(self, image_paths: list[str], caption: str, client=None) -> bool:
         """
         Uploads multiple photos as a single carousel/album post.
+        client overrides the service's own client, e.g. to publish to another account of the pool.
+        """
+        post_packages = [{"sign": f"item{index:02d}", "path": path} for index, path in enumerate(image_paths)]
+        return self.create_carousel_publisher(client=client).publish(post_packages, caption)
+
+    def create_carousel_publisher(self, run_state: RunStateStore | None = None, account: str | None = None,
+                                  client=None, upload_slots=None) -> CarouselPublisher:
+        """
+        Returns a publisher that uploads carousel items as they are submitted and configures the album at the end.
+        With run_state the upload IDs are journaled (per account), so a retry only re-sends missing items.
+        upload_slots (a semaphore) caps the account's concurrent item uploads.
+        """
+        return CarouselPublisher(client or self.client, run_state=run_state, account=account, upload_slots=upload_slots)
+
+    def create_daily_astrology_post_for_all_signs(self, run_state: RunStateStore | None = None, on_progress=None,
+                                                  on_package=None, max_in_flight: int | None = None) -> list:
+        """
+        Generates the post packages of all 12 signs, in carousel order.
+        With a run_state journal, every completed stage is checkpointed and stages that
+        already completed in an earlier attempt of the same day are reused instead of redone.
+        on_progress(sign, stage, seconds=None) is called from the worker threads as each sign
+        finishes a stage, and with "done" or "failed" once the sign is finished.
+        on_package(package) receives every package as soon as it is ready, e.g. to start its upload.
+        max_in_flight limits how many signs are in progress at once (all of them by default).
+        """
+        print("\n🔮 Starting Daily Astrology Post Generation for ALL SIGNS 🔮")
+        in_flight = max(1, max_in_flight or len(ZODIAC_SIGNS))
+        results = list(self._generate_signs(run_state, on_progress, on_package, in_flight))
+        # Signs finish in any order; the carousel follows the zodiac
+        results.sort(key=lambda result: ZODIAC_SIGNS.index(result[0]))
+        all_posts = [package for _, package, _ in results if package]
+        print(f"\n✨ --- Generation Complete! Created {len(all_posts)} post packages. --- ✨")
+        return all_posts
+
+    def iter_astrology_post_packages(self, run_state: RunStateStore | None = None, on_progress=None,
+                                     max_in_flight: int = STREAM_MAX_IN_FLIGHT):
         """
+        Streaming variant of create_daily_astrology_post_for_all_signs: yields each package as soon as
+        it is ready, in completion order, and keeps nothing once it has been handed over.
+        At most max_in_flight signs are being generated or waiting for the consumer at any time,
+        so a slow consumer holds the pipeline back instead of letting finished work pile up.
+        Closing the generator early cancels the signs that haven't started.
+        """
+        print(f"\n🔮 Streaming Daily Astrology Post Generation, {max_in_flight} signs in flight 🔮")
+        for _, package, _ in self._generate_signs(run_state, on_progress, None, in_flight=max(1, max_in_flight)):
+            if package:
+                yield package
+        print("\n✨ --- Streaming Generation Complete! --- ✨")
+
+    def _generate_signs(self, run_state: RunStateStore | None, on_progress, on_package, in_flight: int):
+        """
+        Runs every sign on the pool and yields (sign, package or None, timings) as each one finishes.
+        A new sign is only started while fewer than in_flight are running or waiting to be taken.
+        """
+        # Each run writes into its own folder so overlapping runs can't overwrite each other's files
+        workspace = RunWorkspace()
+        workers = min(self.max_workers, in_flight, len(ZODIAC_SIGNS))
+        print(f"   - ⚙️  Running up to {workers} signs in parallel (run {workspace.run_id}).")
+        run_start = time.perf_counter()
+        astro_data_by_sign = self.collect_astro_data(run_state, on_progress)
+        # propagate() keeps the per-sign spans inside the caller's trace
+        create = self.telemetry.propagate(
+            lambda sign: self._create_post_package_for_sign(sign, astro_data_by_sign.get(sign), workspace, run_state, on_progress, on_package)
+        )
+
+        timings_by_sign = {}
+        remaining = list(ZODIAC_SIGNS)
+        pending = set()
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sign")
+        try:
+            while remaining or pending:
+                while remaining and len(pending) < in_flight:
+                    pending.add(executor.submit(create, remaining.pop(0)))
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    sign, package, timings = future.result()
+                    timings_by_sign[sign] = timings
+                    # The consumer runs here; nothing new starts until it asks for the next result
+                    yield sign, package, timings
+        finally:
+            # Also reached when a streaming consumer stops early: unstarted signs are dropped
+            executor.shutdown(wait=True, cancel_futures=True)
+            workspace.cleanup()
+            RunWorkspace.prune_old_runs()
+            self.last_run_timings = timings_by_sign
+            self._report_stage_timings(time.perf_counter() - run_start)
+            self._report_cache_stats()
+            print(f"   - 📦 Downloaded {self.bytes_downloaded / 1024 / 1024:.1f} MB from Pexels so far.")
+
+    def collect_astro_data(self, run_state: RunStateStore | None = None, on_progress=None,
+                           fallback_to_single: bool = False) -> dict:
+        """
+        Returns {sign: astro data} for the signs whose text is ready: journaled entries first,
+        then one batched request for the rest. Signs the batch misses are requested one by one
+        with fallback_to_single; otherwise they are left out and the per-sign stage of the
+        pipeline retries them on its own.
+        """
+        start = time.perf_counter()
+        astro_data_by_sign = {}
+        if run_state and not self.fresh_content:
+            print(f"   - 📒 Resuming from the run journal: {run_state.summary()}")
+            for sign in ZODIAC_SIGNS:
+                entry = run_state.get(sign, "astro_data")
+                if entry:
+                    astro_data_by_sign[sign] = entry["data"]
+                    self._notify(on_progress, sign, "astro_data")
+
+        # One completion for all remaining signs; any sign it misses is retried on its own inside the pool
+        missing_signs = [sign for sign in ZODIAC_SIGNS if sign not in astro_data_by_sign]
+        if missing_signs:
+            batch = self.content_generator.generate_astrology_data_batch(
+                missing_signs, fallback_to_single=fallback_to_single, run_date=run_state.run_date if run_state else None
+            )
+            batch_seconds = time.perf_counter() - start
+            for sign, data in batch.items():
+                self._checkpoint(run_state, sign, "astro_data", data=data)
+                self._notify(on_progress, sign, "astro_data", batch_seconds)
+            astro_data_by_sign.update(batch)
+            print(f"   - ⏱️  Batched astro data ready for {len(batch)}/{len(missing_signs)} signs in {batch_seconds:.2f}s")
+
+        return astro_data_by_sign
+
+    def _create_post_package_for_sign(self, sign: str, raw_data: dict | None = None,
+                                      workspace: RunWorkspace | None = None,
+                                      run_state: RunStateStore | None = None,
+                                      on_progress=None, on_package=None) -> tuple[str, dict | None, dict]:
+        """
+        Runs every stage for one sign. Returns (sign, package or None, stage timings).
+        raw_data can be passed in when it was already produced by the batched request.
+        """
+        with self.telemetry.span("sign", sign=sign) as span:
+            sign, package, timings = self._run_sign_stages(sign, raw_data, workspace, run_state, on_progress)
+            span["outcome"] = "done" if package else "failed"
+        self.telemetry.inc("signs_total", outcome=span["outcome"])
+        if package and on_package:
+            try:
+                on_package(package)
+            except Exception as e:
+                print(f"⚠️ Package callback failed for {sign}: {e}")
+        self._notify(on_progress, sign, "done" if package else "failed", sum(timings.values()))
+        return sign, package, timings
+
+    def _run_sign_stages(self, sign: str, raw_data: dict | None, workspace: RunWorkspace | None,
+                         run_state: RunStateStore | None, on_progress) -> tuple[str, dict | None, dict]:
+        workspace = workspace or RunWorkspace()
+        timings = {}
+        run_date = run_state.run_date if run_state else None
+        # A render journaled earlier shows the old text when the text is being regenerated
+        rendered = None if self.fresh_content else self._journaled_file(run_state, sign, "image_rendered")
+        if rendered and raw_data:
+            print(f"\n--- {sign.upper()}: already rendered earlier today, reusing {rendered['path']} ---")
+            return sign, self._build_package(sign, rendered["path"], rendered["run_id"], raw_data, timings, rendered.get("variants"), run_date), timings
+
+        print(f"\n--- Generating post for {sign.upper()} ---")
+        try:
+            if not raw_data:
+                raw_data = self._timed(timings, "astro_data", self.content_generator.generate_astrology_data, sign, run_date=run_date)
+                if not raw_data: return sign, None, timings
+                self._checkpoint(run_state, sign, "astro_data", data=raw_data)
+                self._notify(on_progress, sign, "astro_data", timings["astro_data"])
+
+            fetched = self._journaled_file(run_state, sign, "image_fetched")
+            if fetched:
+                base_image_path = fetched["path"]
+            else:
+                image_query = f"mystical {raw_data.get('color', 'space')} abstract"
+                base_image_path = self._timed(timings, "image_fetch", self._get_royalty_free_image, image_query)
+                if not base_image_path: return sign, None, timings
+                self._checkpoint(run_state, sign, "image_fetched", path=base_image_path)
+            self._notify(on_progress, sign, "image_fetch", timings.get("image_fetch"))
+
+            # Runs on the render process pool when it is enabled; this thread just waits for the result
+            variant_paths = self._timed(
+                timings, "render", self.image_post_generator.render_variants,
+                RenderJob(
+                    base_image_path=base_image_path,
+                    text=raw_data.get('description'),
+                    title=sign.capitalize(),
+                    output_dir=workspace.output_dir,
+                    scratch_dir=workspace.scratch_dir,
+                    variants=self.variants
+                )
+            )
+        except Exception as e:
+            print(f"❌ Unexpected error while generating the post for {sign}: {e}")
+            return sign, None, timings
+
+        final_post_path = (variant_paths or {}).get(self.variants[0])
+        if not final_post_path: return sign, None, timings
+        extra_variants = {name: path for name, path in variant_paths.items() if name != self.variants[0]} or None
+        self._checkpoint(run_state, sign, "image_rendered", path=final_post_path, run_id=workspace.run_id, variants=extra_variants)
+        self._notify(on_progress, sign, "render", timings["render"])
+
+        print(f"✅ Successfully created post package for {sign}!")
+        return sign, self._build_package(sign, final_post_path, workspace.run_id, raw_data, timings, extra_variants, run_date), timings
+
+    @staticmethod
+    def _build_package(sign: str, path: str, run_id: str, raw_data: dict, timings: dict, variants: dict | None = None,
+                       run_date: date | None = None) -> dict:
+        # The individual caption is not needed for the carousel; see get_caption_for_package
+        package = {
+            "sign": sign,
+            "path": path,
+            "run_id": run_id,
+            "astro_data": raw_data,
+            "description": raw_data.get('description', ''),
+            "timings": timings
+        }
+        if run_date:
+            # The day the text was written for; the individual caption is generated (and cached) for that day
+            package["run_date"] = run_date.isoformat()
+        if variants:
+            # Other formats of the same post, e.g. {"story": path}; not part of the carousel
+            package["variants"] = variants
+        return package
+
+    @staticmethod
+    def _checkpoint(run_state: RunStateStore | None, sign: str, stage: str, **payload):
+        if run_state:
+            run_state.record(sign, stage, **payload)
+
+    @staticmethod
+    def _notify(on_progress, sign: str, stage: str, seconds: float | None = None):
+        notify_progress(on_progress, sign, stage, seconds)
+
+    @staticmethod
+    def _journaled_file(run_state: RunStateStore | None, sign: str, stage: str) -> dict | None:
+        """Returns the journal entry of a file-producing stage, but only if its file is still on disk."""
+        entry = run_state.get(sign, stage) if run_state else None
+        if entry and os.path.exists(entry.get("path", "")):
+            return entry
+        return None
+
+    def get_caption_for_package(self, package: dict) -> str:
+        """
+        Returns the individual caption of a post package, generating it on first use.
+        The result is memoized on the package under "caption_text".
+        """
+        if not package.get("caption_text"):
+            astro_data = package.get("astro_data") or {"sign": package["sign"], "description": package.get("description")}
+            run_date = date.fromisoformat(package["run_date"]) if package.get("run_date") else None
+            package["caption_text"] = self.content_generator.create_astrology_caption(astro_data, run_date=run_date)
+        return package["caption_text"]
+
+    def publish_single_post(self, package: dict) -> bool:
+        """Uploads one post package as a regular photo post with its own caption."""
         if not self.client or not self.client.user_id:
             print("❌ Error: Instagram client is not logged in. Cannot publish.")
             return False
-        
-        if not image_paths or len(image_paths) < 2:
-            print("❌ Error: A carousel post requires at least 2 images.")
-            return False
-            
+
         try:
-            print(f"   - ⬆️  Attempting to upload a carousel post with {len(image_paths)} images...")
-            self.client.album_upload(
-                paths=image_paths,
-                caption=caption
-            )
-            print("   - ✅ Carousel post published successfully to Instagram!")
+            caption = self.get_caption_for_package(package)
+            print(f"   - ⬆️  Attempting to upload the {package['sign']} post...")
+            self.client.photo_upload(path=package["path"], caption=caption)
+            print("   - ✅ Post published successfully to Instagram!")
             return True
         except Exception as e:
-            print(f"   - ❌ CRITICAL: Failed to publish carousel post to Instagram: {e}")
+            print(f"   - ❌ Failed to publish post to Instagram: {e}")
             return False
 
-    def create_daily_astrology_post_for_all_signs(self) -> list:
-        print("\n🔮 Starting Daily Astrology Post Generation for ALL SIGNS 🔮")
-        zodiac_signs = [
-            "aries", "taurus", "gemini", "cancer", "leo", "virgo", 
-            "libra", "scorpio", "sagittarius", "capricorn", "aquarius", "pisces"
-        ]
-        
-        all_posts = []
-        for sign in zodiac_signs:
-            print(f"\n--- Generating post for {sign.upper()} ---")
-            raw_data = self.content_generator.generate_astrology_data(sign)
-            if not raw_data: continue
-            
-            caption = self.content_generator.create_astrology_caption(raw_data)
-            
-            image_query = f"mystical {raw_data.get('color', 'space')} abstract"
-            base_image_path = self._get_royalty_free_image(image_query)
-            if not base_image_path: continue
-            
-            final_post_path = self.image_post_generator.create_post_image(
-                base_image_path=base_image_path,
-                text=raw_data.get('description'),
-                title=sign.capitalize()
-            )
-            
-            if final_post_path:
-                print(f"✅ Successfully created post package for {sign}!")
-                # We store the full caption data now
-                all_posts.append({
-                    "sign": sign,
-                    "path": final_post_path,
-                    "caption_text": caption, # Original individual caption
-                    "description": raw_data.get('description', '')
-                })
-        
-        print(f"\n✨ --- Generation Complete! Created {len(all_posts)} post packages. --- ✨")
-        return all_posts
+    def _timed(self, timings: dict, stage: str, func, *args, **kwargs):
+        """Calls func in a stage span and records its wall-clock duration (seconds) under timings[stage]."""
+        start = time.perf_counter()
+        try:
+            with self.telemetry.span(f"stage.{stage}", stage=stage):
+                return func(*args, **kwargs)
+        finally:
+            timings[stage] = time.perf_counter() - start
+
+    def _report_stage_timings(self, wall_time: float):
+        """Prints the per-stage totals/slowest sign and compares the wall time with the sequential sum."""
+        print("\n⏱️  Stage timings:")
+        for stage in PIPELINE_STAGES:
+            durations = {sign: t[stage] for sign, t in self.last_run_timings.items() if stage in t}
+            if not durations: continue
+            slowest = max(durations, key=durations.get)
+            print(f"   - {stage:<12} total {sum(durations.values()):6.2f}s | slowest {durations[slowest]:6.2f}s ({slowest})")
+        sequential = sum(sum(t.values()) for t in self.last_run_timings.values())
+        print(f"   - wall time {wall_time:.2f}s vs {sequential:.2f}s of sequential work")
+
+    def _report_cache_stats(self):
+        for cache in (self.search_cache, self.image_cache):
+            stats = cache.stats()
+            print(f"   - 🗄️  {stats['namespace']}: {stats['hits']} hits / {stats['misses']} misses, "
+                  f"{stats['entries']} entries ({stats['bytes'] / 1024 / 1024:.1f} MB)")
 
     def _get_royalty_free_image(self, query: str) -> str | None:
-        # This function remains unchanged
-        if not self.pexels_api:
+        if not self.pexels_api_key:
             print("   - ❗ Pexels API not configured. Skipping image search.")
             return None
         try:
-            print(f"   - 🔎 Searching Pexels for: '{query}'...")
-            self.pexels_api.search(query, page=1, results_per_page=15)
-            photos = self.pexels_api.get_entries()
+            photos = self._search_pexels(query)
             if not photos:
                 print(f"   - ❗ No photos found on Pexels for '{query}'.")
                 return None
-            photo_url = random.choice(photos).original
-            response = requests.get(photo_url)
-            response.raise_for_status()
-            os.makedirs("generated_images", exist_ok=True)
-            temp_path = os.path.join("generated_images", "temp_pexels_image.jpg")
-            with open(temp_path, "wb") as f:
-                f.write(response.content)
-            print(f"   - ✅ Image downloaded successfully from Pexels.")
-            return temp_path
+            photo = random.choice(photos)
+            rendition, photo_url = self._choose_rendition(photo)
+            image_key = f"{photo['id']}:{rendition}"
+            cached_path = self.image_cache.get_file(image_key, ".jpg")
+            if cached_path:
+                print(f"   - 🗄️  Using cached Pexels photo {photo['id']} ({rendition}).")
+                return cached_path
+
+            temp_path = self.image_cache.reserve_temp_file(image_key, ".jpg")
+            try:
+                size = self._download_to_file(photo_url, temp_path)
+            except Exception:
+                if os.path.exists(temp_path): os.remove(temp_path)
+                raise
+            print(f"   - ✅ Image downloaded successfully from Pexels ({rendition}, {size / 1024:.0f} KB).")
+            return self.image_cache.commit_file(image_key, temp_path, ".jpg")
         except Exception as e:
             print(f"   - ❌ Error fetching image from Pexels: {e}")
             return None
+
+    @staticmethod
+    def _choose_rendition(photo: dict) -> tuple[str, str]:
+        """
+        Picks the smallest rendition of a Pexels photo that still covers a full post.
+        The stock renditions top out at 1300px (large2x) or 800x1200 (portrait), so when the
+        original is big enough we ask the Pexels image CDN for an exact post-sized crop instead.
+        """
+        original_url = photo['src']['original']
+        if photo.get('width', 0) >= POST_WIDTH and photo.get('height', 0) >= POST_HEIGHT:
+            separator = "&" if "?" in original_url else "?"
+            cover_url = f"{original_url}{separator}auto=compress&cs=tinysrgb&fit=crop&w={POST_WIDTH}&h={POST_HEIGHT}"
+            return "cover", cover_url
+        return "original", original_url
+
+    def _download_to_file(self, url: str, path: str) -> int:
+        """Streams url into path over the pooled session. Returns the number of bytes written."""
+        # A connection dropped mid-body restarts the whole download (the file is reopened for writing)
+        size = self.pexels_cdn.call(self._stream_once, url, path)
+        with self._bytes_lock:
+            self.bytes_downloaded += size
+        self.telemetry.inc("pexels_downloaded_bytes_total", size)
+        return size
+
+    def _stream_once(self, url: str, path: str) -> int:
+        size = 0
+        with self.pexels_cdn.session.get(url, stream=True, timeout=self.pexels_cdn.timeout) as response:
+            raise_for_retryable_status(response, url)
+            with open(path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
+                    f.write(chunk)
+                    size += len(chunk)
+        return size
+
+    def _search_pexels(self, query: str) -> list[dict]:
+        """Returns the raw photo entries for a query, from the search cache when still fresh."""
+        cache_key = query.strip().lower()
+        photos = self.search_cache.get_json(cache_key, ttl_seconds=PEXELS_SEARCH_TTL_SECONDS)
+        if photos is not None:
+            print(f"   - 🗄️  Using cached Pexels results for: '{query}'.")
+            return photos
+
+        print(f"   - 🔎 Searching Pexels for: '{query}'...")
+        response = self.pexels.request(
+            "GET", f"{PEXELS_API_BASE_URL}/search",
+            params={"query": query, "page": 1, "per_page": 15},
+            headers={"Authorization": self.pexels_api_key}
+        )
+        photos = response.json().get("photos", [])
+        if photos:
+            self.search_cache.set_json(cache_key, photos)
+        return photos
@@ -0,0 +1,63 @@
+# /platform_services/instagram_stub_client.py
+
+import time
+import threading
+from PIL import Image
+
+class StubInstagramClient:
+    """
+    Local stand-in for the instagrapi upload endpoints used by CarouselPublisher
+    (photo_rupload and album_configure). Nothing leaves the machine: uploads are recorded
+    in memory, optionally with injected latency and failures, so the publishing path can be
+    exercised in dry runs and benchmarks.
+    """
+    def __init__(self, upload_latency: float = 0.0, configure_latency: float = 0.0,
+                 fail_paths: set[str] | None = None, fail_configures: int = 0, fail_upload_calls: set[int] | None = None,
+                 username: str = "stub"):
+        self.user_id = "0"
+        self.username = username
+        self.upload_latency = upload_latency
+        self.configure_latency = configure_latency
+        # Paths whose upload always raises, upload calls (1-based, in call order) that raise once,
+        # and how many configure calls fail before one succeeds
+        self.fail_paths = set(fail_paths or ())
+        self.fail_upload_calls = set(fail_upload_calls or ())
+        self.fail_configures = fail_configures
+        self.upload_calls = 0
+        self.configure_calls = 0
+        self.uploads = []
+        self.albums = []
+        self._lock = threading.Lock()
+        self._next_id = int(time.time() * 1000)
+
+    def photo_rupload(self, path, upload_id: str = "", to_album: bool = False) -> tuple[str, int, int]:
+        time.sleep(self.upload_latency)
+        with self._lock:
+            self.upload_calls += 1
+            call = self.upload_calls
+        if call in self.fail_upload_calls:
+            raise ConnectionError(f"stub upload call {call} failed")
+        if str(path) in self.fail_paths:
+            raise ConnectionError(f"stub upload of {path} failed")
+        with Image.open(path) as img:
+            width, height = img.size
+        with self._lock:
+            self._next_id += 1
+            upload_id = upload_id or str(self._next_id)
+            self.uploads.append({"upload_id": upload_id, "path": str(path), "to_album": to_album})
+        return upload_id, width, height
+
+    def album_configure(self, childs: list, caption: str, usertags: list = [], location=None, extra_data: dict = {}) -> dict:
+        time.sleep(self.configure_latency)
+        with self._lock:
+            self.configure_calls += 1
+            if self.fail_configures > 0:
+                self.fail_configures -= 1
+                raise ConnectionError("stub configure failed")
+            known = {upload['upload_id'] for upload in self.uploads}
+            missing = [child['upload_id'] for child in childs if child['upload_id'] not in known]
+            if missing:
+                raise ValueError(f"unknown upload IDs: {missing}")
+            media = {"pk": str(len(self.albums) + 1), "media_type": 8, "carousel_media_count": len(childs), "caption_text": caption}
+            self.albums.append({"children": [child['upload_id'] for child in childs], "caption": caption})
+        return {"media": media, "status": "ok"}
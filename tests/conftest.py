@@ -0,0 +1,96 @@
+# /tests/conftest.py
+
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+# config reads the environment at import time: point every state directory at a scratch folder
+# and switch telemetry off before any project module is imported
+_scratch = tempfile.mkdtemp(prefix="planets_vibe_tests_")
+os.environ.update({
+    "OPENAI_API_KEY": "test", "PEXELS_API_KEY": "test", "PEXELS_REQUESTS_PER_HOUR": "1000000",
+    "CACHE_DIR": os.path.join(_scratch, "cache"), "RUNS_DIR": os.path.join(_scratch, "runs"),
+    "RUN_STATE_DIR": os.path.join(_scratch, "run_state"), "STAGING_DIR": os.path.join(_scratch, "staged"),
+    "ARCHIVE_DIR": os.path.join(_scratch, "archive"), "SCHEDULER_STATE_DIR": os.path.join(_scratch, "scheduler_state"),
+    "INSTAGRAM_ACCOUNTS_FILE": os.path.join(_scratch, "instagram_accounts.json"),
+    "INSTAGRAM_SESSIONS_DIR": os.path.join(_scratch, "instagram_sessions"),
+    "TELEMETRY_ENABLED": "false"
+})
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class ScriptedHTTPServer:
+    """
+    Local HTTP server that answers each path from a script of responses, one per request
+    (the last one repeats). A response is a dict with status, body, headers and delay
+    (seconds to wait before answering). Every request is recorded in hits.
+    """
+    def __init__(self):
+        self.scripts = {}
+        self.hits = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def script(self, path: str, *responses: dict):
+        self.scripts[path] = list(responses)
+
+    def hits_for(self, path: str) -> list[dict]:
+        return [hit for hit in self.hits if hit["path"] == path]
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _next_response(self, path: str) -> dict:
+        with self._lock:
+            self.hits.append({"path": path, "at": time.monotonic()})
+            script = self.scripts.get(path)
+            if not script:
+                return {"status": 404}
+            return script.pop(0) if len(script) > 1 else script[0]
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                response = server._next_response(self.path.split("?")[0])
+                time.sleep(response.get("delay", 0))
+                body = response.get("body", {})
+                body = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+                try:
+                    self.send_response(response.get("status", 200))
+                    for name, value in response.get("headers", {}).items():
+                        self.send_header(name, value)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up (timeout) before the answer was sent
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+@pytest.fixture
+def http_server():
+    server = ScriptedHTTPServer()
+    yield server
+    server.close()
@@ -0,0 +1,109 @@
+# /tests/test_carousel_publisher.py
+
+from datetime import date
+
+import pytest
+from PIL import Image
+
+from core_services.outbound_client_service import RetryPolicy
+from orchestration.run_state_store import RunStateStore
+from platform_services.carousel_publisher import CarouselPublisher
+from platform_services.instagram_stub_client import StubInstagramClient
+
+FAST_RETRIES = RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=0.05)
+
+@pytest.fixture
+def packages(tmp_path):
+    """Four carousel items, each with its own small image."""
+    result = []
+    for index, sign in enumerate(("aries", "taurus", "gemini", "cancer")):
+        path = str(tmp_path / f"{sign}.jpg")
+        Image.new("RGB", (108 + index, 135), (index * 40, 0, 0)).save(path, "JPEG")
+        result.append({"sign": sign, "path": path})
+    return result
+
+@pytest.fixture
+def run_state(tmp_path):
+    return RunStateStore(date(2025, 1, 31), state_dir=str(tmp_path / "run_state"))
+
+def make_publisher(client, **options) -> CarouselPublisher:
+    options = {"item_retry_policy": FAST_RETRIES, "configure_delay": 0, "upload_workers": 1, **options}
+    return CarouselPublisher(client, **options)
+
+def test_a_failed_item_upload_is_retried(packages):
+    client = StubInstagramClient(fail_upload_calls={2})
+    publisher = make_publisher(client)
+
+    assert publisher.publish(packages, "caption")
+
+    assert client.upload_calls == len(packages) + 1
+    assert publisher.stats == {"uploaded": len(packages), "reused": 0, "failed": 0}
+    assert len(client.albums) == 1
+    assert client.albums[0]["children"] == [upload["upload_id"] for upload in client.uploads]
+
+def test_an_item_that_keeps_failing_stops_the_carousel(packages):
+    client = StubInstagramClient(fail_paths={packages[1]["path"]})
+    publisher = make_publisher(client)
+
+    assert not publisher.publish(packages, "caption")
+
+    assert publisher.stats["failed"] == 1
+    assert client.upload_calls == len(packages) - 1 + FAST_RETRIES.max_attempts
+    assert client.configure_calls == 0
+    assert client.albums == []
+
+def test_a_retry_reuses_the_journaled_uploads(packages, run_state):
+    client = StubInstagramClient(fail_paths={packages[2]["path"]})
+    assert not make_publisher(client, run_state=run_state).publish(packages, "caption")
+    first_calls = client.upload_calls
+
+    client.fail_paths.clear()
+    retry = make_publisher(client, run_state=run_state)
+    assert retry.publish(packages, "caption")
+
+    # Only the item that failed is sent again
+    assert retry.stats == {"uploaded": 1, "reused": len(packages) - 1, "failed": 0}
+    assert client.upload_calls == first_calls + 1
+    assert len(client.albums[0]["children"]) == len(packages)
+
+def test_journaled_uploads_that_are_too_old_are_sent_again(packages, run_state):
+    client = StubInstagramClient()
+    assert make_publisher(client, run_state=run_state, configure_attempts=1).publish(packages, "caption")
+
+    again = make_publisher(client, run_state=run_state, max_upload_age_hours=0)
+    assert again.publish(packages, "caption")
+
+    assert again.stats == {"uploaded": len(packages), "reused": 0, "failed": 0}
+    assert client.upload_calls == 2 * len(packages)
+
+def test_journaled_uploads_of_another_file_are_not_reused(packages, run_state, tmp_path):
+    client = StubInstagramClient()
+    assert make_publisher(client, run_state=run_state).publish(packages, "caption")
+
+    rerendered = str(tmp_path / "aries_rerendered.jpg")
+    Image.new("RGB", (108, 135)).save(rerendered, "JPEG")
+    changed = [{**packages[0], "path": rerendered}] + packages[1:]
+    again = make_publisher(client, run_state=run_state)
+    assert again.publish(changed, "caption")
+
+    assert again.stats == {"uploaded": 1, "reused": len(packages) - 1, "failed": 0}
+
+def test_configure_is_retried_until_it_succeeds(packages):
+    client = StubInstagramClient(fail_configures=2)
+    publisher = make_publisher(client, configure_attempts=3)
+
+    assert publisher.publish(packages, "caption")
+
+    assert client.configure_calls == 3
+    assert len(client.albums) == 1
+    # The items are uploaded once; only the configure step is repeated
+    assert client.upload_calls == len(packages)
+
+def test_configure_gives_up_after_its_attempts(packages):
+    client = StubInstagramClient(fail_configures=3)
+    publisher = make_publisher(client, configure_attempts=3)
+
+    assert not publisher.publish(packages, "caption")
+
+    assert client.configure_calls == 3
+    assert client.albums == []
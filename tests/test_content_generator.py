@@ -0,0 +1,67 @@
+# /tests/test_content_generator.py
+
+import json
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from core_services.content_generator_service import ContentGeneratorService
+from core_services.disk_cache_service import DiskCacheService
+
+RUN_DATE = date(2025, 1, 31)
+VALID_REPLY = {"description": "A bright day for bold moves.", "mood": "Confident", "lucky_number": 7, "color": "Gold"}
+# Well-formed JSON that fails the schema: lucky_number is out of range and color is missing
+INVALID_REPLY = {"description": "A bright day for bold moves.", "mood": "Confident", "lucky_number": 700}
+
+class FakeCompletions:
+    """Answers each chat completion with the next of replies (the last one repeats)."""
+    def __init__(self, *replies: dict):
+        self.replies = list(replies)
+        self.calls = 0
+
+    def create(self, **request):
+        reply = self.replies[min(self.calls, len(self.replies) - 1)]
+        self.calls += 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(reply)))],
+                               usage=SimpleNamespace(prompt_tokens=10, completion_tokens=20))
+
+@pytest.fixture
+def make_generator(tmp_path):
+    def make(*replies: dict) -> ContentGeneratorService:
+        generator = ContentGeneratorService()
+        generator.response_cache = DiskCacheService("openai_responses", cache_dir=str(tmp_path / "cache"))
+        generator.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(*replies)))
+        return generator
+    return make
+
+def test_a_reply_that_fails_validation_is_not_cached(make_generator):
+    generator = make_generator(INVALID_REPLY, VALID_REPLY)
+    completions = generator.client.chat.completions
+
+    assert generator.generate_astrology_data("leo", RUN_DATE) is None
+    assert generator.response_cache.stats()["entries"] == 0
+
+    data = generator.generate_astrology_data("leo", RUN_DATE)
+
+    assert data == {**VALID_REPLY, "sign": "leo"}
+    assert completions.calls == 2
+
+    # The valid reply is the one that is replayed
+    assert generator.generate_astrology_data("leo", RUN_DATE) == data
+    assert completions.calls == 2
+
+def test_an_invalid_cached_reply_is_deleted_and_requested_again(make_generator):
+    generator = make_generator(VALID_REPLY)
+    # A reply cached before validation was in place
+    generator.generate_astrology_data("leo", RUN_DATE)
+    cache = generator.response_cache
+    [(path, _, _)] = cache._list_entries()
+    with open(path, "r", encoding="utf-8") as f:
+        entry = json.load(f)
+    entry["value"]["content"] = json.dumps(INVALID_REPLY)
+    cache.set_json(entry["key"], entry["value"])
+
+    assert generator.generate_astrology_data("leo", RUN_DATE) == {**VALID_REPLY, "sign": "leo"}
+    assert generator.client.chat.completions.calls == 2
+    assert json.loads(cache.get_json(entry["key"])["content"]) == VALID_REPLY
@@ -0,0 +1,30 @@
+# /tests/test_instagram_account_pool.py
+
+import json
+
+from platform_services.instagram_account_pool import InstagramAccount, InstagramAccountPool
+
+def make_pool(tmp_path, entries: list) -> InstagramAccountPool:
+    registry_path = tmp_path / "instagram_accounts.json"
+    registry_path.write_text(json.dumps({"accounts": entries}), encoding="utf-8")
+    return InstagramAccountPool(registry_path=str(registry_path), sessions_dir=str(tmp_path / "sessions"),
+                                connection_factory=lambda session_file: None)
+
+def test_unknown_registry_keys_are_ignored(tmp_path):
+    pool = make_pool(tmp_path, [{"name": "brand", "username": "brand_ig", "max_concurrent_uploads": 2, "note": "EU page"}])
+
+    assert pool.accounts == [InstagramAccount("brand", "brand_ig", 2, True)]
+
+def test_unusable_registry_entries_are_skipped(tmp_path):
+    pool = make_pool(tmp_path, [
+        {"username": "no_name"},
+        {"name": "  "},
+        "brand",
+        {"name": "zero_uploads", "max_concurrent_uploads": 0},
+        {"name": "text_limit", "max_concurrent_uploads": "3"},
+        {"name": "text_enabled", "enabled": "yes"},
+        {"name": "brand", "enabled": False}
+    ])
+
+    assert pool.accounts == [InstagramAccount("brand", enabled=False)]
+    assert pool.enabled_account_names() == []
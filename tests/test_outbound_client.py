@@ -0,0 +1,99 @@
+# /tests/test_outbound_client.py
+
+import time
+
+import pytest
+import requests
+
+import core_services.outbound_client_service as outbound_client_service
+import platform_services.instagram_service as instagram_service
+from core_services.outbound_client_service import OutboundClient, RetryPolicy, TokenBucket
+from platform_services.instagram_service import InstagramService
+
+FAST_RETRIES = RetryPolicy(max_attempts=3, base_delay=0.01, max_delay=5.0)
+
+@pytest.fixture
+def pexels_service(http_server, monkeypatch):
+    """An InstagramService whose Pexels searches go to the local server, with fast retries."""
+    monkeypatch.setattr(instagram_service, "PEXELS_API_BASE_URL", f"{http_server.url}/v1")
+    service = InstagramService(content_generator=None, image_post_generator=None, instagram_client=None)
+    service.pexels = OutboundClient("pexels", rate_per_second=1000, burst=10, retry_policy=FAST_RETRIES)
+    return service
+
+def test_search_waits_out_retry_after_on_429(http_server, pexels_service):
+    http_server.script("/v1/search",
+                       {"status": 429, "headers": {"Retry-After": "0.5"}},
+                       {"body": {"photos": [{"id": 1}, {"id": 2}]}})
+
+    photos = pexels_service._search_pexels("retry after query")
+
+    assert [photo["id"] for photo in photos] == [1, 2]
+    hits = http_server.hits_for("/v1/search")
+    assert len(hits) == 2
+    assert hits[1]["at"] - hits[0]["at"] >= 0.45
+    assert pexels_service.pexels.stats["retries"] == 1
+
+def test_search_retries_503_with_exponential_backoff(http_server, pexels_service, monkeypatch):
+    # Take the top of every jitter range so the backoff is deterministic: 0.1 * 2, then 0.1 * 4
+    monkeypatch.setattr(outbound_client_service.random, "uniform", lambda low, high: high)
+    pexels_service.pexels.retry_policy = RetryPolicy(max_attempts=4, base_delay=0.1, max_delay=5.0)
+    http_server.script("/v1/search", {"status": 503}, {"status": 503}, {"body": {"photos": [{"id": 7}]}})
+
+    photos = pexels_service._search_pexels("backoff query")
+
+    assert photos == [{"id": 7}]
+    hits = [hit["at"] for hit in http_server.hits_for("/v1/search")]
+    assert len(hits) == 3
+    assert hits[1] - hits[0] >= 0.19
+    assert hits[2] - hits[1] >= 0.39
+
+def test_search_gives_up_after_the_retry_budget(http_server, pexels_service):
+    http_server.script("/v1/search", {"status": 503})
+
+    with pytest.raises(requests.HTTPError):
+        pexels_service._search_pexels("always failing query")
+
+    assert len(http_server.hits_for("/v1/search")) == FAST_RETRIES.max_attempts
+    assert pexels_service.pexels.stats["failures"] == 1
+
+def test_timeout_raises_after_the_retry_budget(http_server):
+    http_server.script("/slow", {"delay": 1.0})
+    client = OutboundClient("test", timeout=0.2, retry_policy=FAST_RETRIES)
+
+    with pytest.raises(requests.Timeout):
+        client.request("GET", f"{http_server.url}/slow")
+
+    assert len(http_server.hits_for("/slow")) == FAST_RETRIES.max_attempts
+    assert client.stats["attempts"] == FAST_RETRIES.max_attempts
+    assert client.stats["retries"] == FAST_RETRIES.max_attempts - 1
+    assert client.stats["failures"] == 1
+
+def test_client_errors_are_not_retried(http_server):
+    http_server.script("/missing", {"status": 404})
+    client = OutboundClient("test", retry_policy=FAST_RETRIES)
+
+    with pytest.raises(requests.HTTPError):
+        client.request("GET", f"{http_server.url}/missing")
+
+    assert len(http_server.hits_for("/missing")) == 1
+
+def test_token_bucket_throttles_requests(http_server):
+    http_server.script("/ok", {"body": {}})
+    client = OutboundClient("test", rate_per_second=10, burst=1, retry_policy=FAST_RETRIES)
+
+    start = time.monotonic()
+    for _ in range(4):
+        client.request("GET", f"{http_server.url}/ok")
+    elapsed = time.monotonic() - start
+
+    # The first request uses the burst; the other three each wait about 0.1s for a token
+    assert elapsed >= 0.28
+    assert client.stats["throttled_seconds"] >= 0.2
+    hits = [hit["at"] for hit in http_server.hits_for("/ok")]
+    assert all(later - earlier >= 0.08 for earlier, later in zip(hits, hits[1:]))
+
+def test_token_bucket_allows_a_burst_then_refills_at_its_rate():
+    bucket = TokenBucket(rate=20, capacity=3)
+
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.acquire() == pytest.approx(0.05, abs=0.03)
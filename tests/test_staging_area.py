@@ -0,0 +1,60 @@
+# /tests/test_staging_area.py
+
+import os
+from datetime import date, datetime, timedelta
+
+import pytest
+from PIL import Image
+
+import orchestration.staging_area as staging_area
+from orchestration.staging_area import StagingArea
+
+SIGNS = ("aries", "taurus", "gemini")
+
+@pytest.fixture
+def packages(tmp_path):
+    result = []
+    for sign in SIGNS:
+        path = str(tmp_path / f"{sign}.jpg")
+        Image.new("RGB", (108, 135)).save(path, "JPEG")
+        result.append({"sign": sign, "path": path, "description": f"{sign} text"})
+    return result
+
+@pytest.fixture
+def staging(tmp_path):
+    return StagingArea(staging_dir=str(tmp_path / "staged"), max_age_hours=36)
+
+def freeze_now(monkeypatch, now: datetime):
+    class FrozenDateTime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now
+    monkeypatch.setattr(staging_area, "datetime", FrozenDateTime)
+
+def test_a_carousel_staged_days_ahead_loads_on_its_date(staging, packages, monkeypatch):
+    today = datetime(2025, 3, 1, 9, 0)
+    run_date = (today + timedelta(days=5)).date()
+    freeze_now(monkeypatch, today)
+    staging.stage(run_date, packages, "caption")
+
+    freeze_now(monkeypatch, datetime.combine(run_date, datetime.min.time()) + timedelta(hours=10))
+    manifest = staging.load(run_date, expected_posts=len(SIGNS))
+
+    assert manifest is not None
+    assert [post["sign"] for post in manifest["posts"]] == list(SIGNS)
+
+def test_a_carousel_is_stale_once_its_date_is_long_past(staging, packages, monkeypatch):
+    run_date = date(2025, 3, 1)
+    freeze_now(monkeypatch, datetime(2025, 2, 28, 20, 0))
+    staging.stage(run_date, packages, "caption")
+
+    freeze_now(monkeypatch, datetime(2025, 3, 2, 13, 0))
+    assert staging.load(run_date, expected_posts=len(SIGNS)) is None
+
+def test_a_carousel_with_missing_images_is_not_loaded(staging, packages):
+    run_date = date.today()
+    manifest = staging.stage(run_date, packages, "caption")
+
+    os.remove(manifest["posts"][0]["path"])
+
+    assert staging.load(run_date, expected_posts=len(SIGNS)) is None
@@ -0,0 +1,26 @@
+# /tests/test_telemetry.py
+
+import json
+
+from core_services.telemetry import Telemetry
+
+def read_events(path) -> list[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def test_the_event_log_is_rotated_to_one_backup(tmp_path):
+    log_path = tmp_path / "events.jsonl"
+    telemetry = Telemetry(enabled=True, log_path=str(log_path), prometheus_path=str(tmp_path / "metrics.prom"),
+                          log_max_mb=2 / 1024)
+
+    for index in range(200):
+        telemetry.event("test", index=index, padding="x" * 40)
+    telemetry.flush()
+
+    backup = tmp_path / "events.jsonl.1"
+    assert log_path.stat().st_size < 2048
+    assert backup.stat().st_size < 2048 + 200
+    # Nothing is lost between the backup and the live log, and older backups are dropped
+    indexes = [event["index"] for event in read_events(backup) + read_events(log_path)]
+    assert indexes == list(range(indexes[0], 200))
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["events.jsonl", "events.jsonl.1"]
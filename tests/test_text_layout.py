@@ -0,0 +1,84 @@
+# /tests/test_text_layout.py
+
+import pytest
+from PIL import ImageFont
+
+from core_services.image_post_generator_service import FONT_PATH, POST_VARIANTS
+from core_services.text_layout import ELLIPSIS, PostTemplate, TextLayoutEngine
+
+SHORT_TEXT = "Trust the quiet voice that has been guiding you today."
+
+@pytest.fixture(scope="module")
+def get_font():
+    fonts = {}
+    def get(size):
+        if size not in fonts:
+            fonts[size] = ImageFont.truetype(FONT_PATH, size=size)
+        return fonts[size]
+    return get
+
+def make_engine(get_font, variant: str = "portrait") -> TextLayoutEngine:
+    width, height = POST_VARIANTS[variant]
+    return TextLayoutEngine(PostTemplate(width=width, height=height), get_font)
+
+def words(count: int) -> str:
+    return " ".join(f"word{index % 10}" for index in range(count))
+
+def assert_inside_text_area(engine: TextLayoutEngine, plan):
+    template = engine.template
+    for line in (plan.title, *plan.lines):
+        metrics = engine.metrics(line.size)
+        assert line.y >= template.margin
+        assert line.y + metrics.line_height <= template.height - template.margin
+        assert line.x >= 0
+        assert line.x + metrics.width(line.text) <= template.width
+
+def test_short_text_uses_the_largest_sizes(get_font):
+    engine = make_engine(get_font)
+
+    plan = engine.layout("Leo", SHORT_TEXT)
+
+    assert plan.fits
+    assert plan.title.size == engine.template.title_size
+    assert {line.size for line in plan.lines} == {engine.template.body_size}
+    assert " ".join(line.text for line in plan.lines) == SHORT_TEXT
+    assert_inside_text_area(engine, plan)
+
+def test_lines_are_wrapped_by_pixel_width(get_font):
+    engine = make_engine(get_font)
+
+    plan = engine.layout("Leo", words(60))
+
+    for line in plan.lines:
+        assert engine.metrics(line.size).width(line.text) <= engine.template.text_width
+
+def test_the_title_shrinks_once_the_body_is_at_its_smallest(get_font):
+    engine = make_engine(get_font)
+    # The shortest body that no longer fits under the full-size title even at the smallest body size
+    count = next(count for count in range(40, 400, 5)
+                 if engine.layout("Leo", words(count)).title.size < engine.template.title_size)
+
+    plan = engine.layout("Leo", words(count))
+
+    assert plan.fits
+    assert plan.lines[0].size == engine.template.min_body_size
+    assert_inside_text_area(engine, plan)
+
+@pytest.mark.parametrize("variant", list(POST_VARIANTS))
+def test_an_overlong_description_is_cut_off_inside_the_frame(get_font, variant):
+    engine = make_engine(get_font, variant)
+    text = words(200 if variant != "story" else 400)
+
+    plan = engine.layout("Sagittarius", text)
+
+    assert not plan.fits
+    assert plan.title.size == engine.template.min_title_size
+    assert plan.lines and all(line.size == engine.template.min_body_size for line in plan.lines)
+    assert plan.lines[-1].text.endswith(ELLIPSIS)
+    assert_inside_text_area(engine, plan)
+
+def test_plans_are_cached_per_title_and_text(get_font):
+    engine = make_engine(get_font)
+
+    assert engine.layout("Leo", SHORT_TEXT) is engine.layout("Leo", SHORT_TEXT)
+    assert engine.layout("Leo", SHORT_TEXT) is not engine.layout("Virgo", SHORT_TEXT)